@@ -1,11 +1,10 @@
 from logging.config import fileConfig
 
-from sqlalchemy import engine_from_config
 from sqlalchemy import pool
 
 from alembic import context
 
-from app.core.database import Base
+from app.core.database import Base, create_db_engine
 from app.models import *  # noqa
 from app.core.config import settings
 
@@ -62,10 +61,9 @@ def run_migrations_online() -> None:
     and associate a connection with the context.
 
     """
-    connectable = engine_from_config(
-        config.get_section(config.config_ini_section, {}),
-        prefix="sqlalchemy.",
-        poolclass=pool.NullPool,
+    # Same per-dialect setup as the app (SQLite WAL and foreign keys)
+    connectable = create_db_engine(
+        config.get_main_option("sqlalchemy.url"), poolclass=pool.NullPool
     )
 
     with connectable.connect() as connection:
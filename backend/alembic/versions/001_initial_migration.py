@@ -16,6 +16,10 @@ down_revision = None
 branch_labels = None
 depends_on = None
 
+# Postgres keeps its native types; other dialects (SQLite) store JSON text
+JSON_TYPE = sa.JSON().with_variant(postgresql.JSON(astext_type=sa.Text()), "postgresql")
+STRING_LIST_TYPE = sa.JSON().with_variant(postgresql.ARRAY(sa.String()), "postgresql")
+
 
 def upgrade() -> None:
     # Create users table
@@ -29,7 +33,7 @@ def upgrade() -> None:
         sa.Column(
             "created_at",
             sa.DateTime(timezone=True),
-            server_default=sa.text("now()"),
+            server_default=sa.func.now(),
             nullable=True,
         ),
         sa.Column("updated_at", sa.DateTime(timezone=True), nullable=True),
@@ -51,21 +55,19 @@ def upgrade() -> None:
             nullable=False,
         ),
         sa.Column("base_prompt", sa.Text(), nullable=True),
-        sa.Column(
-            "llm_response", postgresql.JSON(astext_type=sa.Text()), nullable=True
-        ),
+        sa.Column("llm_response", JSON_TYPE, nullable=True),
         sa.Column("instructions", sa.Text(), nullable=True),
-        sa.Column("ingredients", postgresql.JSON(astext_type=sa.Text()), nullable=True),
+        sa.Column("ingredients", JSON_TYPE, nullable=True),
         sa.Column("servings", sa.Integer(), nullable=True),
         sa.Column("prep_time", sa.Integer(), nullable=True),
         sa.Column("cook_time", sa.Integer(), nullable=True),
-        sa.Column("equipment", postgresql.ARRAY(sa.String()), nullable=True),
+        sa.Column("equipment", STRING_LIST_TYPE, nullable=True),
         sa.Column("plating_notes", sa.Text(), nullable=True),
         sa.Column("is_public", sa.Boolean(), nullable=True),
         sa.Column(
             "created_at",
             sa.DateTime(timezone=True),
-            server_default=sa.text("now()"),
+            server_default=sa.func.now(),
             nullable=True,
         ),
         sa.Column("updated_at", sa.DateTime(timezone=True), nullable=True),
@@ -87,7 +89,7 @@ def upgrade() -> None:
         sa.Column(
             "created_at",
             sa.DateTime(timezone=True),
-            server_default=sa.text("now()"),
+            server_default=sa.func.now(),
             nullable=True,
         ),
         sa.PrimaryKeyConstraint("id"),
@@ -106,7 +108,7 @@ def upgrade() -> None:
         sa.Column(
             "created_at",
             sa.DateTime(timezone=True),
-            server_default=sa.text("now()"),
+            server_default=sa.func.now(),
             nullable=True,
         ),
         sa.ForeignKeyConstraint(
@@ -133,7 +135,7 @@ def upgrade() -> None:
         sa.Column(
             "created_at",
             sa.DateTime(timezone=True),
-            server_default=sa.text("now()"),
+            server_default=sa.func.now(),
             nullable=True,
         ),
         sa.ForeignKeyConstraint(
@@ -160,7 +162,7 @@ def upgrade() -> None:
         sa.Column(
             "created_at",
             sa.DateTime(timezone=True),
-            server_default=sa.text("now()"),
+            server_default=sa.func.now(),
             nullable=True,
         ),
         sa.ForeignKeyConstraint(
@@ -10,6 +10,8 @@ from alembic import op
 import sqlalchemy as sa
 from sqlalchemy.sql import table, column
 from sqlalchemy import String, Integer, Text, JSON, Boolean
+from sqlalchemy.dialects import postgresql
+import secrets
 
 # revision identifiers, used by Alembic.
 revision = "003"
@@ -18,11 +20,35 @@ branch_labels = None
 depends_on = None
 
 
+DEMO_EMAIL = "demo@brinebook.app"
+
+
 def upgrade() -> None:
-    # Set hero_photo field for each recipe (after demo_images is defined)
-    for i, url in enumerate(demo_images, start=1):
-        op.execute(f"UPDATE recipes SET hero_photo = '{url}' WHERE id = {i}")
-    # Recipes data (using existing user_id=1)
+    bind = op.get_bind()
+
+    # The seed recipes belong to user 1; create a demo owner on a fresh database
+    if bind.execute(sa.text("SELECT 1 FROM users WHERE id = 1")).first() is None:
+        from app.core.security import get_password_hash
+
+        users_table = table(
+            "users",
+            column("id", Integer),
+            column("email", String),
+            column("name", String),
+            column("hashed_password", String),
+            column("is_active", Boolean),
+        )
+        op.execute(
+            users_table.insert().values(
+                id=1,
+                email=DEMO_EMAIL,
+                name="Demo Chef",
+                hashed_password=get_password_hash(secrets.token_urlsafe(32)),
+                is_active=True,
+            )
+        )
+
+    # Recipes data (using user_id=1)
     recipes_table = table(
         "recipes",
         column("id", Integer),
@@ -35,7 +61,10 @@ def upgrade() -> None:
         column("servings", Integer),
         column("prep_time", Integer),
         column("cook_time", Integer),
-        column("equipment", sa.ARRAY(String)),
+        column(
+            "equipment",
+            sa.JSON().with_variant(postgresql.ARRAY(String), "postgresql"),
+        ),
         column("plating_notes", Text),
         column("is_public", Boolean),
     )
@@ -400,43 +429,53 @@ def upgrade() -> None:
     for mapping in tag_mappings:
         op.execute(recipe_tags_table.insert().values(**mapping))
 
-        # Seed demo hero images for each recipe
-        photos_table = table(
-            "photos",
-            column("id", Integer),
-            column("recipe_id", Integer),
-            column("user_id", Integer),
-            column("url", String),
-            column("caption", Text),
-            column("is_hero", Boolean),
+    # Seed demo hero images for each recipe
+    photos_table = table(
+        "photos",
+        column("id", Integer),
+        column("recipe_id", Integer),
+        column("user_id", Integer),
+        column("url", String),
+        column("caption", Text),
+        column("is_hero", Boolean),
+    )
+
+    demo_images = [
+        "https://images.unsplash.com/photo-1504674900247-0877df9cc836",  # Ribeye
+        "https://images.unsplash.com/photo-1519864600265-abb23847ef2c",  # Salmon
+        "https://images.unsplash.com/photo-1464306076886-debede6bbf09",  # Risotto
+        "https://images.unsplash.com/photo-1502741338009-cac2772e18bc",  # Duck
+        "https://images.unsplash.com/photo-1523987355523-c7b5b0723c6b",  # Tagliatelle
+        "https://images.unsplash.com/photo-1504674900247-0877df9cc836",  # Black Cod
+        "https://images.unsplash.com/photo-1519864600265-abb23847ef2c",  # Wellington
+        "https://images.unsplash.com/photo-1464306076886-debede6bbf09",  # Lobster
+        "https://images.unsplash.com/photo-1502741338009-cac2772e18bc",  # Coq au Vin
+        "https://images.unsplash.com/photo-1523987355523-c7b5b0723c6b",  # Soufflé
+    ]
+    for i, url in enumerate(demo_images, start=1):
+        op.execute(
+            photos_table.insert().values(
+                id=i,
+                recipe_id=i,
+                user_id=1,
+                url=url,
+                caption=f"Demo image for recipe {i}",
+                is_hero=True,
+            )
         )
 
-        demo_images = [
-            "https://images.unsplash.com/photo-1504674900247-0877df9cc836",  # Ribeye
-            "https://images.unsplash.com/photo-1519864600265-abb23847ef2c",  # Salmon
-            "https://images.unsplash.com/photo-1464306076886-debede6bbf09",  # Risotto
-            "https://images.unsplash.com/photo-1502741338009-cac2772e18bc",  # Duck
-            "https://images.unsplash.com/photo-1523987355523-c7b5b0723c6b",  # Tagliatelle
-            "https://images.unsplash.com/photo-1504674900247-0877df9cc836",  # Black Cod
-            "https://images.unsplash.com/photo-1519864600265-abb23847ef2c",  # Wellington
-            "https://images.unsplash.com/photo-1464306076886-debede6bbf09",  # Lobster
-            "https://images.unsplash.com/photo-1502741338009-cac2772e18bc",  # Coq au Vin
-            "https://images.unsplash.com/photo-1523987355523-c7b5b0723c6b",  # Soufflé
-        ]
-        for i, url in enumerate(demo_images, start=1):
+    # Rows above use explicit ids; move Postgres sequences past them
+    if bind.dialect.name == "postgresql":
+        for name in ("users", "recipes", "photos"):
             op.execute(
-                photos_table.insert().values(
-                    id=i,
-                    recipe_id=i,
-                    user_id=1,
-                    url=url,
-                    caption=f"Demo image for recipe {i}",
-                    is_hero=True,
-                )
+                f"SELECT setval(pg_get_serial_sequence('{name}', 'id'), "
+                f"(SELECT MAX(id) FROM {name}))"
             )
 
 
 def downgrade() -> None:
     # Delete in reverse order due to foreign keys
+    op.execute("DELETE FROM photos WHERE recipe_id BETWEEN 1 AND 10")
     op.execute("DELETE FROM recipe_tags WHERE recipe_id BETWEEN 1 AND 10")
     op.execute("DELETE FROM recipes WHERE id BETWEEN 1 AND 10")
+    op.execute(f"DELETE FROM users WHERE id = 1 AND email = '{DEMO_EMAIL}'")
@@ -0,0 +1,68 @@
+"""Add normalized recipe_ingredients index for pantry search
+
+Revision ID: 005
+Revises: 004
+Create Date: 2026-10-19
+"""
+
+from alembic import op
+import sqlalchemy as sa
+import json
+import re
+
+revision = "005"
+down_revision = "004"
+branch_labels = None
+depends_on = None
+
+
+def _normalize(name) -> str:
+    return re.sub(r"\s+", " ", str(name)).strip().lower()
+
+
+def upgrade() -> None:
+    op.create_table(
+        "recipe_ingredients",
+        sa.Column("recipe_id", sa.Integer(), nullable=False),
+        sa.Column("name", sa.String(), nullable=False),
+        sa.ForeignKeyConstraint(["recipe_id"], ["recipes.id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("recipe_id", "name"),
+    )
+    op.create_index(
+        "ix_recipe_ingredients_name",
+        "recipe_ingredients",
+        ["name", "recipe_id"],
+        unique=False,
+    )
+
+    # Backfill from the existing ingredients JSON
+    bind = op.get_bind()
+    rows = bind.execute(
+        sa.text("SELECT id, ingredients FROM recipes WHERE ingredients IS NOT NULL")
+    )
+    index_rows = []
+    for recipe_id, ingredients in rows:
+        if isinstance(ingredients, str):
+            ingredients = json.loads(ingredients)
+        names = {
+            _normalize(ing.get("name", "") if isinstance(ing, dict) else ing)
+            for ing in ingredients or []
+        }
+        index_rows.extend(
+            {"recipe_id": recipe_id, "name": name} for name in names if name
+        )
+
+    if index_rows:
+        op.bulk_insert(
+            sa.table(
+                "recipe_ingredients",
+                sa.column("recipe_id", sa.Integer),
+                sa.column("name", sa.String),
+            ),
+            index_rows,
+        )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_recipe_ingredients_name", table_name="recipe_ingredients")
+    op.drop_table("recipe_ingredients")
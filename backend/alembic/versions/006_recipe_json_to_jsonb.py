@@ -0,0 +1,70 @@
+"""Convert recipe JSON columns to JSONB with GIN indexes
+
+Revision ID: 006
+Revises: 005
+Create Date: 2026-10-19
+"""
+
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+revision = "006"
+down_revision = "005"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    # JSONB and GIN are Postgres-only; other dialects keep JSON text
+    if op.get_bind().dialect.name != "postgresql":
+        return
+
+    op.alter_column(
+        "recipes",
+        "ingredients",
+        type_=postgresql.JSONB(astext_type=sa.Text()),
+        postgresql_using="ingredients::jsonb",
+    )
+    op.alter_column(
+        "recipes",
+        "llm_response",
+        type_=postgresql.JSONB(astext_type=sa.Text()),
+        postgresql_using="llm_response::jsonb",
+    )
+
+    # jsonb_path_ops indexes are smaller and faster but only support @>
+    op.create_index(
+        "ix_recipes_ingredients_gin",
+        "recipes",
+        ["ingredients"],
+        postgresql_using="gin",
+        postgresql_ops={"ingredients": "jsonb_path_ops"},
+    )
+    op.create_index(
+        "ix_recipes_llm_response_gin",
+        "recipes",
+        ["llm_response"],
+        postgresql_using="gin",
+        postgresql_ops={"llm_response": "jsonb_path_ops"},
+    )
+
+
+def downgrade() -> None:
+    if op.get_bind().dialect.name != "postgresql":
+        return
+
+    op.drop_index("ix_recipes_llm_response_gin", table_name="recipes")
+    op.drop_index("ix_recipes_ingredients_gin", table_name="recipes")
+    op.alter_column(
+        "recipes",
+        "llm_response",
+        type_=postgresql.JSON(astext_type=sa.Text()),
+        postgresql_using="llm_response::json",
+    )
+    op.alter_column(
+        "recipes",
+        "ingredients",
+        type_=postgresql.JSON(astext_type=sa.Text()),
+        postgresql_using="ingredients::json",
+    )
@@ -0,0 +1,78 @@
+"""Add recipe_stats summary table for leaderboards
+
+Revision ID: 007
+Revises: 006
+Create Date: 2026-10-19
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+revision = "007"
+down_revision = "006"
+branch_labels = None
+depends_on = None
+
+# Matches the LEADERBOARD_PRIOR_WEIGHT default; later refreshes rescore with
+# the configured value
+PRIOR_WEIGHT = 5.0
+DEFAULT_PRIOR_MEAN = 3.0
+
+
+def upgrade() -> None:
+    op.create_table(
+        "recipe_stats",
+        sa.Column("recipe_id", sa.Integer(), nullable=False),
+        sa.Column("user_id", sa.Integer(), nullable=False),
+        sa.Column("rating_count", sa.Integer(), nullable=False),
+        sa.Column("rating_sum", sa.Float(), nullable=False),
+        sa.Column("bayesian_rating", sa.Float(), nullable=False),
+        sa.Column("last_cooked_at", sa.DateTime(timezone=True), nullable=True),
+        sa.Column(
+            "updated_at",
+            sa.DateTime(timezone=True),
+            server_default=sa.func.now(),
+            nullable=True,
+        ),
+        sa.ForeignKeyConstraint(["recipe_id"], ["recipes.id"], ondelete="CASCADE"),
+        sa.ForeignKeyConstraint(["user_id"], ["users.id"]),
+        sa.PrimaryKeyConstraint("recipe_id"),
+    )
+    op.create_index(
+        "ix_recipe_stats_top",
+        "recipe_stats",
+        ["user_id", "bayesian_rating", "recipe_id"],
+        unique=False,
+    )
+    op.create_index(
+        "ix_recipe_stats_cooked",
+        "recipe_stats",
+        ["user_id", "last_cooked_at", "recipe_id"],
+        unique=False,
+    )
+
+    # Backfill from existing ratings
+    bind = op.get_bind()
+    mean = bind.execute(sa.text("SELECT avg(score) FROM ratings")).scalar()
+    mean = float(mean) if mean is not None else DEFAULT_PRIOR_MEAN
+    bind.execute(
+        sa.text("""
+            INSERT INTO recipe_stats (
+                recipe_id, user_id, rating_count, rating_sum,
+                bayesian_rating, last_cooked_at
+            )
+            SELECT r.recipe_id, recipes.user_id, count(r.id), sum(r.score),
+                   (:weight * :mean + sum(r.score)) / (:weight + count(r.id)),
+                   max(r.cooked_date)
+            FROM ratings r
+            JOIN recipes ON recipes.id = r.recipe_id
+            GROUP BY r.recipe_id, recipes.user_id
+            """),
+        {"weight": PRIOR_WEIGHT, "mean": mean},
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_recipe_stats_cooked", table_name="recipe_stats")
+    op.drop_index("ix_recipe_stats_top", table_name="recipe_stats")
+    op.drop_table("recipe_stats")
@@ -0,0 +1,59 @@
+"""Add change_log table for the incremental sync feed
+
+Revision ID: 008
+Revises: 007
+Create Date: 2026-10-19
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+revision = "008"
+down_revision = "007"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        "change_log",
+        sa.Column("seq", sa.Integer(), autoincrement=True, nullable=False),
+        sa.Column("user_id", sa.Integer(), nullable=False),
+        sa.Column("entity", sa.String(), nullable=False),
+        sa.Column("entity_id", sa.Integer(), nullable=False),
+        sa.Column("recipe_id", sa.Integer(), nullable=False),
+        sa.Column("deleted", sa.Boolean(), nullable=False),
+        sa.Column("changed_at", sa.DateTime(timezone=True), nullable=False),
+        sa.ForeignKeyConstraint(["user_id"], ["users.id"]),
+        sa.PrimaryKeyConstraint("seq"),
+        sqlite_autoincrement=True,
+    )
+    op.create_index(
+        "ix_change_log_user_seq", "change_log", ["user_id", "seq"], unique=False
+    )
+    op.create_index(
+        "ix_change_log_entity", "change_log", ["entity", "entity_id"], unique=False
+    )
+
+    # Seed one entry per existing row so a full sync from cursor 0 is complete
+    bind = op.get_bind()
+    for entity, table, recipe_column in (
+        ("recipe", "recipes", "id"),
+        ("rating", "ratings", "recipe_id"),
+        ("photo", "photos", "recipe_id"),
+    ):
+        bind.execute(
+            sa.text(
+                f"INSERT INTO change_log "
+                f"(user_id, entity, entity_id, recipe_id, deleted, changed_at) "
+                f"SELECT user_id, :entity, id, {recipe_column}, :deleted, "
+                f"CURRENT_TIMESTAMP FROM {table} ORDER BY id"
+            ),
+            {"entity": entity, "deleted": False},
+        )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_change_log_entity", table_name="change_log")
+    op.drop_index("ix_change_log_user_seq", table_name="change_log")
+    op.drop_table("change_log")
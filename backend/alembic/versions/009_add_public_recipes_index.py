@@ -0,0 +1,29 @@
+"""Add partial index for the public recipe gallery
+
+Revision ID: 009
+Revises: 008
+Create Date: 2026-10-19
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+revision = "009"
+down_revision = "008"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.create_index(
+        "ix_recipes_public",
+        "recipes",
+        ["id"],
+        unique=False,
+        postgresql_where=sa.text("is_public"),
+        sqlite_where=sa.text("is_public = 1"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_recipes_public", table_name="recipes")
@@ -0,0 +1,39 @@
+"""Record the writing transaction of change_log entries
+
+Revision ID: 011
+Revises: 010
+Create Date: 2026-10-19
+"""
+
+from alembic import op
+import sqlalchemy as sa
+
+revision = "011"
+down_revision = "010"
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column("change_log", sa.Column("xid", sa.BigInteger(), nullable=True))
+    op.create_index(
+        "ix_change_log_user_xid", "change_log", ["user_id", "xid", "seq"], unique=False
+    )
+
+    # Only Postgres commits out of sequence order; other dialects leave it NULL
+    if op.get_bind().dialect.name != "postgresql":
+        return
+
+    # Existing entries were all committed before any transaction now running
+    op.execute("UPDATE change_log SET xid = 0")
+    op.alter_column(
+        "change_log",
+        "xid",
+        nullable=False,
+        server_default=sa.text("(pg_current_xact_id()::text::bigint)"),
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_change_log_user_xid", table_name="change_log")
+    op.drop_column("change_log", "xid")
@@ -0,0 +1,57 @@
+import secrets
+from fastapi import APIRouter, Depends, Header, HTTPException
+from fastapi.responses import PlainTextResponse
+from sqlalchemy.orm import Session
+from app.core.config import settings
+from app.core.database import get_db
+from app.core.profiling import sampler
+from app.services.leaderboard_service import refresh_leaderboards
+
+router = APIRouter()
+
+
+def require_admin(x_admin_token: str = Header("")) -> None:
+    """Guard admin endpoints with the shared ADMIN_TOKEN."""
+    if not settings.ADMIN_TOKEN or not secrets.compare_digest(
+        x_admin_token, settings.ADMIN_TOKEN
+    ):
+        raise HTTPException(status_code=403, detail="Admin token required")
+
+
+@router.get(
+    "/profile", response_class=PlainTextResponse, dependencies=[Depends(require_admin)]
+)
+def get_profile():
+    """
+    Folded stack samples collected so far, one "frame;frame;frame count"
+    line per stack. Pipe into flamegraph.pl or load in speedscope.
+    """
+    return PlainTextResponse(sampler.folded())
+
+
+@router.get("/profile/stats", dependencies=[Depends(require_admin)])
+def get_profile_stats():
+    """Sampler configuration and totals."""
+    return {
+        "enabled": settings.PROFILING_ENABLED,
+        "sample_rate": settings.PROFILING_SAMPLE_RATE,
+        "interval_ms": settings.PROFILING_INTERVAL_MS,
+        "samples": sampler.sample_count,
+        "unique_stacks": len(sampler.samples),
+    }
+
+
+@router.delete("/profile", dependencies=[Depends(require_admin)])
+def reset_profile():
+    """Discard collected samples."""
+    sampler.reset()
+    return {"message": "Profile reset"}
+
+
+@router.post("/leaderboards/refresh", dependencies=[Depends(require_admin)])
+def refresh_leaderboards_endpoint(rebuild: bool = False, db: Session = Depends(get_db)):
+    """
+    Rescore leaderboards against the current global mean rating; `rebuild`
+    also recomputes every recipe's aggregates from the ratings table.
+    """
+    return refresh_leaderboards(db, rebuild=rebuild)
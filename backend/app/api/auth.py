@@ -1,43 +1,120 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from typing import Optional
+from fastapi import APIRouter, Depends, HTTPException, Response, status
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
+from app.api.deps import get_current_user_id, get_token_claims
 from app.core.database import get_db
-from app.core.security import create_access_token, verify_password, get_password_hash
+from app.core.security import (
+    HashingBusy,
+    decode_token,
+    hash_password,
+    verify_and_update_password,
+)
 from app.models import User
-from app.schemas import UserCreate, UserLogin, User as UserSchema, Token
-from datetime import timedelta
-from app.core.config import settings
+from app.schemas import (
+    LogoutRequest,
+    RefreshRequest,
+    UserCreate,
+    UserLogin,
+    User as UserSchema,
+    Token,
+)
+from app.services.auth_service import (
+    InvalidRefreshToken,
+    issue_tokens,
+    refresh_tokens,
+    revoke_access_token,
+    revoke_all,
+    revoke_refresh_token,
+)
 
 router = APIRouter()
 
 
-@router.post("/register", response_model=UserSchema)
-def register(user: UserCreate, db: Session = Depends(get_db)):
-    """Register a new user."""
+def hashing_busy() -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+        detail="Too many sign-ins in progress, try again shortly",
+        headers={"Retry-After": "1"},
+    )
 
-    # Check if user exists
-    db_user = db.query(User).filter(User.email == user.email).first()
-    if db_user:
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST, detail="Email already registered"
-        )
 
-    # Create user
-    hashed_password = get_password_hash(user.password)
+def email_taken() -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_400_BAD_REQUEST, detail="Email already registered"
+    )
+
+
+def _find_user(db: Session, email: str) -> Optional[User]:
+    user = db.query(User).filter(User.email == email).first()
+    # Don't hold a pooled connection while waiting on the hash; `user` keeps
+    # its loaded attributes once detached
+    db.close()
+    return user
+
+
+def _create_user(db: Session, user: UserCreate, hashed_password: str) -> User:
     db_user = User(email=user.email, name=user.name, hashed_password=hashed_password)
     db.add(db_user)
-    db.commit()
+    try:
+        db.commit()
+    except IntegrityError:
+        db.rollback()
+        raise
     db.refresh(db_user)
-
     return db_user
 
 
+def _sign_in(db: Session, user: User, new_hash: Optional[str]) -> dict:
+    if new_hash:
+        db.query(User).filter(User.id == user.id).update({"hashed_password": new_hash})
+    # Commits the rehash along with the refresh token
+    return issue_tokens(db, user)
+
+
+@router.post("/register", response_model=UserSchema)
+async def register(user: UserCreate, db: Session = Depends(get_db)):
+    """
+    Register a new user. Async so the bcrypt hash waits on the hashing
+    pool without holding a threadpool worker; the database work still runs
+    on the threadpool.
+    """
+
+    # Check if user exists
+    if await run_in_threadpool(_find_user, db, user.email):
+        raise email_taken()
+
+    # Create user
+    try:
+        hashed_password = await hash_password(user.password)
+    except HashingBusy:
+        raise hashing_busy()
+    try:
+        return await run_in_threadpool(_create_user, db, user, hashed_password)
+    except IntegrityError:
+        # Registered concurrently while this request was hashing
+        raise email_taken()
+
+
 @router.post("/login", response_model=Token)
-def login(credentials: UserLogin, db: Session = Depends(get_db)):
-    """Login and get access token."""
+async def login(credentials: UserLogin, db: Session = Depends(get_db)):
+    """
+    Login and get an access and refresh token. A password hashed with a
+    different BCRYPT_ROUNDS is rehashed with the current cost.
+    """
 
     # Find user
-    user = db.query(User).filter(User.email == credentials.email).first()
-    if not user or not verify_password(credentials.password, user.hashed_password):
+    user = await run_in_threadpool(_find_user, db, credentials.email)
+    verified, new_hash = False, None
+    if user:
+        try:
+            verified, new_hash = await verify_and_update_password(
+                credentials.password, user.hashed_password
+            )
+        except HashingBusy:
+            raise hashing_busy()
+    if not verified:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect email or password",
@@ -48,18 +125,62 @@ def login(credentials: UserLogin, db: Session = Depends(get_db)):
             status_code=status.HTTP_400_BAD_REQUEST, detail="Inactive user"
         )
 
-    # Create access token
-    access_token = create_access_token(data={"sub": str(user.id), "email": user.email})
+    return await run_in_threadpool(_sign_in, db, user, new_hash)
+
+
+@router.post("/refresh", response_model=Token)
+def refresh(body: RefreshRequest, db: Session = Depends(get_db)):
+    """
+    Exchange a refresh token for a new access and refresh token. The one
+    presented is revoked; presenting it again logs the user out everywhere.
+    """
+    claims = decode_token(body.refresh_token, token_type="refresh")
+    try:
+        if claims is None:
+            raise InvalidRefreshToken()
+        return refresh_tokens(db, claims)
+    except InvalidRefreshToken:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid or expired refresh token",
+        )
+
 
-    return {"access_token": access_token, "token_type": "bearer"}
+@router.post("/logout", status_code=status.HTTP_204_NO_CONTENT)
+def logout(
+    body: Optional[LogoutRequest] = None,
+    claims: Optional[dict] = Depends(get_token_claims),
+    db: Session = Depends(get_db),
+):
+    """
+    Revoke the bearer access token and, if given, the session's refresh
+    token. With `everywhere`, revoke every token the user holds.
+    """
+    if claims is None:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Not authenticated",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+    body = body or LogoutRequest()
+    user_id = int(claims["sub"])
+    if body.everywhere:
+        revoke_all(db, user_id)
+    else:
+        if body.refresh_token:
+            refresh_claims = decode_token(body.refresh_token, token_type="refresh")
+            if refresh_claims is not None:
+                revoke_refresh_token(db, user_id, refresh_claims["jti"])
+        revoke_access_token(db, claims)
+    return Response(status_code=status.HTTP_204_NO_CONTENT)
 
 
 @router.get("/me", response_model=UserSchema)
-def get_current_user(db: Session = Depends(get_db)):
+def get_current_user(
+    user_id: int = Depends(get_current_user_id), db: Session = Depends(get_db)
+):
     """Get current user info."""
-    # TODO: Implement proper JWT authentication dependency
-    # For now, return first user (development only)
-    user = db.query(User).first()
+    user = db.get(User, user_id)
     if not user:
         raise HTTPException(status_code=404, detail="User not found")
     return user
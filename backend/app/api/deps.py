@@ -0,0 +1,104 @@
+import math
+from typing import Optional
+from fastapi import Depends, HTTPException
+from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
+from sqlalchemy.orm import Session
+from app.core.circuit_breaker import CircuitOpenError
+from app.core.config import settings
+from app.core.database import get_db, replicas
+from app.core.rate_limit import RateLimitExceeded, limiter
+from app.core.security import decode_token
+from app.models import User
+from app.services.auth_service import revocations
+
+bearer = HTTPBearer(auto_error=False)
+
+
+def get_read_db(db: Session = Depends(get_db)) -> Session:
+    """
+    The request's session, with reads routed to a replica when any are
+    configured. Declare it before get_current_user_id in read-only
+    endpoints; anything the endpoint writes still goes to the primary.
+    """
+    db.info["read_only"] = bool(replicas.engines)
+    return db
+
+
+def get_token_claims(
+    credentials: Optional[HTTPAuthorizationCredentials] = Depends(bearer),
+) -> Optional[dict]:
+    """
+    Claims of the request's bearer access token, or None without one.
+    Invalid, expired and revoked tokens get a 401. The revocation check is
+    in memory (see auth_service), so this doesn't touch the database.
+    """
+    if credentials is None:
+        return None
+    claims = decode_token(credentials.credentials)
+    if claims is None or revocations.is_revoked(claims):
+        raise HTTPException(
+            status_code=401,
+            detail="Invalid or expired token",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+    return claims
+
+
+def get_current_user_id(
+    db: Session = Depends(get_db), claims: Optional[dict] = Depends(get_token_claims)
+) -> int:
+    """
+    Get current user ID from the access token. Only in development, a
+    request without a token acts as the first user, so local tools and
+    benchmarks work without signing in; elsewhere it gets a 401.
+    """
+    if claims is not None:
+        user_id = int(claims["sub"])
+    else:
+        user = None
+        if settings.ENVIRONMENT == "development":
+            user = db.query(User).first()
+        if not user:
+            raise HTTPException(
+                status_code=401,
+                detail="Not authenticated",
+                headers={"WWW-Authenticate": "Bearer"},
+            )
+        user_id = user.id
+    # Lets the session apply read-your-writes routing for this user
+    db.info["user_id"] = user_id
+    return user_id
+
+
+def enforce_rate_limit(user_id: int, route: str, cost: int = 1) -> None:
+    """Refuse the request with 429 and Retry-After if `user_id` is over a limit."""
+    try:
+        limiter.check(user_id, route, cost)
+    except RateLimitExceeded as e:
+        raise HTTPException(
+            status_code=429,
+            detail=str(e),
+            headers={"Retry-After": str(math.ceil(e.retry_after))},
+        )
+
+
+def rate_limited(route: str):
+    """
+    Dependency admitting the current user to an LLM route, for endpoints
+    that make one completion per request. Returns the user id.
+    """
+
+    def dependency(user_id: int = Depends(get_current_user_id)) -> int:
+        enforce_rate_limit(user_id, route)
+        return user_id
+
+    return dependency
+
+
+def llm_unavailable(e: CircuitOpenError) -> HTTPException:
+    """503 for an LLM call refused by an open circuit."""
+    return HTTPException(
+        status_code=503,
+        detail="Recipe generation is temporarily unavailable, try again shortly",
+        headers={"Retry-After": str(math.ceil(e.retry_after))},
+    )
@@ -0,0 +1,41 @@
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import ORJSONResponse
+from sqlalchemy.orm import Session
+from typing import Optional
+from app.api.deps import get_current_user_id, get_read_db
+from app.schemas import LeaderboardPage
+from app.services.leaderboard_service import leaderboard_page
+
+router = APIRouter()
+
+
+def get_page(db: Session, user_id: int, kind: str, limit: int, cursor: Optional[str]):
+    try:
+        return ORJSONResponse(leaderboard_page(db, user_id, kind, limit, cursor))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+
+@router.get("/top", response_model=LeaderboardPage)
+def top_recipes(
+    limit: int = Query(20, ge=1, le=100),
+    cursor: Optional[str] = None,
+    db: Session = Depends(get_read_db),
+    user_id: int = Depends(get_current_user_id),
+):
+    """
+    Highest rated recipes by Bayesian-weighted rating. Pass `next_cursor`
+    from the previous page as `cursor` to continue.
+    """
+    return get_page(db, user_id, "top", limit, cursor)
+
+
+@router.get("/recently-cooked", response_model=LeaderboardPage)
+def recently_cooked(
+    limit: int = Query(20, ge=1, le=100),
+    cursor: Optional[str] = None,
+    db: Session = Depends(get_read_db),
+    user_id: int = Depends(get_current_user_id),
+):
+    """Recipes ordered by their most recent cooked date."""
+    return get_page(db, user_id, "recent", limit, cursor)
@@ -1,20 +1,106 @@
 from fastapi import APIRouter, Depends, HTTPException, UploadFile, File
 from sqlalchemy.orm import Session
-from typing import List
+from starlette.concurrency import run_in_threadpool
+from typing import List, Optional, Tuple
+from app.core.config import settings
 from app.core.database import get_db
-from app.models import Photo, Recipe, User
-from app.schemas import PhotoCreate, Photo as PhotoSchema
-from app.services.storage_service import upload_photo, delete_photo
+from app.api.deps import get_current_user_id, get_read_db
+from app.models import Photo, Recipe
+from app.schemas import (
+    PhotoCreate,
+    Photo as PhotoSchema,
+    PhotoPresignRequest,
+    PresignedPhotoUpload,
+    PresignedPhotosCreate,
+)
+from app.services.change_feed import record_changes
+from app.services.storage_service import (
+    delete_photo,
+    delete_photos,
+    photo_url,
+    photos_uploaded,
+    presign_photo_upload,
+    upload_photo,
+    upload_photos,
+)
 
 router = APIRouter()
 
 
-def get_current_user_id(db: Session = Depends(get_db)) -> int:
-    """Get current user ID from auth token. TODO: Implement proper JWT auth."""
-    user = db.query(User).first()
-    if not user:
-        raise HTTPException(status_code=401, detail="Not authenticated")
-    return user.id
+def _get_recipe(
+    db: Session, recipe_id: int, user_id: int, lock: bool = False
+) -> Recipe:
+    """
+    The user's recipe or a 404. With `lock`, the row stays locked until
+    commit so concurrent hero changes to the recipe apply one at a time.
+    """
+    query = db.query(Recipe).filter(Recipe.id == recipe_id, Recipe.user_id == user_id)
+    if lock:
+        query = query.with_for_update()
+    recipe = query.first()
+    if not recipe:
+        raise HTTPException(status_code=404, detail="Recipe not found")
+    return recipe
+
+
+def _check_recipe(
+    db: Session, recipe_id: int, user_id: int, urls: Optional[List[str]] = None
+) -> None:
+    """
+    404 unless the user owns the recipe, 409 if any of `urls` was already
+    added. Then releases the connection, so none is held during uploads.
+    """
+    _get_recipe(db, recipe_id, user_id)
+    if urls and db.query(Photo.id).filter(Photo.url.in_(urls)).first():
+        raise HTTPException(status_code=409, detail="Photo already added")
+    db.close()
+
+
+def _unset_hero(db: Session, user_id: int, recipe_id: int) -> None:
+    """Unset the recipe's current hero photo; the caller holds the recipe lock."""
+    previous = [
+        photo_id
+        for (photo_id,) in db.query(Photo.id).filter(
+            Photo.recipe_id == recipe_id, Photo.is_hero == True
+        )
+    ]
+    if previous:
+        db.query(Photo).filter(Photo.id.in_(previous)).update(
+            {"is_hero": False}, synchronize_session="fetch"
+        )
+        record_changes(db, user_id, "photo", previous, recipe_id)
+
+
+def _add_photos(
+    db: Session,
+    user_id: int,
+    recipe_id: int,
+    photos: List[Tuple[str, Optional[str]]],
+    hero_index: Optional[int] = None,
+) -> List[Photo]:
+    """
+    Insert (url, caption) photos in one transaction, making
+    photos[hero_index] the hero if given. Commits. Blocking (it may wait on
+    the recipe lock), so async endpoints run it on the threadpool.
+    """
+    _get_recipe(db, recipe_id, user_id, lock=hero_index is not None)
+    if hero_index is not None:
+        _unset_hero(db, user_id, recipe_id)
+    rows = [
+        Photo(
+            recipe_id=recipe_id,
+            user_id=user_id,
+            url=url,
+            caption=caption,
+            is_hero=index == hero_index,
+        )
+        for index, (url, caption) in enumerate(photos)
+    ]
+    db.add_all(rows)
+    db.flush()
+    ids = [row.id for row in rows]
+    db.commit()
+    return db.query(Photo).filter(Photo.id.in_(ids)).order_by(Photo.id).all()
 
 
 @router.post("/", response_model=PhotoSchema)
@@ -29,44 +115,145 @@ async def create_photo(
     """Upload a photo for a recipe."""
 
     # Verify recipe ownership
-    recipe = (
-        db.query(Recipe)
-        .filter(Recipe.id == recipe_id, Recipe.user_id == user_id)
-        .first()
-    )
+    await run_in_threadpool(_check_recipe, db, recipe_id, user_id)
 
-    if not recipe:
-        raise HTTPException(status_code=404, detail="Recipe not found")
+    file_content = await file.read()
+    if len(file_content) > settings.PHOTO_MAX_BYTES:
+        raise HTTPException(status_code=413, detail=f"{file.filename} is too large")
 
     # Upload to S3
     try:
-        file_content = await file.read()
         url = await upload_photo(file_content, file.filename, file.content_type)
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Upload failed: {str(e)}")
 
-    # If this is the hero photo, unset other hero photos
-    if is_hero:
-        db.query(Photo).filter(
-            Photo.recipe_id == recipe_id, Photo.is_hero == True
-        ).update({"is_hero": False})
-
-    # Create photo record
-    db_photo = Photo(
-        recipe_id=recipe_id, user_id=user_id, url=url, caption=caption, is_hero=is_hero
+    # Create photo record, unsetting the previous hero in the same transaction
+    photos = await run_in_threadpool(
+        _add_photos, db, user_id, recipe_id, [(url, caption)], 0 if is_hero else None
     )
+    return photos[0]
 
-    db.add(db_photo)
-    db.commit()
-    db.refresh(db_photo)
 
-    return db_photo
+@router.post("/batch", response_model=List[PhotoSchema])
+async def create_photos_batch(
+    recipe_id: int,
+    files: List[UploadFile] = File(...),
+    hero_index: Optional[int] = None,
+    db: Session = Depends(get_db),
+    user_id: int = Depends(get_current_user_id),
+):
+    """
+    Upload several photos for a recipe. Files are uploaded concurrently,
+    PHOTO_UPLOAD_CONCURRENCY at a time, and the photos are added in one
+    transaction: all of them or, if anything fails, none. `hero_index`
+    makes that file the recipe's hero photo.
+    """
+    if len(files) > settings.PHOTO_BATCH_MAX_FILES:
+        raise HTTPException(
+            status_code=400,
+            detail=f"At most {settings.PHOTO_BATCH_MAX_FILES} photos per batch",
+        )
+    if hero_index is not None and not 0 <= hero_index < len(files):
+        raise HTTPException(status_code=400, detail="hero_index is out of range")
+
+    await run_in_threadpool(_check_recipe, db, recipe_id, user_id)
+
+    contents = []
+    for file in files:
+        content = await file.read()
+        if len(content) > settings.PHOTO_MAX_BYTES:
+            raise HTTPException(status_code=413, detail=f"{file.filename} is too large")
+        contents.append((content, file.filename, file.content_type))
+
+    try:
+        urls = await upload_photos(contents)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Upload failed: {str(e)}")
+
+    try:
+        return await run_in_threadpool(
+            _add_photos,
+            db,
+            user_id,
+            recipe_id,
+            [(url, None) for url in urls],
+            hero_index,
+        )
+    except Exception:
+        # Nothing references the uploads now
+        await delete_photos(urls)
+        raise
+
+
+@router.post("/presign", response_model=List[PresignedPhotoUpload])
+def presign_photo_uploads(
+    body: PhotoPresignRequest,
+    db: Session = Depends(get_db),
+    user_id: int = Depends(get_current_user_id),
+):
+    """
+    Get presigned uploads so the client can send photos straight to the
+    bucket instead of through the API. POST each file as multipart form
+    data to `upload_url` with `fields`, then register the keys with
+    POST /photos/presigned. Signing is local, so this makes no S3 calls.
+    """
+    if len(body.files) > settings.PHOTO_BATCH_MAX_FILES:
+        raise HTTPException(
+            status_code=400,
+            detail=f"At most {settings.PHOTO_BATCH_MAX_FILES} photos per batch",
+        )
+    if any(not file.content_type.startswith("image/") for file in body.files):
+        raise HTTPException(status_code=400, detail="Only images can be uploaded")
+    _get_recipe(db, body.recipe_id, user_id)
+
+    return [
+        presign_photo_upload(user_id, file.filename, file.content_type)
+        for file in body.files
+    ]
+
+
+@router.post("/presigned", response_model=List[PhotoSchema])
+async def create_presigned_photos(
+    body: PresignedPhotosCreate,
+    db: Session = Depends(get_db),
+    user_id: int = Depends(get_current_user_id),
+):
+    """
+    Add photos uploaded with /photos/presign to a recipe, in one
+    transaction. Each key must belong to the user and have been uploaded.
+    """
+    keys = [photo.key for photo in body.photos]
+    if len(keys) > settings.PHOTO_BATCH_MAX_FILES or len(set(keys)) != len(keys):
+        raise HTTPException(status_code=400, detail="Invalid list of photos")
+    if any(not key.startswith(f"photos/{user_id}/") for key in keys):
+        raise HTTPException(status_code=400, detail="Unknown upload key")
+    if body.hero_key is not None and body.hero_key not in keys:
+        raise HTTPException(status_code=400, detail="hero_key is not in photos")
+
+    urls = [photo_url(key) for key in keys]
+    await run_in_threadpool(_check_recipe, db, body.recipe_id, user_id, urls)
+
+    uploaded = await photos_uploaded(keys)
+    missing = [key for key, ok in zip(keys, uploaded) if not ok]
+    if missing:
+        raise HTTPException(
+            status_code=400, detail=f"Not uploaded yet: {', '.join(missing)}"
+        )
+
+    return await run_in_threadpool(
+        _add_photos,
+        db,
+        user_id,
+        body.recipe_id,
+        [(url, photo.caption) for url, photo in zip(urls, body.photos)],
+        keys.index(body.hero_key) if body.hero_key is not None else None,
+    )
 
 
 @router.get("/recipe/{recipe_id}", response_model=List[PhotoSchema])
 def list_photos(
     recipe_id: int,
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     user_id: int = Depends(get_current_user_id),
 ):
     """Get all photos for a recipe."""
@@ -128,9 +315,8 @@ def set_hero_photo(
         raise HTTPException(status_code=404, detail="Photo not found")
 
     # Unset other hero photos for this recipe
-    db.query(Photo).filter(
-        Photo.recipe_id == photo.recipe_id, Photo.is_hero == True
-    ).update({"is_hero": False})
+    _get_recipe(db, photo.recipe_id, user_id, lock=True)
+    _unset_hero(db, user_id, photo.recipe_id)
 
     # Set this as hero
     photo.is_hero = True
@@ -0,0 +1,54 @@
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import ORJSONResponse
+from sqlalchemy.orm import Session
+from typing import List, Optional
+from app.api.deps import get_read_db
+from app.schemas import PublicRecipePage, Recipe as RecipeSchema, RecipeSummary
+from app.services.public_service import (
+    cache_headers,
+    get_public,
+    list_public,
+    search_public,
+)
+
+router = APIRouter()
+
+# No authentication on these routes: responses are identical for every
+# caller, which is what lets a CDN serve them.
+
+
+@router.get("/recipes", response_model=PublicRecipePage)
+def list_public_recipes(
+    limit: int = Query(20, ge=1, le=100),
+    cursor: Optional[str] = None,
+    db: Session = Depends(get_read_db),
+):
+    """Newest public recipes. Pass `next_cursor` as `cursor` for the next page."""
+    try:
+        page, keys = list_public(db, limit, cursor)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return ORJSONResponse(page, headers=cache_headers(keys))
+
+
+@router.get("/recipes/{recipe_id}", response_model=RecipeSchema)
+def get_public_recipe(recipe_id: int, db: Session = Depends(get_read_db)):
+    """Get a public recipe."""
+    recipe, keys = get_public(db, recipe_id)
+    if recipe is None:
+        # Cacheable too; publishing the recipe purges its key
+        raise HTTPException(
+            status_code=404, detail="Recipe not found", headers=cache_headers(keys)
+        )
+    return ORJSONResponse(recipe, headers=cache_headers(keys))
+
+
+@router.get("/search", response_model=List[RecipeSummary])
+def search_public_recipes(
+    q: str = Query(..., min_length=1, max_length=200),
+    limit: int = Query(20, ge=1, le=50),
+    db: Session = Depends(get_read_db),
+):
+    """Text search over public recipes."""
+    results, keys = search_public(db, q, limit)
+    return ORJSONResponse(results, headers=cache_headers(keys))
@@ -3,20 +3,14 @@ from sqlalchemy.orm import Session
 from sqlalchemy import func
 from typing import List
 from app.core.database import get_db
-from app.models import Rating, Recipe, User
+from app.api.deps import get_current_user_id, get_read_db
+from app.models import Rating, Recipe
 from app.schemas import RatingCreate, Rating as RatingSchema
+from app.services.leaderboard_service import update_recipe_stats
 
 router = APIRouter()
 
 
-def get_current_user_id(db: Session = Depends(get_db)) -> int:
-    """Get current user ID from auth token. TODO: Implement proper JWT auth."""
-    user = db.query(User).first()
-    if not user:
-        raise HTTPException(status_code=401, detail="Not authenticated")
-    return user.id
-
-
 @router.post("/", response_model=RatingSchema)
 def create_rating(
     rating: RatingCreate,
@@ -45,6 +39,7 @@ def create_rating(
     )
 
     db.add(db_rating)
+    update_recipe_stats(db, recipe.id, recipe.user_id)
     db.commit()
     db.refresh(db_rating)
 
@@ -54,7 +49,7 @@ def create_rating(
 @router.get("/recipe/{recipe_id}", response_model=List[RatingSchema])
 def list_ratings(
     recipe_id: int,
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     user_id: int = Depends(get_current_user_id),
 ):
     """Get all ratings for a recipe."""
@@ -103,6 +98,8 @@ def update_rating(
     if notes is not None:
         rating.notes = notes
 
+    if score is not None:
+        update_recipe_stats(db, rating.recipe_id, rating.user_id)
     db.commit()
     db.refresh(rating)
 
@@ -127,6 +124,7 @@ def delete_rating(
         raise HTTPException(status_code=404, detail="Rating not found")
 
     db.delete(rating)
+    update_recipe_stats(db, rating.recipe_id, rating.user_id)
     db.commit()
 
     return {"message": "Rating deleted"}
@@ -1,44 +1,109 @@
 from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import ORJSONResponse, StreamingResponse
 from sqlalchemy.orm import Session
-from sqlalchemy import func
-from typing import List, Optional
+from starlette.concurrency import run_in_threadpool
+from typing import List, Optional, Union, Literal
+import orjson
+from app.core.config import settings
+from app.core.circuit_breaker import CircuitOpenError
 from app.core.database import get_db
-from app.models import Recipe, RecipeTag, Tag, Rating, User
+from app.core.rate_limit import charge_tokens_to
+from app.api.deps import (
+    enforce_rate_limit,
+    get_current_user_id,
+    get_read_db,
+    llm_unavailable,
+    rate_limited,
+)
+from app.models import Recipe, RecipeTag
 from app.schemas import (
     RecipeCreate,
     RecipeUpdate,
     Recipe as RecipeSchema,
+    RecipeSummary,
     LLMGenerateRequest,
     LLMGenerateResponse,
-    Ingredient,
+    LLMBatchGenerateRequest,
+    LLMBatchGenerateResponse,
+)
+from app.services.llm_service import generate_batch, generate_recipe, revise_recipe
+from app.services.ingredient_service import sync_recipe_ingredients
+from app.services.recipe_service import (
+    enrich_recipes,
+    summary_load_options,
+    parse_fields,
+    needs_detail,
+    select_fields,
 )
-from app.services.llm_service import generate_recipe, revise_recipe
 
 router = APIRouter()
 
 
-def get_current_user_id(db: Session = Depends(get_db)) -> int:
-    """Get current user ID from auth token. TODO: Implement proper JWT auth."""
-    user = db.query(User).first()
-    if not user:
-        raise HTTPException(status_code=401, detail="Not authenticated")
-    return user.id
-
-
 @router.post("/generate", response_model=LLMGenerateResponse)
 async def generate_recipe_endpoint(
     request: LLMGenerateRequest,
     db: Session = Depends(get_db),
-    user_id: int = Depends(get_current_user_id),
+    user_id: int = Depends(rate_limited("generate")),
 ):
     """Generate a recipe using AI."""
     try:
-        result = await generate_recipe(request)
+        with charge_tokens_to(user_id):
+            result = await generate_recipe(request)
         return result
+    except CircuitOpenError as e:
+        raise llm_unavailable(e)
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
+@router.post("/generate/batch", response_model=LLMBatchGenerateResponse)
+async def generate_batch_endpoint(
+    batch: LLMBatchGenerateRequest,
+    stream: bool = Query(
+        True, description="Stream NDJSON results as they finish instead of one list"
+    ),
+    db: Session = Depends(get_db),
+    user_id: int = Depends(get_current_user_id),
+):
+    """
+    Generate several recipes concurrently (e.g. the courses of a menu).
+
+    Streams one JSON line per request as it completes, tagged with its
+    `index` in the request list. Failed or timed-out items are reported with
+    `status` and `error` without failing the batch. With `stream=false` the
+    results are returned together, in request order. Each recipe counts
+    against the "generate" rate limit.
+    """
+    if len(batch.requests) > settings.LLM_BATCH_MAX_ITEMS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"At most {settings.LLM_BATCH_MAX_ITEMS} recipes per batch",
+        )
+    # The limiter may be a Redis round trip; keep it off the event loop
+    await run_in_threadpool(
+        enforce_rate_limit, user_id, "generate", cost=len(batch.requests)
+    )
+
+    # Nothing else touches the database; don't hold a pooled connection
+    # for the length of the batch
+    db.close()
+
+    results = generate_batch(batch.requests)
+    if not stream:
+        with charge_tokens_to(user_id):
+            collected = sorted([r async for r in results], key=lambda r: r["index"])
+        return ORJSONResponse({"results": collected})
+
+    async def lines():
+        # generate_batch starts its tasks on the first iteration, so they
+        # inherit the billed user
+        with charge_tokens_to(user_id):
+            async for result in results:
+                yield orjson.dumps(result) + b"\n"
+
+    return StreamingResponse(lines(), media_type="application/x-ndjson")
+
+
 @router.post("/", response_model=RecipeSchema)
 def create_recipe(
     recipe: RecipeCreate,
@@ -68,6 +133,7 @@ def create_recipe(
         plating_notes=recipe.plating_notes,
         is_public=recipe.is_public,
     )
+    sync_recipe_ingredients(db_recipe)
 
     db.add(db_recipe)
     db.commit()
@@ -80,22 +146,34 @@ def create_recipe(
             db.add(recipe_tag)
         db.commit()
 
-    return get_recipe(db_recipe.id, db, user_id)
+    return enrich_recipe(db, db_recipe)
 
 
-@router.get("/", response_model=List[RecipeSchema])
+@router.get("/", response_model=List[Union[RecipeSummary, RecipeSchema]])
 def list_recipes(
     skip: int = 0,
     limit: int = 20,
     source: Optional[str] = None,
     tag_ids: Optional[str] = Query(None),
-    db: Session = Depends(get_db),
+    expand: Optional[Literal["full"]] = Query(
+        None, description='Pass "full" to return complete recipes instead of summaries'
+    ),
+    fields: Optional[str] = Query(
+        None, description="Comma-separated fields to return, e.g. title,hero_photo"
+    ),
+    db: Session = Depends(get_read_db),
     user_id: int = Depends(get_current_user_id),
 ):
     """List all recipes for the current user."""
 
+    selected = get_fieldset(fields)
+    full = expand == "full" or needs_detail(selected)
+
     query = db.query(Recipe).filter(Recipe.user_id == user_id)
 
+    if not full:
+        query = query.options(summary_load_options())
+
     if source:
         query = query.filter(Recipe.source == source)
 
@@ -106,21 +184,25 @@ def list_recipes(
     query = query.order_by(Recipe.created_at.desc())
     recipes = query.offset(skip).limit(limit).all()
 
-    result = []
-    for recipe in recipes:
-        result.append(enrich_recipe(db, recipe))
-
-    return result
+    # Payloads are built from trusted DB rows, so skip response_model validation
+    return ORJSONResponse(
+        select_fields(enrich_recipes(db, recipes, full=full), selected)
+    )
 
 
 @router.get("/{recipe_id}", response_model=RecipeSchema)
 def get_recipe(
     recipe_id: int,
-    db: Session = Depends(get_db),
+    fields: Optional[str] = Query(
+        None, description="Comma-separated fields to return, e.g. title,ingredients"
+    ),
+    db: Session = Depends(get_read_db),
     user_id: int = Depends(get_current_user_id),
 ):
     """Get a specific recipe."""
 
+    selected = get_fieldset(fields)
+
     recipe = (
         db.query(Recipe)
         .filter(Recipe.id == recipe_id, Recipe.user_id == user_id)
@@ -130,7 +212,7 @@ def get_recipe(
     if not recipe:
         raise HTTPException(status_code=404, detail="Recipe not found")
 
-    return enrich_recipe(db, recipe)
+    return ORJSONResponse(select_fields([enrich_recipe(db, recipe)], selected)[0])
 
 
 @router.put("/{recipe_id}", response_model=RecipeSchema)
@@ -151,30 +233,23 @@ def update_recipe(
     if not db_recipe:
         raise HTTPException(status_code=404, detail="Recipe not found")
 
-    # Update fields
+    # Update fields (model_dump already turns ingredients into plain dicts)
     update_data = recipe_update.model_dump(exclude_unset=True)
 
-    # Handle ingredients conversion
-    if "ingredients" in update_data and update_data["ingredients"]:
-        update_data["ingredients"] = [
-            ing.model_dump() for ing in update_data["ingredients"]
-        ]
-
     # Handle tags
     tag_ids = update_data.pop("tag_ids", None)
 
     for field, value in update_data.items():
         setattr(db_recipe, field, value)
 
+    if "ingredients" in update_data:
+        sync_recipe_ingredients(db_recipe)
+
     # Update tags if provided
     if tag_ids is not None:
-        # Remove existing tags
-        db.query(RecipeTag).filter(RecipeTag.recipe_id == recipe_id).delete()
-
-        # Add new tags
-        for tag_id in tag_ids:
-            recipe_tag = RecipeTag(recipe_id=recipe_id, tag_id=tag_id)
-            db.add(recipe_tag)
+        # Replace through the collection (delete-orphan removes the old rows)
+        # so flush hooks such as the change feed see the tag changes
+        db_recipe.tags = [RecipeTag(tag_id=tag_id) for tag_id in tag_ids]
 
     db.commit()
     db.refresh(db_recipe)
@@ -209,8 +284,13 @@ def delete_recipe(
 async def revise_recipe_endpoint(
     recipe_id: int,
     notes: str,
+    mode: Optional[Literal["patch", "full"]] = Query(
+        None,
+        description='"patch" returns only the changes from the model (fewer tokens); '
+        "defaults to LLM_REVISION_MODE",
+    ),
     db: Session = Depends(get_db),
-    user_id: int = Depends(get_current_user_id),
+    user_id: int = Depends(rate_limited("revise")),
 ):
     """Revise a recipe using AI based on user notes."""
 
@@ -228,71 +308,30 @@ async def revise_recipe_endpoint(
         "description": recipe.description,
         "ingredients": recipe.ingredients,
         "instructions": recipe.instructions,
+        "prep_time": recipe.prep_time,
+        "cook_time": recipe.cook_time,
         "equipment": recipe.equipment,
         "plating_notes": recipe.plating_notes,
     }
 
     try:
-        result = await revise_recipe(recipe_data, notes)
+        with charge_tokens_to(user_id):
+            result = await revise_recipe(recipe_data, notes, mode)
         return result
+    except CircuitOpenError as e:
+        raise llm_unavailable(e)
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
 
-def enrich_recipe(db: Session, recipe: Recipe) -> RecipeSchema:
+def enrich_recipe(db: Session, recipe: Recipe) -> dict:
     """Enrich recipe with ratings, tags, and photos."""
+    return enrich_recipes(db, [recipe], full=True)[0]
 
-    # Get average rating
-    avg_rating = (
-        db.query(func.avg(Rating.score)).filter(Rating.recipe_id == recipe.id).scalar()
-    )
-    rating_count = (
-        db.query(func.count(Rating.id)).filter(Rating.recipe_id == recipe.id).scalar()
-    )
-
-    # Get tags
-    tags = db.query(Tag).join(RecipeTag).filter(RecipeTag.recipe_id == recipe.id).all()
-
-    # Use hero_photo column if present, else fallback to related photo
-    hero_photo_url = recipe.hero_photo if getattr(recipe, "hero_photo", None) else None
-    if not hero_photo_url:
-        hero_photo = next((p for p in recipe.photos if p.is_hero), None)
-        if not hero_photo and recipe.photos:
-            hero_photo = recipe.photos[0]
-        hero_photo_url = hero_photo.url if hero_photo else None
-
-    # Convert ingredients back to Pydantic models
-    ingredients = (
-        [Ingredient(**ing) for ing in recipe.ingredients] if recipe.ingredients else []
-    )
 
-    return RecipeSchema(
-        id=recipe.id,
-        user_id=recipe.user_id,
-        title=recipe.title,
-        description=recipe.description,
-        source=recipe.source,
-        base_prompt=recipe.base_prompt,
-        instructions=recipe.instructions,
-        ingredients=ingredients,
-        servings=recipe.servings,
-        prep_time=recipe.prep_time,
-        cook_time=recipe.cook_time,
-        equipment=recipe.equipment,
-        plating_notes=recipe.plating_notes,
-        is_public=recipe.is_public,
-        created_at=recipe.created_at,
-        updated_at=recipe.updated_at,
-        avg_rating=float(avg_rating) if avg_rating else None,
-        rating_count=rating_count or 0,
-        tags=[
-            {
-                "id": t.id,
-                "name": t.name,
-                "type": t.type,
-                "created_at": t.created_at,
-            }
-            for t in tags
-        ],
-        hero_photo=hero_photo_url,
-    )
+def get_fieldset(fields: Optional[str]) -> Optional[List[str]]:
+    """Parse a `fields=` query parameter, rejecting unknown names."""
+    try:
+        return parse_fields(fields)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
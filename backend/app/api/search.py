@@ -1,26 +1,36 @@
 from fastapi import APIRouter, Depends, HTTPException
+from fastapi.responses import ORJSONResponse
 from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
 from app.core.database import get_db
-from app.models import User
-from app.schemas import SearchRequest, SearchResponse, LLMGenerateRequest
+from app.core.rate_limit import RateLimitExceeded, charge_tokens_to, limiter
+from app.api.deps import get_current_user_id, get_read_db
+from app.models import Recipe
+from app.schemas import (
+    SearchRequest,
+    SearchResponse,
+    LLMGenerateRequest,
+    PantrySearchRequest,
+    PantrySearchResponse,
+)
 from app.services.search_service import search_recipes, should_suggest_llm
-from app.services.llm_service import generate_recipe
+from app.services.ingredient_service import pantry_search
+from app.services.llm_service import generate_recipe, llm_available
+from app.services.recipe_service import (
+    enrich_recipes,
+    summary_load_options,
+    parse_fields,
+    needs_detail,
+    select_fields,
+)
 
 router = APIRouter()
 
 
-def get_current_user_id(db: Session = Depends(get_db)) -> int:
-    """Get current user ID from auth token. TODO: Implement proper JWT auth."""
-    user = db.query(User).first()
-    if not user:
-        raise HTTPException(status_code=401, detail="Not authenticated")
-    return user.id
-
-
 @router.post("/", response_model=SearchResponse)
 async def search(
     request: SearchRequest,
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     user_id: int = Depends(get_current_user_id),
 ):
     """
@@ -28,33 +38,86 @@ async def search(
     Searches internal recipes and optionally generates new ones with AI.
     """
 
+    try:
+        selected = parse_fields(request.fields)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
     # Search internal recipes
-    internal_results = search_recipes(
-        db=db,
-        user_id=user_id,
-        query=request.query,
-        filters=request.filters,
-        limit=request.limit,
-    )
+    try:
+        internal_results = search_recipes(
+            db=db,
+            user_id=user_id,
+            query=request.query,
+            filters=request.filters,
+            limit=request.limit,
+            expand=request.expand == "full" or needs_detail(selected),
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
 
     # Determine if we should suggest LLM generation
     suggest_llm = should_suggest_llm(internal_results, request.query)
 
     # Optionally generate LLM result
     llm_result = None
-    if suggest_llm and len(internal_results) < 3:
+    # Skipped outright while the LLM's circuit is open, so search stays fast
+    # when the upstream is slow or down
+    if suggest_llm and len(internal_results) < 3 and llm_available("generate"):
         try:
-            # Generate recipe proactively for better UX
+            # Generate recipe proactively for better UX, unless the user is
+            # over their limits; the client can still ask via /generate
+            await run_in_threadpool(limiter.check, user_id, "search_generate")
             llm_request = LLMGenerateRequest(
                 prompt=request.query, style="restaurant-style", servings=4
             )
-            llm_result = await generate_recipe(llm_request)
+            with charge_tokens_to(user_id):
+                llm_result = await generate_recipe(llm_request)
+        except RateLimitExceeded:
+            pass
         except Exception as e:
             # Don't fail the whole request if LLM fails
             print(f"LLM generation failed: {e}")
 
-    return SearchResponse(
-        internal_results=internal_results,
-        suggest_llm=suggest_llm,
-        llm_result=llm_result,
+    return ORJSONResponse(
+        {
+            "internal_results": select_fields(internal_results, selected),
+            "suggest_llm": suggest_llm,
+            "llm_result": llm_result.model_dump() if llm_result else None,
+        }
+    )
+
+
+@router.post("/pantry", response_model=PantrySearchResponse)
+def search_pantry(
+    request: PantrySearchRequest,
+    db: Session = Depends(get_read_db),
+    user_id: int = Depends(get_current_user_id),
+):
+    """
+    "What can I cook" search.
+    Ranks recipes by how many of their ingredients are on hand.
+    """
+
+    matches = pantry_search(
+        db=db,
+        user_id=user_id,
+        pantry=request.ingredients,
+        limit=request.limit,
+        max_missing=request.max_missing,
+    )
+
+    recipes = (
+        db.query(Recipe)
+        .options(summary_load_options())
+        .filter(Recipe.id.in_([m["recipe_id"] for m in matches]))
+        .all()
     )
+    summaries = {summary["id"]: summary for summary in enrich_recipes(db, recipes)}
+
+    results = []
+    for match in matches:
+        recipe_id = match.pop("recipe_id")
+        results.append({"recipe": summaries[recipe_id], **match})
+
+    return ORJSONResponse({"results": results})
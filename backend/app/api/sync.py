@@ -0,0 +1,28 @@
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import ORJSONResponse
+from sqlalchemy.orm import Session
+from typing import Optional
+from app.api.deps import get_current_user_id, get_read_db
+from app.schemas import ChangeFeed
+from app.services.change_feed import changes_since
+
+router = APIRouter()
+
+
+@router.get("/changes", response_model=ChangeFeed)
+def get_changes(
+    cursor: Optional[str] = None,
+    limit: int = Query(500, ge=1, le=1000),
+    db: Session = Depends(get_read_db),
+    user_id: int = Depends(get_current_user_id),
+):
+    """
+    Recipes, ratings and photos changed since `cursor`. Omit the cursor for
+    a full sync, then keep requesting with the returned `cursor` while
+    `has_more` is true; store the last one and poll with it later, after
+    `retry_after` seconds when that is set.
+    """
+    try:
+        return ORJSONResponse(changes_since(db, user_id, cursor, limit))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
@@ -1,21 +1,16 @@
 from fastapi import APIRouter, Depends, HTTPException
+from fastapi.responses import ORJSONResponse
 from sqlalchemy.orm import Session
 from typing import List, Optional
 from app.core.database import get_db
-from app.models import Tag, User
+from app.api.deps import get_current_user_id, get_read_db
+from app.models import Tag
 from app.schemas import TagCreate, Tag as TagSchema
+from app.services.tag_service import tag_cache, tag_catalog
 
 router = APIRouter()
 
 
-def get_current_user_id(db: Session = Depends(get_db)) -> int:
-    """Get current user ID from auth token. TODO: Implement proper JWT auth."""
-    user = db.query(User).first()
-    if not user:
-        raise HTTPException(status_code=401, detail="Not authenticated")
-    return user.id
-
-
 @router.post("/", response_model=TagSchema)
 def create_tag(
     tag: TagCreate,
@@ -33,6 +28,7 @@ def create_tag(
     db.add(db_tag)
     db.commit()
     db.refresh(db_tag)
+    tag_cache.invalidate("tags")
 
     return db_tag
 
@@ -40,24 +36,17 @@ def create_tag(
 @router.get("/", response_model=List[TagSchema])
 def list_tags(
     type: Optional[str] = None,
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     user_id: int = Depends(get_current_user_id),
 ):
     """List all tags, optionally filtered by type."""
-
-    query = db.query(Tag)
-
-    if type:
-        query = query.filter(Tag.type == type)
-
-    tags = query.order_by(Tag.name).all()
-    return tags
+    return ORJSONResponse(tag_catalog(db, type))
 
 
 @router.get("/{tag_id}", response_model=TagSchema)
 def get_tag(
     tag_id: int,
-    db: Session = Depends(get_db),
+    db: Session = Depends(get_read_db),
     user_id: int = Depends(get_current_user_id),
 ):
     """Get a specific tag."""
@@ -85,5 +74,6 @@ def delete_tag(
 
     db.delete(tag)
     db.commit()
+    tag_cache.invalidate("tags")
 
     return {"message": "Tag deleted"}
@@ -0,0 +1,400 @@
+"""
+Shared cache with pluggable backends.
+
+`MemoryBackend` keeps everything in-process (tests, single worker);
+`RedisBackend` talks the Redis protocol so every uvicorn worker shares one
+cache. Values are stored as orjson bytes in both, so cached payloads behave
+the same whichever backend is configured.
+"""
+
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Iterable, Optional, Tuple
+
+import orjson
+
+from app.core.config import settings
+
+
+class CacheStats:
+    """Hit/miss counters for one cache namespace."""
+
+    def __init__(self):
+        self.hits = 0
+        self.misses = 0
+        self.sets = 0
+        self.invalidations = 0
+        self._lock = threading.Lock()
+
+    def incr(self, field: str, amount: int = 1) -> None:
+        with self._lock:
+            setattr(self, field, getattr(self, field) + amount)
+
+    def as_dict(self) -> Dict[str, int]:
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "sets": self.sets,
+            "invalidations": self.invalidations,
+        }
+
+
+class CacheBackend:
+    """Storage interface shared by the in-memory and Redis backends."""
+
+    def get(self, key: str) -> Optional[bytes]:
+        raise NotImplementedError
+
+    def set(
+        self,
+        key: str,
+        value: bytes,
+        ttl: Optional[float] = None,
+        tags: Iterable[str] = (),
+    ) -> None:
+        raise NotImplementedError
+
+    def delete(self, *keys: str) -> None:
+        raise NotImplementedError
+
+    def invalidate_tags(self, *tags: str) -> int:
+        """Delete every key associated with any of the tags; returns the count."""
+        raise NotImplementedError
+
+    def acquire_lock(self, key: str, timeout: float) -> Optional[str]:
+        """Try to take a short-lived lock; returns a token when acquired."""
+        raise NotImplementedError
+
+    def release_lock(self, key: str, token: str) -> None:
+        raise NotImplementedError
+
+
+class MemoryBackend(CacheBackend):
+    """
+    Process-local backend. Expired entries are swept on writes, at most once
+    per SWEEP_INTERVAL seconds, and past `max_entries` the least recently
+    used entries are evicted, so memory stays bounded without a background
+    thread. Removing an entry also drops it from its tag sets.
+    """
+
+    SWEEP_INTERVAL = 1.0
+
+    def __init__(self, max_entries: int = 10000):
+        self.max_entries = max_entries
+        # key -> (value, expires_at, tags), least recently used first
+        self._data: OrderedDict = OrderedDict()
+        self._tags: Dict[str, set] = {}
+        self._locks: Dict[str, Tuple[str, float]] = {}
+        self._next_sweep = 0.0
+        self._mutex = threading.Lock()
+
+    def get(self, key: str) -> Optional[bytes]:
+        with self._mutex:
+            entry = self._data.get(key)
+            if entry is None:
+                return None
+            value, expires_at, _ = entry
+            if expires_at is not None and expires_at <= time.monotonic():
+                self._remove(key)
+                return None
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key, value, ttl=None, tags=()):
+        now = time.monotonic()
+        expires_at = now + ttl if ttl else None
+        tags = tuple(tags)
+        with self._mutex:
+            self._remove(key)
+            self._data[key] = (value, expires_at, tags)
+            for tag in tags:
+                self._tags.setdefault(tag, set()).add(key)
+            if now >= self._next_sweep:
+                self._sweep(now)
+            while len(self._data) > self.max_entries:
+                self._remove(next(iter(self._data)))
+
+    def delete(self, *keys):
+        with self._mutex:
+            for key in keys:
+                self._remove(key)
+
+    def invalidate_tags(self, *tags):
+        with self._mutex:
+            keys = set()
+            for tag in tags:
+                keys |= self._tags.get(tag, set())
+            for key in keys:
+                self._remove(key)
+            return len(keys)
+
+    def _remove(self, key: str) -> None:
+        # Caller holds the mutex
+        entry = self._data.pop(key, None)
+        if entry is None:
+            return
+        for tag in entry[2]:
+            members = self._tags.get(tag)
+            if members is not None:
+                members.discard(key)
+                if not members:
+                    del self._tags[tag]
+
+    def _sweep(self, now: float) -> None:
+        # Caller holds the mutex
+        self._next_sweep = now + self.SWEEP_INTERVAL
+        expired = [
+            key
+            for key, (_, expires_at, _) in self._data.items()
+            if expires_at is not None and expires_at <= now
+        ]
+        for key in expired:
+            self._remove(key)
+        self._locks = {key: held for key, held in self._locks.items() if held[1] > now}
+
+    def acquire_lock(self, key, timeout):
+        now = time.monotonic()
+        with self._mutex:
+            held = self._locks.get(key)
+            if held and held[1] > now:
+                return None
+            token = uuid.uuid4().hex
+            self._locks[key] = (token, now + timeout)
+            return token
+
+    def release_lock(self, key, token):
+        with self._mutex:
+            held = self._locks.get(key)
+            if held and held[0] == token:
+                del self._locks[key]
+
+
+# Adds ARGV[1] to each tag set (KEYS) and stretches the set's TTL to cover
+# the member's (ARGV[2] ms, 0 for none), so a tag set expires once none of
+# its members can still be live. A member without a TTL makes it persistent.
+_ADD_TO_TAGS_SCRIPT = """
+local ttl = tonumber(ARGV[2])
+for _, tag in ipairs(KEYS) do
+    local existed = redis.call('EXISTS', tag) == 1
+    redis.call('SADD', tag, ARGV[1])
+    if ttl == 0 then
+        redis.call('PERSIST', tag)
+    else
+        local current = redis.call('PTTL', tag)
+        if not existed or (current >= 0 and current < ttl) then
+            redis.call('PEXPIRE', tag, ttl)
+        end
+    end
+end
+return 0
+"""
+
+
+class RedisBackend(CacheBackend):
+    """
+    Redis protocol backend. Tags are Redis sets of member keys, so any
+    RESP-speaking server with Lua scripting (Redis, KeyDB, Dragonfly)
+    works. Keys expire on their own; tag sets live as long as their
+    longest-lived member.
+    """
+
+    def __init__(self, url: str):
+        import redis
+
+        self._client = redis.Redis.from_url(url)
+        self._watch_error = redis.WatchError
+        self._add_to_tags = self._client.register_script(_ADD_TO_TAGS_SCRIPT)
+
+    def get(self, key):
+        return self._client.get(key)
+
+    def set(self, key, value, ttl=None, tags=()):
+        ttl_ms = int(ttl * 1000) if ttl else None
+        tag_keys = [f"tag:{tag}" for tag in tags]
+        pipe = self._client.pipeline()
+        pipe.set(key, value, px=ttl_ms)
+        if tag_keys:
+            self._add_to_tags(keys=tag_keys, args=[key, ttl_ms or 0], client=pipe)
+            # Reverse index so delete() can drop the key from its tag sets
+            index_key = f"tagsof:{key}"
+            pipe.delete(index_key)
+            pipe.sadd(index_key, *tag_keys)
+            if ttl_ms:
+                pipe.pexpire(index_key, ttl_ms)
+        pipe.execute()
+
+    def delete(self, *keys):
+        if not keys:
+            return
+        index_keys = [f"tagsof:{key}" for key in keys]
+        pipe = self._client.pipeline()
+        for index_key in index_keys:
+            pipe.smembers(index_key)
+        tag_keys = pipe.execute()
+        for key, tags in zip(keys, tag_keys):
+            for tag_key in tags:
+                pipe.srem(tag_key, key)
+        pipe.delete(*keys, *index_keys)
+        pipe.execute()
+
+    def invalidate_tags(self, *tags):
+        if not tags:
+            return 0
+        tag_keys = [f"tag:{tag}" for tag in tags]
+        keys = set()
+        for tag_key in tag_keys:
+            keys |= self._client.smembers(tag_key)
+        index_keys = [b"tagsof:" + key for key in keys]
+        self._client.delete(*keys, *index_keys, *tag_keys)
+        return len(keys)
+
+    def acquire_lock(self, key, timeout):
+        token = uuid.uuid4().hex
+        if self._client.set(key, token, nx=True, px=int(timeout * 1000)):
+            return token
+        return None
+
+    def release_lock(self, key, token):
+        # Delete the lock only if we still own it (it may have expired and
+        # been taken by another worker)
+        with self._client.pipeline() as pipe:
+            try:
+                pipe.watch(key)
+                if pipe.get(key) == token.encode():
+                    pipe.multi()
+                    pipe.delete(key)
+                    pipe.execute()
+                else:
+                    pipe.unwatch()
+            except self._watch_error:
+                pass
+
+
+def create_backend(url: str) -> CacheBackend:
+    """Build a backend from a URL; empty or memory:// selects the in-process one."""
+    if not url or url.startswith("memory://"):
+        return MemoryBackend(settings.CACHE_MAX_ENTRIES)
+    if url.startswith(("redis://", "rediss://", "unix://")):
+        return RedisBackend(url)
+    raise ValueError(f"Unsupported cache URL: {url}")
+
+
+_MISSING = object()
+
+
+class Cache:
+    """
+    Namespaced cache front-end with JSON serialization, tag invalidation,
+    hit/miss stats and single-flight loading.
+    """
+
+    def __init__(
+        self,
+        backend: CacheBackend,
+        namespace: str = "default",
+        default_ttl: Optional[float] = None,
+        _stats: Optional[Dict[str, CacheStats]] = None,
+    ):
+        self.backend = backend
+        self.name = namespace
+        self.default_ttl = default_ttl
+        self._all_stats = _stats if _stats is not None else {}
+        self.stats = self._all_stats.setdefault(namespace, CacheStats())
+        # Striped locks keep single-flight bookkeeping bounded
+        self._flights = [threading.Lock() for _ in range(64)]
+
+    def namespace(self, name: str, default_ttl: Optional[float] = None) -> "Cache":
+        """Return a view of this cache with its own key prefix and stats."""
+        return Cache(
+            self.backend,
+            namespace=name,
+            default_ttl=default_ttl if default_ttl is not None else self.default_ttl,
+            _stats=self._all_stats,
+        )
+
+    def all_stats(self) -> Dict[str, Dict[str, int]]:
+        return {name: stats.as_dict() for name, stats in self._all_stats.items()}
+
+    def _key(self, key: str) -> str:
+        return f"{self.name}:{key}"
+
+    def get(self, key: str, default: Any = None) -> Any:
+        raw = self.backend.get(self._key(key))
+        if raw is None:
+            self.stats.incr("misses")
+            return default
+        self.stats.incr("hits")
+        return orjson.loads(raw)
+
+    def set(
+        self,
+        key: str,
+        value: Any,
+        ttl: Optional[float] = None,
+        tags: Iterable[str] = (),
+    ) -> None:
+        self.backend.set(
+            self._key(key),
+            orjson.dumps(value),
+            ttl=ttl if ttl is not None else self.default_ttl,
+            tags=tags,
+        )
+        self.stats.incr("sets")
+
+    def delete(self, key: str) -> None:
+        self.backend.delete(self._key(key))
+
+    def invalidate(self, *tags: str) -> int:
+        count = self.backend.invalidate_tags(*tags)
+        self.stats.incr("invalidations", count)
+        return count
+
+    def get_or_set(
+        self,
+        key: str,
+        loader: Callable[[], Any],
+        ttl: Optional[float] = None,
+        tags: Iterable[str] = (),
+        lock_timeout: float = 10.0,
+    ) -> Any:
+        """
+        Return the cached value, computing it with `loader` on a miss.
+
+        Concurrent misses for the same key are collapsed: threads in this
+        process queue on a local lock, and other processes wait on a backend
+        lock, so the loader runs once per expiry instead of once per request.
+        """
+        value = self.get(key, _MISSING)
+        if value is not _MISSING:
+            return value
+
+        with self._flight(key):
+            raw = self.backend.get(self._key(key))
+            if raw is not None:
+                return orjson.loads(raw)
+
+            lock_key = f"lock:{self._key(key)}"
+            token = self.backend.acquire_lock(lock_key, lock_timeout)
+            if token is None:
+                # Another worker is loading; wait for its result
+                deadline = time.monotonic() + lock_timeout
+                while time.monotonic() < deadline:
+                    time.sleep(0.01)
+                    raw = self.backend.get(self._key(key))
+                    if raw is not None:
+                        return orjson.loads(raw)
+            try:
+                value = loader()
+                self.set(key, value, ttl=ttl, tags=tags)
+                return value
+            finally:
+                if token is not None:
+                    self.backend.release_lock(lock_key, token)
+
+    def _flight(self, key: str) -> threading.Lock:
+        return self._flights[hash(key) % len(self._flights)]
+
+
+cache = Cache(create_backend(settings.CACHE_URL), default_ttl=settings.CACHE_TTL)
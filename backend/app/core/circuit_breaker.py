@@ -0,0 +1,139 @@
+"""
+Circuit breaker for slow or failing upstream dependencies.
+
+A breaker watches the outcome of the last `window` calls. A call that
+raises or takes longer than `slow_call_seconds` counts as a failure. Once
+at least `min_calls` have been seen and the failure share reaches
+`failure_rate`, the circuit opens: calls are refused immediately with
+CircuitOpenError for `open_seconds`, instead of piling up behind a dead
+upstream. After that the circuit is half-open and lets a single probe call
+through. If the probe succeeds the circuit closes with a fresh window. If
+it fails, the circuit opens again.
+
+State is per process. Each worker trips on its own traffic, which is good
+enough for shedding load from an upstream that's down for everyone.
+"""
+
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from typing import Deque, Iterator
+
+from app.core.metrics import CIRCUIT_REJECTED, CIRCUIT_STATE
+
+CLOSED = "closed"
+HALF_OPEN = "half_open"
+OPEN = "open"
+
+_STATE_VALUES = {CLOSED: 0, HALF_OPEN: 1, OPEN: 2}
+
+
+class CircuitOpenError(Exception):
+    """The circuit is open; `retry_after` is in seconds."""
+
+    def __init__(self, name: str, retry_after: float):
+        super().__init__(f"{name} is unavailable (circuit open)")
+        self.name = name
+        self.retry_after = retry_after
+
+
+class CircuitBreaker:
+    def __init__(
+        self,
+        name: str,
+        window: int = 20,
+        min_calls: int = 10,
+        failure_rate: float = 0.5,
+        slow_call_seconds: float = 20.0,
+        open_seconds: float = 30.0,
+    ):
+        self.name = name
+        self.min_calls = min_calls
+        self.failure_rate = failure_rate
+        self.slow_call_seconds = slow_call_seconds
+        self.open_seconds = open_seconds
+        self.state = CLOSED
+        self._outcomes: Deque[bool] = deque(maxlen=window)  # True for a failure
+        self._opened_at = 0.0
+        self._probing = False
+        # Bumped on every state change; a call's outcome only counts in the
+        # epoch it started in
+        self._epoch = 0
+        self._lock = threading.Lock()
+        CIRCUIT_STATE.labels(name).set(0)
+
+    def _set_state(self, state: str) -> None:
+        self.state = state
+        self._epoch += 1
+        CIRCUIT_STATE.labels(self.name).set(_STATE_VALUES[state])
+
+    def _open(self) -> None:
+        self._opened_at = time.monotonic()
+        self._probing = False
+        self._set_state(OPEN)
+
+    def retry_after(self) -> float:
+        """Seconds until a call may be let through (0 when one would be now)."""
+        with self._lock:
+            if self.state == OPEN:
+                return max(0.0, self._opened_at + self.open_seconds - time.monotonic())
+            if self.state == HALF_OPEN and self._probing:
+                return 1.0
+            return 0.0
+
+    def allows_calls(self) -> bool:
+        """Whether a call made now would be let through, without making one."""
+        return self.retry_after() == 0
+
+    def _before_call(self) -> int:
+        """Admit a call or raise CircuitOpenError; returns the call's epoch."""
+        with self._lock:
+            if self.state == OPEN:
+                remaining = self._opened_at + self.open_seconds - time.monotonic()
+                if remaining > 0:
+                    CIRCUIT_REJECTED.labels(self.name).inc()
+                    raise CircuitOpenError(self.name, remaining)
+                self._set_state(HALF_OPEN)
+            if self.state == HALF_OPEN:
+                if self._probing:
+                    CIRCUIT_REJECTED.labels(self.name).inc()
+                    raise CircuitOpenError(self.name, 1.0)
+                self._probing = True
+            return self._epoch
+
+    def _record(self, epoch: int, failed: bool) -> None:
+        with self._lock:
+            if epoch != self._epoch:
+                # Started before the last state change, e.g. a slow call from
+                # before the circuit opened finishing while the probe runs
+                return
+            if self.state == HALF_OPEN:
+                if failed:
+                    self._open()
+                else:
+                    self._outcomes.clear()
+                    self._probing = False
+                    self._set_state(CLOSED)
+            elif self.state == CLOSED:
+                self._outcomes.append(failed)
+                if (
+                    len(self._outcomes) >= self.min_calls
+                    and sum(self._outcomes) / len(self._outcomes) >= self.failure_rate
+                ):
+                    self._open()
+
+    @contextmanager
+    def call(self) -> Iterator[None]:
+        """
+        Guard one call to the upstream. Raises CircuitOpenError without
+        entering the block when the circuit refuses it.
+        """
+        epoch = self._before_call()
+        start = time.perf_counter()
+        failed = True
+        try:
+            yield
+            failed = time.perf_counter() - start >= self.slow_call_seconds
+        finally:
+            self._record(epoch, failed)
@@ -1,10 +1,172 @@
-from sqlalchemy import create_engine
+from collections import defaultdict
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+import itertools
+import logging
+import threading
+import time
+from sqlalchemy import create_engine, event
+from sqlalchemy.engine import Engine, make_url
+from sqlalchemy.pool import StaticPool
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy.orm import Session, sessionmaker
+from sqlalchemy.sql.dml import UpdateBase
+from app.core.cache import cache
 from app.core.config import settings
 
-engine = create_engine(settings.DATABASE_URL)
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+logger = logging.getLogger(__name__)
+
+
+def _set_sqlite_pragmas(dbapi_connection, connection_record):
+    cursor = dbapi_connection.cursor()
+    # WAL lets readers proceed during a write; "memory" databases ignore it
+    cursor.execute("PRAGMA journal_mode=WAL")
+    cursor.execute("PRAGMA synchronous=NORMAL")
+    cursor.execute("PRAGMA foreign_keys=ON")
+    cursor.execute("PRAGMA busy_timeout=5000")
+    cursor.close()
+
+
+def create_db_engine(url: str, **kwargs) -> Engine:
+    """
+    create_engine with per-dialect setup. SQLite connections are shared
+    across the threadpool, get WAL and foreign keys, and an in-memory
+    database uses a single connection so every session sees the same data.
+    """
+    if make_url(url).get_backend_name() != "sqlite":
+        return create_engine(url, **kwargs)
+
+    kwargs.setdefault("connect_args", {})["check_same_thread"] = False
+    if make_url(url).database in (None, "", ":memory:"):
+        kwargs["poolclass"] = StaticPool
+    sqlite_engine = create_engine(url, **kwargs)
+    event.listen(sqlite_engine, "connect", _set_sqlite_pragmas)
+    return sqlite_engine
+
+
+engine = create_db_engine(settings.DATABASE_URL)
+
+
+class ReplicaSet:
+    """
+    Round-robin over read replicas. A replica that fails to connect or drops
+    its connection is skipped for REPLICA_RETRY_SECONDS; when none are
+    healthy, reads fall back to the primary.
+    """
+
+    def __init__(self, urls: List[str], retry_after: float):
+        self.engines = [create_db_engine(url, pool_pre_ping=True) for url in urls]
+        self.retry_after = retry_after
+        self._down_until: Dict[Engine, float] = {}
+        self._verified: set = set()
+        self._cycle = itertools.cycle(self.engines)
+        self._lock = threading.Lock()
+        for replica in self.engines:
+            event.listen(replica, "handle_error", self._handle_error)
+
+    def choose(self) -> Optional[Engine]:
+        for _ in range(len(self.engines)):
+            with self._lock:
+                replica = next(self._cycle)
+                if self._down_until.get(replica, 0) > time.monotonic():
+                    continue
+                verified = replica in self._verified
+            if verified or self._probe(replica):
+                return replica
+        return None
+
+    def _probe(self, replica: Engine) -> bool:
+        """
+        Connect before first use and after an outage, so a dead replica is
+        skipped rather than failing the request.
+        """
+        try:
+            with replica.connect():
+                pass
+        except Exception:
+            return False  # handle_error has already marked it down
+        with self._lock:
+            self._verified.add(replica)
+        return True
+
+    def mark_down(self, replica: Engine) -> None:
+        with self._lock:
+            self._down_until[replica] = time.monotonic() + self.retry_after
+            self._verified.discard(replica)
+        logger.warning(
+            "Read replica %s marked unhealthy for %ss",
+            replica.url.render_as_string(hide_password=True),
+            self.retry_after,
+        )
+
+    def _handle_error(self, context) -> None:
+        # No connection means the connect itself failed
+        if context.is_disconnect or context.connection is None:
+            self.mark_down(context.engine)
+
+
+replicas = ReplicaSet(settings.DATABASE_REPLICA_URLS, settings.REPLICA_RETRY_SECONDS)
+
+# Users who wrote within the stickiness window read from the primary, so they
+# see their own changes despite replication lag
+_recent_writes = cache.namespace("recent-writes")
+
+
+def mark_recent_write(user_id: int) -> None:
+    if replicas.engines and settings.REPLICA_STICKY_SECONDS:
+        _recent_writes.set(str(user_id), True, ttl=settings.REPLICA_STICKY_SECONDS)
+
+
+def wrote_recently(user_id: int) -> bool:
+    return bool(_recent_writes.get(str(user_id)))
+
+
+class RoutingSession(Session):
+    """
+    Sends reads to a replica when the session is marked read-only (see
+    get_read_db) and everything else to the primary. A session sticks to
+    one replica for its lifetime and switches to the primary for good once
+    it writes or its user has written recently.
+
+    Session.info keys: "read_only" (set by get_read_db), "user_id" (set by
+    the auth dependency) and "replica" / "wrote" (routing state).
+    """
+
+    def get_bind(self, mapper=None, clause=None, **kw):
+        if (
+            not self.info.get("read_only")
+            or self._flushing
+            or isinstance(clause, UpdateBase)
+        ):
+            return engine
+        if "replica" not in self.info:
+            user_id = self.info.get("user_id")
+            if user_id is None:
+                # Identity not known yet (the auth lookup itself); don't pin
+                return replicas.choose() or engine
+            self.info["replica"] = (
+                None if wrote_recently(user_id) else replicas.choose()
+            )
+        return self.info["replica"] or engine
+
+
+@event.listens_for(RoutingSession, "after_flush")
+def _after_flush(session, flush_context):
+    session.info["wrote"] = True
+    session.info["replica"] = None
+
+
+@event.listens_for(RoutingSession, "after_commit")
+def _after_commit(session):
+    user_id = session.info.get("user_id")
+    if session.info.pop("wrote", False) and user_id is not None:
+        mark_recent_write(user_id)
+
+
+SessionLocal = sessionmaker(
+    class_=RoutingSession, autocommit=False, autoflush=False, bind=engine
+)
 
 Base = declarative_base()
 
@@ -15,3 +177,64 @@ def get_db():
         yield db
     finally:
         db.close()
+
+
+class QueryStats:
+    """SQL statements issued while a request (or test block) is being served."""
+
+    def __init__(self, record_statements: bool = False):
+        self.count = 0
+        self.duration = 0.0
+        self.record_statements = record_statements
+        self.statements: List[Tuple[str, Any, float]] = []
+
+    def record(self, statement: str, parameters: Any, elapsed: float) -> None:
+        self.count += 1
+        self.duration += elapsed
+        if self.record_statements:
+            self.statements.append((statement, parameters, elapsed))
+
+    def repeated_statements(self, threshold: int) -> Dict[str, int]:
+        """
+        Statements run at least `threshold` times with differing parameters,
+        the signature of a per-row query inside a loop (N+1).
+        """
+        params: Dict[str, set] = defaultdict(set)
+        for statement, parameters, _ in self.statements:
+            params[statement].add(repr(parameters))
+        return {
+            statement: len(seen)
+            for statement, seen in params.items()
+            if len(seen) >= threshold
+        }
+
+
+_active_query_stats: ContextVar[Tuple[QueryStats, ...]] = ContextVar(
+    "active_query_stats", default=()
+)
+
+
+@contextmanager
+def track_queries(record_statements: bool = False) -> Iterator[QueryStats]:
+    """
+    Record SQL issued from the current context. Scopes nest, so request
+    metrics, debug headers and test budgets can each track independently.
+    """
+    stats = QueryStats(record_statements)
+    token = _active_query_stats.set(_active_query_stats.get() + (stats,))
+    try:
+        yield stats
+    finally:
+        _active_query_stats.reset(token)
+
+
+@event.listens_for(Engine, "before_cursor_execute")
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("query_start_time", []).append(time.perf_counter())
+
+
+@event.listens_for(Engine, "after_cursor_execute")
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    elapsed = time.perf_counter() - conn.info["query_start_time"].pop()
+    for stats in _active_query_stats.get():
+        stats.record(statement, parameters, elapsed)
@@ -0,0 +1,202 @@
+"""
+Prometheus metrics for HTTP routes, SQL, LLM calls, circuit breakers, rate
+limits, storage and cache.
+
+Route labels use the matched path template (e.g. /api/recipes/{recipe_id})
+so label cardinality stays bounded.
+"""
+
+import time
+from contextlib import contextmanager
+from typing import Optional
+
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    REGISTRY,
+    Counter,
+    Gauge,
+    Histogram,
+    generate_latest,
+)
+from prometheus_client.core import CounterMetricFamily
+
+from app.core.cache import cache
+from app.core.database import track_queries
+
+HTTP_REQUESTS = Counter(
+    "brinebook_http_requests_total",
+    "HTTP requests served",
+    ["method", "route", "status"],
+)
+HTTP_LATENCY = Histogram(
+    "brinebook_http_request_duration_seconds",
+    "HTTP request latency",
+    ["method", "route"],
+    buckets=(0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30),
+)
+HTTP_IN_FLIGHT = Gauge(
+    "brinebook_http_requests_in_flight",
+    "HTTP requests currently being served",
+)
+DB_QUERIES_PER_REQUEST = Histogram(
+    "brinebook_db_queries_per_request",
+    "SQL statements issued per request",
+    ["route"],
+    buckets=(0, 1, 2, 3, 5, 10, 20, 50, 100),
+)
+DB_TIME_PER_REQUEST = Histogram(
+    "brinebook_db_query_seconds_per_request",
+    "Time spent executing SQL per request",
+    ["route"],
+    buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 5),
+)
+LLM_LATENCY = Histogram(
+    "brinebook_llm_request_duration_seconds",
+    "LLM API call latency",
+    ["operation"],
+    buckets=(0.5, 1, 2.5, 5, 10, 20, 30, 60, 120),
+)
+LLM_TOKENS = Counter(
+    "brinebook_llm_tokens_total",
+    "LLM tokens consumed",
+    ["operation", "kind"],
+)
+LLM_ERRORS = Counter(
+    "brinebook_llm_errors_total",
+    "Failed LLM API calls",
+    ["operation"],
+)
+CIRCUIT_STATE = Gauge(
+    "brinebook_circuit_state",
+    "Circuit breaker state (0 closed, 1 half-open, 2 open)",
+    ["circuit"],
+)
+CIRCUIT_REJECTED = Counter(
+    "brinebook_circuit_rejected_total",
+    "Calls refused by an open circuit breaker",
+    ["circuit"],
+)
+LLM_FALLBACKS = Counter(
+    "brinebook_llm_fallbacks_total",
+    "Generations served from the fallback cache after an LLM failure",
+)
+RATE_LIMITED = Counter(
+    "brinebook_rate_limited_total",
+    "Requests refused by per-user rate limits or token budgets",
+    ["route", "reason"],
+)
+STORAGE_LATENCY = Histogram(
+    "brinebook_storage_operation_duration_seconds",
+    "Object storage operation latency",
+    ["operation"],
+    buckets=(0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10),
+)
+STORAGE_ERRORS = Counter(
+    "brinebook_storage_errors_total",
+    "Failed object storage operations",
+    ["operation"],
+)
+
+
+class CacheCollector:
+    """Exports the cache's per-namespace counters at scrape time."""
+
+    def collect(self):
+        stats = cache.all_stats()
+        for field in ("hits", "misses", "sets", "invalidations"):
+            family = CounterMetricFamily(
+                f"brinebook_cache_{field}",
+                f"Cache {field} per namespace",
+                labels=["namespace"],
+            )
+            for namespace, values in stats.items():
+                family.add_metric([namespace], values[field])
+            yield family
+
+
+REGISTRY.register(CacheCollector())
+
+
+@contextmanager
+def track_llm_call(operation: str):
+    """Time an LLM API call and count it as an error if it raises."""
+    start = time.perf_counter()
+    try:
+        yield
+    except Exception:
+        LLM_ERRORS.labels(operation).inc()
+        raise
+    finally:
+        LLM_LATENCY.labels(operation).observe(time.perf_counter() - start)
+
+
+def record_llm_usage(operation: str, usage) -> None:
+    """Count tokens from an OpenAI `usage` object, if the response had one."""
+    if usage is None:
+        return
+    LLM_TOKENS.labels(operation, "prompt").inc(usage.prompt_tokens or 0)
+    LLM_TOKENS.labels(operation, "completion").inc(usage.completion_tokens or 0)
+
+
+@contextmanager
+def track_storage_call(operation: str):
+    """Time an object storage operation and count failures."""
+    start = time.perf_counter()
+    try:
+        yield
+    except Exception:
+        STORAGE_ERRORS.labels(operation).inc()
+        raise
+    finally:
+        STORAGE_LATENCY.labels(operation).observe(time.perf_counter() - start)
+
+
+def _route_label(scope) -> str:
+    route = scope.get("route")
+    return getattr(route, "path", None) or "unmatched"
+
+
+class MetricsMiddleware:
+    """
+    ASGI middleware recording per-route latency, status, in-flight requests
+    and SQL statements issued while serving each request.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status_code: Optional[int] = None
+
+        async def send_wrapper(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        HTTP_IN_FLIGHT.inc()
+        start = time.perf_counter()
+        try:
+            with track_queries() as query_stats:
+                await self.app(scope, receive, send_wrapper)
+        except Exception:
+            status_code = 500
+            raise
+        finally:
+            elapsed = time.perf_counter() - start
+            HTTP_IN_FLIGHT.dec()
+            method = scope["method"]
+            route = _route_label(scope)
+            HTTP_LATENCY.labels(method, route).observe(elapsed)
+            HTTP_REQUESTS.labels(method, route, str(status_code or 500)).inc()
+            DB_QUERIES_PER_REQUEST.labels(route).observe(query_stats.count)
+            DB_TIME_PER_REQUEST.labels(route).observe(query_stats.duration)
+
+
+def render_metrics():
+    """Body and content type for the /metrics endpoint."""
+    return generate_latest(REGISTRY), CONTENT_TYPE_LATEST
@@ -0,0 +1,173 @@
+"""
+Opt-in production profiling.
+
+`ProfilingMiddleware` picks a fraction of requests and, while any sampled
+request is in flight, a background thread snapshots every thread's stack at
+a fixed interval. Samples are aggregated as folded stacks ("a;b;c 42"),
+which flamegraph.pl, speedscope and inferno read directly.
+
+`LoopBlockDetector` watches the event loop with a heartbeat task and logs
+the loop thread's stack whenever a callback holds it past a threshold,
+e.g. a sync OpenAI or S3 call made from an async endpoint.
+"""
+
+import asyncio
+import logging
+import random
+import sys
+import threading
+import time
+import traceback
+from collections import Counter
+from typing import Optional
+
+from prometheus_client import Counter as PromCounter
+
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+LOOP_BLOCKED = PromCounter(
+    "brinebook_event_loop_blocked_total",
+    "Times the event loop was blocked longer than LOOP_BLOCK_THRESHOLD_MS",
+)
+
+# Leaf frames of threads that are parked rather than doing work
+_IDLE_FUNCTIONS = {"wait", "select", "poll", "epoll", "_worker", "sleep"}
+
+
+def _fold(frame) -> str:
+    parts = []
+    while frame is not None:
+        code = frame.f_code
+        module = frame.f_globals.get("__name__", "?")
+        parts.append(f"{module}:{code.co_name}")
+        frame = frame.f_back
+    return ";".join(reversed(parts))
+
+
+class StackSampler:
+    """Aggregates folded stack samples while at least one request is sampled."""
+
+    def __init__(self, interval: float):
+        self.interval = interval
+        self.samples: Counter = Counter()
+        self.sample_count = 0
+        self._active = 0
+        self._cond = threading.Condition()
+        self._thread: Optional[threading.Thread] = None
+
+    def begin(self) -> None:
+        with self._cond:
+            self._active += 1
+            if self._thread is None:
+                self._thread = threading.Thread(
+                    target=self._run, name="stack-sampler", daemon=True
+                )
+                self._thread.start()
+            self._cond.notify()
+
+    def end(self) -> None:
+        with self._cond:
+            self._active -= 1
+
+    def reset(self) -> None:
+        with self._cond:
+            self.samples.clear()
+            self.sample_count = 0
+
+    def folded(self) -> str:
+        with self._cond:
+            return "".join(
+                f"{stack} {count}\n" for stack, count in self.samples.most_common()
+            )
+
+    def _run(self) -> None:
+        own = threading.get_ident()
+        names = {}
+        while True:
+            with self._cond:
+                while self._active == 0:
+                    self._cond.wait()
+            frames = sys._current_frames()
+            if len(names) != threading.active_count():
+                names = {t.ident: t.name for t in threading.enumerate()}
+            with self._cond:
+                self.sample_count += 1
+                for ident, frame in frames.items():
+                    if ident == own or frame.f_code.co_name in _IDLE_FUNCTIONS:
+                        continue
+                    thread = names.get(ident, str(ident)).replace(";", "_")
+                    self.samples[f"{thread};{_fold(frame)}"] += 1
+            time.sleep(self.interval)
+
+
+sampler = StackSampler(settings.PROFILING_INTERVAL_MS / 1000)
+
+
+class ProfilingMiddleware:
+    """Samples stacks for PROFILING_SAMPLE_RATE of HTTP requests."""
+
+    def __init__(self, app, sample_rate: float = settings.PROFILING_SAMPLE_RATE):
+        self.app = app
+        self.sample_rate = sample_rate
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or random.random() >= self.sample_rate:
+            await self.app(scope, receive, send)
+            return
+
+        sampler.begin()
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            sampler.end()
+
+
+class LoopBlockDetector:
+    """
+    Heartbeat task plus watchdog thread. If the heartbeat stops advancing for
+    longer than `threshold`, the loop thread's current stack is logged once
+    per stall.
+    """
+
+    def __init__(self, threshold: float):
+        self.threshold = threshold
+        self.beat_interval = threshold / 4
+        self._last_beat = time.monotonic()
+        self._loop_thread_id: Optional[int] = None
+        self._task: Optional[asyncio.Task] = None
+        self._stop = threading.Event()
+
+    async def _heartbeat(self) -> None:
+        while True:
+            self._last_beat = time.monotonic()
+            await asyncio.sleep(self.beat_interval)
+
+    def _watch(self) -> None:
+        reported_beat = None
+        while not self._stop.wait(self.beat_interval):
+            last_beat = self._last_beat
+            stalled = time.monotonic() - last_beat
+            if stalled < self.threshold or last_beat == reported_beat:
+                continue
+            reported_beat = last_beat
+            LOOP_BLOCKED.inc()
+            frame = sys._current_frames().get(self._loop_thread_id)
+            stack = "".join(traceback.format_stack(frame)) if frame else "?"
+            logger.warning(
+                "Event loop blocked for %.0f ms (threshold %.0f ms):\n%s",
+                stalled * 1000,
+                self.threshold * 1000,
+                stack,
+            )
+
+    def start(self) -> None:
+        self._loop_thread_id = threading.get_ident()
+        self._task = asyncio.get_running_loop().create_task(self._heartbeat())
+        threading.Thread(target=self._watch, name="loop-watchdog", daemon=True).start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._task is not None:
+            self._task.cancel()
@@ -0,0 +1,123 @@
+"""
+Development/test SQL instrumentation.
+
+QueryDebugMiddleware reports SQL counts and time in response headers, logs
+statements that look like N+1 patterns, and enforces per-route query
+budgets. `query_budget` applies the same check to a block of code.
+"""
+
+import logging
+from contextlib import contextmanager
+from typing import Dict, Iterator, Optional
+
+from app.core.config import settings
+from app.core.database import QueryStats, track_queries
+
+logger = logging.getLogger(__name__)
+
+# Maximum SQL statements per request, keyed by "METHOD route-template".
+# Lists and search must stay constant in the page size; bump deliberately.
+QUERY_BUDGETS: Dict[str, int] = {
+    "GET /api/recipes/": 6,
+    "GET /api/recipes/{recipe_id}": 6,
+    "POST /api/search/": 6,
+    "POST /api/search/pantry": 8,
+    "GET /api/tags/": 2,
+    "GET /api/leaderboards/top": 5,
+    "GET /api/leaderboards/recently-cooked": 5,
+    "GET /api/sync/changes": 8,
+    "GET /api/public/recipes": 4,
+    "GET /api/public/recipes/{recipe_id}": 4,
+    "GET /api/public/search": 4,
+}
+
+
+class QueryBudgetExceeded(Exception):
+    """Raised when a request or block issues more SQL than its budget."""
+
+    def __init__(self, label: str, stats: QueryStats, budget: int):
+        self.stats = stats
+        self.budget = budget
+        statements = "\n".join(f"  {s}" for s, _, _ in stats.statements)
+        super().__init__(
+            f"{label} issued {stats.count} SQL statements (budget {budget})"
+            + (f":\n{statements}" if statements else "")
+        )
+
+
+def report_repeated_statements(label: str, stats: QueryStats) -> int:
+    """Log likely N+1 patterns; returns how many were found."""
+    repeated = stats.repeated_statements(settings.SQL_N_PLUS_ONE_THRESHOLD)
+    for statement, times in repeated.items():
+        logger.warning(
+            "Possible N+1 in %s: statement ran %d times with different "
+            "parameters: %s",
+            label,
+            times,
+            " ".join(statement.split()),
+        )
+    return len(repeated)
+
+
+@contextmanager
+def query_budget(max_queries: int, label: str = "block") -> Iterator[QueryStats]:
+    """
+    Fail if the enclosed code issues more than `max_queries` SQL statements.
+
+        with query_budget(5):
+            list_recipes(db=db, user_id=1)
+    """
+    with track_queries(record_statements=True) as stats:
+        yield stats
+    report_repeated_statements(label, stats)
+    if stats.count > max_queries:
+        raise QueryBudgetExceeded(label, stats, max_queries)
+
+
+class QueryDebugMiddleware:
+    """
+    Adds X-DB-Query-Count / X-DB-Query-Time-Ms / X-DB-Repeated-Statements
+    headers and checks QUERY_BUDGETS. Over-budget requests are logged, or
+    raise QueryBudgetExceeded when SQL_QUERY_BUDGET_ENFORCE is set (tests).
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        with track_queries(record_statements=True) as stats:
+
+            async def send_wrapper(message):
+                if message["type"] == "http.response.start":
+                    self._check(scope, stats)
+                    repeated = report_repeated_statements(_label(scope), stats)
+                    duration_ms = f"{stats.duration * 1000:.2f}"
+                    headers = list(message.get("headers", []))
+                    headers += [
+                        (b"x-db-query-count", str(stats.count).encode()),
+                        (b"x-db-query-time-ms", duration_ms.encode()),
+                        (b"x-db-repeated-statements", str(repeated).encode()),
+                    ]
+                    message = {**message, "headers": headers}
+                await send(message)
+
+            await self.app(scope, receive, send_wrapper)
+
+    def _check(self, scope, stats: QueryStats) -> None:
+        label = _label(scope)
+        budget: Optional[int] = QUERY_BUDGETS.get(label)
+        if budget is None or stats.count <= budget:
+            return
+        error = QueryBudgetExceeded(label, stats, budget)
+        if settings.SQL_QUERY_BUDGET_ENFORCE:
+            raise error
+        logger.warning(str(error))
+
+
+def _label(scope) -> str:
+    route = scope.get("route")
+    return f"{scope['method']} {getattr(route, 'path', scope['path'])}"
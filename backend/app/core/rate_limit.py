@@ -0,0 +1,276 @@
+"""
+Per-user rate limits and daily token budgets for the LLM endpoints.
+
+Requests draw from token buckets keyed by user and route. RATE_LIMITS gives
+each route a limit like "10/minute": the bucket holds 10 requests and
+refills at 10 per minute. Bursts up to the capacity go through, and after
+that requests are admitted at the refill rate.
+
+LLM_DAILY_TOKEN_BUDGET caps the prompt + completion tokens a user can spend
+per UTC day. Usage comes from the provider's `usage` fields and is charged
+after each call, so the call that crosses the budget completes and the next
+one is refused.
+
+State lives in a shared store so limits hold across workers: Redis when
+RATE_LIMIT_URL (or CACHE_URL) points at one, else an in-process stand-in.
+Store errors fail open; an outage of the limiter shouldn't take the LLM
+endpoints down with it.
+"""
+
+import logging
+import math
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Iterator, Optional, Tuple
+
+from app.core.config import settings
+from app.core.metrics import RATE_LIMITED
+
+logger = logging.getLogger(__name__)
+
+PERIODS = {"second": 1, "minute": 60, "hour": 3600, "day": 86400}
+
+
+class RateLimitExceeded(Exception):
+    """A request was refused; `retry_after` is in seconds."""
+
+    def __init__(self, message: str, retry_after: float):
+        super().__init__(message)
+        self.retry_after = retry_after
+
+
+class RateLimitStore:
+    """Storage interface shared by the in-memory and Redis stores."""
+
+    def take(self, key: str, capacity: float, rate: float, cost: float = 1) -> float:
+        """
+        Draw `cost` tokens from a bucket holding at most `capacity` and
+        refilling at `rate` per second. Returns 0 when they were taken,
+        otherwise the seconds until enough will be available (nothing is
+        taken then).
+        """
+        raise NotImplementedError
+
+    def incr(self, key: str, amount: int, ttl: float) -> int:
+        """Add to a counter that expires `ttl` seconds after it was last written."""
+        raise NotImplementedError
+
+    def count(self, key: str) -> int:
+        raise NotImplementedError
+
+
+class MemoryStore(RateLimitStore):
+    """
+    Process-local store; limits apply per worker. Expired counters and
+    buckets that have refilled are swept on writes, at most once per
+    SWEEP_INTERVAL seconds; either is the same as a missing key.
+    """
+
+    SWEEP_INTERVAL = 60.0
+
+    def __init__(self):
+        # key -> (tokens, updated, time the bucket is full again)
+        self._buckets: Dict[str, Tuple[float, float, float]] = {}
+        self._counters: Dict[str, Tuple[int, float]] = {}
+        self._next_sweep = 0.0
+        self._mutex = threading.Lock()
+
+    def take(self, key, capacity, rate, cost=1):
+        now = time.monotonic()
+        with self._mutex:
+            tokens, updated, _ = self._buckets.get(key, (capacity, now, now))
+            tokens = min(capacity, tokens + (now - updated) * rate)
+            wait = 0.0
+            if tokens >= cost:
+                tokens -= cost
+            else:
+                wait = (cost - tokens) / rate
+            self._buckets[key] = (tokens, now, now + (capacity - tokens) / rate)
+            if now >= self._next_sweep:
+                self._sweep(now)
+            return wait
+
+    def incr(self, key, amount, ttl):
+        now = time.monotonic()
+        with self._mutex:
+            value, expires_at = self._counters.get(key, (0, now + ttl))
+            if expires_at <= now:
+                value, expires_at = 0, now + ttl
+            self._counters[key] = (value + amount, expires_at)
+            if now >= self._next_sweep:
+                self._sweep(now)
+            return value + amount
+
+    def _sweep(self, now: float) -> None:
+        # Caller holds the mutex
+        self._next_sweep = now + self.SWEEP_INTERVAL
+        self._buckets = {
+            key: bucket for key, bucket in self._buckets.items() if bucket[2] > now
+        }
+        self._counters = {
+            key: counter for key, counter in self._counters.items() if counter[1] > now
+        }
+
+    def count(self, key):
+        with self._mutex:
+            value, expires_at = self._counters.get(key, (0, 0.0))
+            return value if expires_at > time.monotonic() else 0
+
+
+# Refill and draw in one step so concurrent workers can't both spend the
+# last token. Uses the server clock so workers agree on elapsed time.
+_TAKE_SCRIPT = """
+local capacity = tonumber(ARGV[1])
+local rate = tonumber(ARGV[2])
+local cost = tonumber(ARGV[3])
+local clock = redis.call('TIME')
+local now = tonumber(clock[1]) + tonumber(clock[2]) / 1000000
+local state = redis.call('HMGET', KEYS[1], 'tokens', 'updated')
+local tokens = tonumber(state[1]) or capacity
+local updated = tonumber(state[2]) or now
+tokens = math.min(capacity, tokens + math.max(0, now - updated) * rate)
+local wait = 0
+if tokens >= cost then
+    tokens = tokens - cost
+else
+    wait = (cost - tokens) / rate
+end
+redis.call('HSET', KEYS[1], 'tokens', tostring(tokens), 'updated', tostring(now))
+redis.call('PEXPIRE', KEYS[1], math.ceil(capacity / rate * 1000))
+return tostring(wait)
+"""
+
+
+class RedisStore(RateLimitStore):
+    """Redis protocol store shared by every worker."""
+
+    def __init__(self, url: str):
+        import redis
+
+        self._client = redis.Redis.from_url(url)
+        self._take = self._client.register_script(_TAKE_SCRIPT)
+
+    def take(self, key, capacity, rate, cost=1):
+        return float(self._take(keys=[key], args=[capacity, rate, cost]))
+
+    def incr(self, key, amount, ttl):
+        pipe = self._client.pipeline()
+        pipe.incrby(key, amount)
+        pipe.expire(key, math.ceil(ttl))
+        value, _ = pipe.execute()
+        return value
+
+    def count(self, key):
+        return int(self._client.get(key) or 0)
+
+
+def create_store(url: str) -> RateLimitStore:
+    """Build a store from a URL; empty or memory:// selects the in-process one."""
+    if not url or url.startswith("memory://"):
+        return MemoryStore()
+    if url.startswith(("redis://", "rediss://", "unix://")):
+        return RedisStore(url)
+    raise ValueError(f"Unsupported rate limit URL: {url}")
+
+
+def parse_limit(limit: str) -> Tuple[float, float]:
+    """'10/minute' -> (capacity 10, refill 10/60 per second)."""
+    try:
+        count, period = limit.split("/")
+        capacity = float(count)
+        return capacity, capacity / PERIODS[period.strip()]
+    except (ValueError, KeyError):
+        raise ValueError(f"Invalid rate limit {limit!r}, expected e.g. '10/minute'")
+
+
+def _seconds_until_tomorrow(now: datetime) -> float:
+    tomorrow = (now + timedelta(days=1)).replace(
+        hour=0, minute=0, second=0, microsecond=0
+    )
+    return (tomorrow - now).total_seconds()
+
+
+class RateLimiter:
+    def __init__(self, store: RateLimitStore):
+        self.store = store
+        self._limits = {
+            route: parse_limit(limit) for route, limit in settings.RATE_LIMITS.items()
+        }
+
+    def _budget_key(self, user_id: int, now: datetime) -> str:
+        return f"ratelimit:tokens:{user_id}:{now:%Y-%m-%d}"
+
+    def check(self, user_id: int, route: str, cost: int = 1) -> None:
+        """
+        Admit a request to `route` costing `cost` bucket tokens, or raise
+        RateLimitExceeded. A cost above the bucket's capacity is capped, so
+        a large batch drains the bucket rather than never fitting.
+        """
+        if not settings.RATE_LIMIT_ENABLED:
+            return
+        now = datetime.now(timezone.utc)
+        try:
+            budget = settings.LLM_DAILY_TOKEN_BUDGET
+            if budget and self.store.count(self._budget_key(user_id, now)) >= budget:
+                RATE_LIMITED.labels(route, "token_budget").inc()
+                raise RateLimitExceeded(
+                    "Daily LLM token budget exhausted", _seconds_until_tomorrow(now)
+                )
+            if route in self._limits:
+                capacity, rate = self._limits[route]
+                wait = self.store.take(
+                    f"ratelimit:{route}:{user_id}", capacity, rate, min(cost, capacity)
+                )
+                if wait:
+                    RATE_LIMITED.labels(route, "rate").inc()
+                    raise RateLimitExceeded(
+                        f"Rate limit for {route} exceeded "
+                        f"({settings.RATE_LIMITS[route]})",
+                        wait,
+                    )
+        except RateLimitExceeded:
+            raise
+        except Exception:
+            logger.exception("Rate limit check failed; allowing the request")
+
+    def charge(self, user_id: int, tokens: int) -> None:
+        """Add LLM tokens to the user's usage for today."""
+        if not tokens or not settings.LLM_DAILY_TOKEN_BUDGET:
+            return
+        key = self._budget_key(user_id, datetime.now(timezone.utc))
+        try:
+            # Kept past midnight so a late charge isn't lost to expiry
+            self.store.incr(key, tokens, ttl=2 * 86400)
+        except Exception:
+            logger.exception("Failed to record LLM usage for user %s", user_id)
+
+    def tokens_used(self, user_id: int) -> int:
+        return self.store.count(self._budget_key(user_id, datetime.now(timezone.utc)))
+
+
+limiter = RateLimiter(create_store(settings.RATE_LIMIT_URL or settings.CACHE_URL))
+
+_billed_user: ContextVar[Optional[int]] = ContextVar("billed_user", default=None)
+
+
+@contextmanager
+def charge_tokens_to(user_id: int) -> Iterator[None]:
+    """
+    Charge LLM usage from the current context (including threadpool calls
+    and tasks started inside it) to `user_id`'s daily budget.
+    """
+    token = _billed_user.set(user_id)
+    try:
+        yield
+    finally:
+        _billed_user.reset(token)
+
+
+def record_token_usage(usage) -> None:
+    """Charge a completion's usage to the user set by `charge_tokens_to`."""
+    user_id = _billed_user.get()
+    if user_id is not None and usage is not None:
+        limiter.charge(user_id, usage.prompt_tokens + usage.completion_tokens)
@@ -1,40 +1,132 @@
-from datetime import datetime, timedelta
-from typing import Optional
-from jose import JWTError, jwt
-from passlib.context import CryptContext
+import asyncio
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+from functools import lru_cache
+from typing import Optional, Tuple
+from uuid import uuid4
 from app.core.config import settings
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+
+class HashingBusy(Exception):
+    """Too many password hashes are already queued; retry shortly."""
+
+
+@lru_cache(maxsize=None)
+def pwd_context():
+    """
+    The passlib context, built on first use. passlib and jose (below) are
+    imported lazily to keep them, and jose's crypto backends, out of startup.
+    """
+    from passlib.context import CryptContext
+
+    return CryptContext(
+        schemes=["bcrypt"], deprecated="auto", bcrypt__rounds=settings.BCRYPT_ROUNDS
+    )
 
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
-    return pwd_context.verify(plain_password, hashed_password)
+    return pwd_context().verify(plain_password, hashed_password)
 
 
 def get_password_hash(password: str) -> str:
-    return pwd_context.hash(password)
+    return pwd_context().hash(password)
+
+
+# bcrypt is deliberately slow (~0.1-0.4s of CPU per hash at 12 rounds) and
+# releases the GIL, so hashes run on a small dedicated pool. A login storm
+# then queues here instead of occupying the shared threadpool that every
+# sync endpoint runs on, and past PASSWORD_HASH_MAX_PENDING it's refused.
+_hash_executor = ThreadPoolExecutor(
+    max_workers=settings.PASSWORD_HASH_WORKERS or max(1, (os.cpu_count() or 2) // 2),
+    thread_name_prefix="password-hash",
+)
+_pending = 0
+_pending_lock = threading.Lock()
+
+
+async def _run_hashing(fn, *args):
+    global _pending
+    with _pending_lock:
+        if _pending >= settings.PASSWORD_HASH_MAX_PENDING:
+            raise HashingBusy()
+        _pending += 1
+    try:
+        return await asyncio.get_running_loop().run_in_executor(
+            _hash_executor, fn, *args
+        )
+    finally:
+        with _pending_lock:
+            _pending -= 1
+
+
+async def hash_password(password: str) -> str:
+    """get_password_hash on the hashing pool."""
+    return await _run_hashing(get_password_hash, password)
+
+
+async def verify_and_update_password(
+    password: str, hashed_password: str
+) -> Tuple[bool, Optional[str]]:
+    """
+    Verify on the hashing pool. Also returns a replacement hash when the
+    stored one was made with a different BCRYPT_ROUNDS, else None.
+    """
+    return await _run_hashing(
+        pwd_context().verify_and_update, password, hashed_password
+    )
 
 
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None):
+    """
+    A signed access token. Each gets a unique `jti` so it can be revoked on
+    its own, and a sub-second `iat` to compare with "logout everywhere"
+    cutoffs (see auth_service).
+    """
+    from jose import jwt
+
+    now = datetime.utcnow()
     to_encode = data.copy()
     if expires_delta:
-        expire = datetime.utcnow() + expires_delta
+        expire = now + expires_delta
     else:
-        expire = datetime.utcnow() + timedelta(
-            minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES
-        )
-    to_encode.update({"exp": expire})
+        expire = now + timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
+    to_encode.update(
+        {
+            "exp": expire,
+            "iat": now.replace(tzinfo=timezone.utc).timestamp(),
+            "jti": uuid4().hex,
+            "type": "access",
+        }
+    )
     encoded_jwt = jwt.encode(
         to_encode, settings.SECRET_KEY, algorithm=settings.ALGORITHM
     )
     return encoded_jwt
 
 
-def decode_token(token: str):
+def create_refresh_token(data: dict, jti: str, expires_at: datetime) -> str:
+    """A signed refresh token; `jti` is its row in refresh_tokens."""
+    from jose import jwt
+
+    to_encode = data.copy()
+    to_encode.update(
+        {"exp": expires_at, "iat": datetime.utcnow(), "jti": jti, "type": "refresh"}
+    )
+    return jwt.encode(to_encode, settings.SECRET_KEY, algorithm=settings.ALGORITHM)
+
+
+def decode_token(token: str, token_type: str = "access"):
+    """The token's claims, or None if it's invalid, expired or another type."""
+    from jose import JWTError, jwt
+
     try:
         payload = jwt.decode(
             token, settings.SECRET_KEY, algorithms=[settings.ALGORITHM]
         )
-        return payload
     except JWTError:
         return None
+    if payload.get("type") != token_type or "jti" not in payload:
+        return None
+    return payload
@@ -0,0 +1,197 @@
+"""
+OpenTelemetry tracing for requests, SQL, LLM and storage calls.
+
+Tracing is off unless TRACING_EXPORTER is set. When off, `tracer` is the
+OpenTelemetry API's no-op tracer and no SQL listeners are installed, so the
+spans in the service code cost a function call. When on, every request gets
+a root span (continuing an incoming `traceparent` header), with child spans
+for each SQL statement, chat completion and S3 operation. Head sampling is
+parent-based with TRACING_SAMPLE_RATIO for new traces.
+
+Exporters:
+    otlp     OTLP/HTTP to TRACING_OTLP_ENDPOINT (a local collector, Jaeger,
+             Tempo, ...)
+    file     one JSON span per line in TRACING_FILE_PATH, for offline runs
+    console  pretty-printed spans on stdout
+"""
+
+import json
+import threading
+from typing import Optional, Sequence
+
+from opentelemetry import trace
+from opentelemetry.trace import SpanKind, Status, StatusCode
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from app.core.config import settings
+
+tracer = trace.get_tracer("brinebook")
+
+# Long statements (bulk inserts) are cut to keep span payloads small
+MAX_STATEMENT_LENGTH = 2000
+
+
+class FileSpanExporter:
+    """Appends finished spans to a file as JSON lines."""
+
+    def __init__(self, path: str):
+        from opentelemetry.sdk.trace.export import SpanExportResult
+
+        self._result = SpanExportResult
+        self._file = open(path, "a", encoding="utf-8")
+        self._lock = threading.Lock()
+
+    def export(self, spans: Sequence):
+        lines = "".join(
+            json.dumps(json.loads(span.to_json(indent=None))) + "\n" for span in spans
+        )
+        with self._lock:
+            self._file.write(lines)
+            self._file.flush()
+        return self._result.SUCCESS
+
+    def shutdown(self) -> None:
+        with self._lock:
+            self._file.close()
+
+    def force_flush(self, timeout_millis: int = 30000) -> bool:
+        return True
+
+
+def _create_exporter(name: str):
+    if name == "otlp":
+        from opentelemetry.exporter.otlp.proto.http.trace_exporter import (
+            OTLPSpanExporter,
+        )
+
+        return OTLPSpanExporter(endpoint=settings.TRACING_OTLP_ENDPOINT)
+    if name == "file":
+        return FileSpanExporter(settings.TRACING_FILE_PATH)
+    if name == "console":
+        from opentelemetry.sdk.trace.export import ConsoleSpanExporter
+
+        return ConsoleSpanExporter()
+    raise ValueError(f"Unsupported TRACING_EXPORTER: {name}")
+
+
+def configure_tracing() -> None:
+    """Install the SDK tracer provider and SQL listeners; call once at startup."""
+    from opentelemetry.sdk.resources import Resource
+    from opentelemetry.sdk.trace import TracerProvider
+    from opentelemetry.sdk.trace.export import BatchSpanProcessor
+    from opentelemetry.sdk.trace.sampling import ParentBased, TraceIdRatioBased
+
+    provider = TracerProvider(
+        resource=Resource.create({"service.name": settings.TRACING_SERVICE_NAME}),
+        sampler=ParentBased(TraceIdRatioBased(settings.TRACING_SAMPLE_RATIO)),
+    )
+    provider.add_span_processor(
+        BatchSpanProcessor(_create_exporter(settings.TRACING_EXPORTER))
+    )
+    trace.set_tracer_provider(provider)
+
+    # Listen on the Engine class so every engine (primary and replicas) is traced
+    event.listen(Engine, "before_cursor_execute", _before_cursor_execute)
+    event.listen(Engine, "after_cursor_execute", _after_cursor_execute)
+    event.listen(Engine, "handle_error", _handle_error)
+
+
+def shutdown_tracing() -> None:
+    """Flush pending spans; a no-op when tracing was never configured."""
+    provider = trace.get_tracer_provider()
+    if hasattr(provider, "shutdown"):
+        provider.shutdown()
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    if not trace.get_current_span().is_recording():
+        # Unsampled request or no request at all (startup, scripts)
+        context._otel_span = None
+        return
+    operation = statement.lstrip().split(None, 1)[0].upper() if statement else "SQL"
+    span = tracer.start_span(
+        f"db {operation}",
+        kind=SpanKind.CLIENT,
+        attributes={
+            "db.system": conn.dialect.name,
+            "db.operation": operation,
+            "db.statement": statement[:MAX_STATEMENT_LENGTH],
+            "db.executemany": executemany,
+        },
+    )
+    context._otel_span = span
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    span = getattr(context, "_otel_span", None)
+    if span is None:
+        return
+    if cursor.rowcount is not None and cursor.rowcount >= 0:
+        span.set_attribute("db.rows_affected", cursor.rowcount)
+    span.end()
+    context._otel_span = None
+
+
+def _handle_error(exception_context):
+    context = exception_context.execution_context
+    span = getattr(context, "_otel_span", None)
+    if span is None:
+        return
+    span.record_exception(exception_context.original_exception)
+    span.set_status(Status(StatusCode.ERROR))
+    span.end()
+    context._otel_span = None
+
+
+class TracingMiddleware:
+    """
+    ASGI middleware opening the root server span for each HTTP request. The
+    span is renamed to the matched route template once routing has run.
+    """
+
+    def __init__(self, app):
+        # Imported here: loading the propagators scans package entry points,
+        # which is startup time wasted when tracing is off
+        from opentelemetry import propagate
+
+        self.app = app
+        self._propagate = propagate
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        carrier = {
+            key.decode("latin-1"): value.decode("latin-1")
+            for key, value in scope.get("headers", [])
+        }
+        method = scope["method"]
+        status_code: Optional[int] = None
+
+        async def send_wrapper(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        with tracer.start_as_current_span(
+            f"{method} {scope['path']}",
+            context=self._propagate.extract(carrier),
+            kind=SpanKind.SERVER,
+            attributes={"http.method": method, "http.target": scope["path"]},
+            record_exception=True,
+            set_status_on_exception=True,
+        ) as span:
+            try:
+                await self.app(scope, receive, send_wrapper)
+            finally:
+                route = getattr(scope.get("route"), "path", None)
+                if route:
+                    span.update_name(f"{method} {route}")
+                    span.set_attribute("http.route", route)
+                if status_code is not None:
+                    span.set_attribute("http.status_code", status_code)
+                    if status_code >= 500:
+                        span.set_status(Status(StatusCode.ERROR))
@@ -1,12 +1,72 @@
-from fastapi import FastAPI
+import asyncio
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, Response
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import ORJSONResponse
 from app.core.config import settings
-from app.api import recipes, search, photos, ratings, tags, auth
+from app.core.database import engine, replicas
+from app.core.metrics import MetricsMiddleware, render_metrics
+from app.core.query_debug import QueryDebugMiddleware
+from app.core.profiling import ProfilingMiddleware, LoopBlockDetector
+from app.core.tracing import TracingMiddleware, configure_tracing, shutdown_tracing
+from app.api import (
+    recipes,
+    search,
+    photos,
+    ratings,
+    tags,
+    auth,
+    admin,
+    leaderboards,
+    sync,
+    public,
+)
+from app.services.auth_service import load_revocations, run_periodic_revocation_sync
+from app.services.leaderboard_service import run_periodic_refresh
+from app.services.warmup import warmup
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Before the worker takes traffic, and before the loop watchdog starts
+    if settings.WARMUP_ENABLED:
+        warmup(app)
+    # Revoked tokens must be known before serving, warmup or not
+    load_revocations()
+    detector = None
+    if settings.LOOP_BLOCK_THRESHOLD_MS:
+        detector = LoopBlockDetector(settings.LOOP_BLOCK_THRESHOLD_MS / 1000)
+        detector.start()
+    refresh_task = None
+    if settings.LEADERBOARD_REFRESH_SECONDS:
+        refresh_task = asyncio.create_task(
+            run_periodic_refresh(settings.LEADERBOARD_REFRESH_SECONDS)
+        )
+    revocation_task = None
+    if settings.TOKEN_REVOCATION_SYNC_SECONDS:
+        revocation_task = asyncio.create_task(
+            run_periodic_revocation_sync(settings.TOKEN_REVOCATION_SYNC_SECONDS)
+        )
+    yield
+    if refresh_task:
+        refresh_task.cancel()
+    if revocation_task:
+        revocation_task.cancel()
+    if detector:
+        detector.stop()
+    shutdown_tracing()
+    # In-flight requests have drained; close pooled connections cleanly
+    engine.dispose()
+    for replica in replicas.engines:
+        replica.dispose()
+
 
 app = FastAPI(
     title="BrineBook API",
     description="AI-powered restaurant recipe vault",
     version="1.0.0",
+    default_response_class=ORJSONResponse,
+    lifespan=lifespan,
 )
 
 # CORS
@@ -18,6 +78,20 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+if settings.METRICS_ENABLED:
+    app.add_middleware(MetricsMiddleware)
+
+if settings.SQL_DEBUG:
+    app.add_middleware(QueryDebugMiddleware)
+
+if settings.PROFILING_ENABLED:
+    app.add_middleware(ProfilingMiddleware)
+
+# Added last so the request span wraps the other middleware
+if settings.TRACING_EXPORTER:
+    configure_tracing()
+    app.add_middleware(TracingMiddleware)
+
 # Include routers
 app.include_router(auth.router, prefix="/api/auth", tags=["auth"])
 app.include_router(recipes.router, prefix="/api/recipes", tags=["recipes"])
@@ -25,6 +99,12 @@ app.include_router(search.router, prefix="/api/search", tags=["search"])
 app.include_router(photos.router, prefix="/api/photos", tags=["photos"])
 app.include_router(ratings.router, prefix="/api/ratings", tags=["ratings"])
 app.include_router(tags.router, prefix="/api/tags", tags=["tags"])
+app.include_router(
+    leaderboards.router, prefix="/api/leaderboards", tags=["leaderboards"]
+)
+app.include_router(public.router, prefix="/api/public", tags=["public"])
+app.include_router(sync.router, prefix="/api/sync", tags=["sync"])
+app.include_router(admin.router, prefix="/api/admin", tags=["admin"])
 
 
 @app.get("/")
@@ -35,3 +115,9 @@ async def root():
 @app.get("/health")
 async def health():
     return {"status": "healthy"}
+
+
+@app.get("/metrics", include_in_schema=False)
+def metrics():
+    body, content_type = render_metrics()
+    return Response(content=body, media_type=content_type)
@@ -1,4 +1,5 @@
 from sqlalchemy import (
+    BigInteger,
     Column,
     Integer,
     String,
@@ -7,14 +8,22 @@ from sqlalchemy import (
     Boolean,
     ForeignKey,
     Float,
+    Index,
+    JSON,
     Enum as SQLEnum,
+    text,
 )
-from sqlalchemy.dialects.postgresql import JSON, ARRAY
-from sqlalchemy.orm import relationship
+from sqlalchemy.dialects.postgresql import JSONB, ARRAY
+from sqlalchemy.orm import relationship, deferred
 from sqlalchemy.sql import func
 from app.core.database import Base
 import enum
 
+# Native JSONB / text[] on Postgres; JSON text elsewhere (SQLite). Code that
+# needs JSONB operators must branch on the dialect (see search_service).
+JSONDocument = JSON().with_variant(JSONB(), "postgresql")
+StringList = JSON().with_variant(ARRAY(String), "postgresql")
+
 
 class RecipeSource(str, enum.Enum):
     LLM = "llm"
@@ -47,15 +56,15 @@ class Recipe(Base):
     description = Column(Text)
     source = Column(SQLEnum(RecipeSource), nullable=False, default=RecipeSource.MANUAL)
     base_prompt = Column(Text)  # Original ChatGPT prompt
-    llm_response = Column(JSON)  # Raw LLM response
+    llm_response = deferred(Column(JSONDocument))  # Raw LLM response, loaded on access
     instructions = Column(Text)  # Cleaned method
     ingredients = Column(
-        JSON
+        JSONDocument
     )  # Structured: [{"name": "chicken", "amount": "2", "unit": "lbs"}]
     servings = Column(Integer, default=4)
     prep_time = Column(Integer)  # minutes
     cook_time = Column(Integer)  # minutes
-    equipment = Column(ARRAY(String))  # ['sous-vide', 'cast-iron', 'smoker']
+    equipment = Column(StringList)  # ['sous-vide', 'cast-iron', 'smoker']
     plating_notes = Column(Text)
     hero_photo = Column(String, nullable=True)
     is_public = Column(Boolean, default=False)
@@ -72,6 +81,80 @@ class Recipe(Base):
     ratings = relationship(
         "Rating", back_populates="recipe", cascade="all, delete-orphan"
     )
+    ingredient_index = relationship(
+        "RecipeIngredient", back_populates="recipe", cascade="all, delete-orphan"
+    )
+    stats = relationship(
+        "RecipeStats",
+        back_populates="recipe",
+        uselist=False,
+        cascade="all, delete-orphan",
+    )
+
+    __table_args__ = (
+        # Public gallery pages; private recipes stay out of the index
+        Index(
+            "ix_recipes_public",
+            "id",
+            postgresql_where=text("is_public"),
+            sqlite_where=text("is_public = 1"),
+        ),
+        Index(
+            "ix_recipes_ingredients_gin",
+            "ingredients",
+            postgresql_using="gin",
+            postgresql_ops={"ingredients": "jsonb_path_ops"},
+        ).ddl_if(dialect="postgresql"),
+        Index(
+            "ix_recipes_llm_response_gin",
+            "llm_response",
+            postgresql_using="gin",
+            postgresql_ops={"llm_response": "jsonb_path_ops"},
+        ).ddl_if(dialect="postgresql"),
+    )
+
+
+class RecipeIngredient(Base):
+    """Normalized ingredient name per recipe, kept in sync on write for pantry search."""
+
+    __tablename__ = "recipe_ingredients"
+
+    recipe_id = Column(
+        Integer, ForeignKey("recipes.id", ondelete="CASCADE"), primary_key=True
+    )
+    name = Column(String, primary_key=True)
+
+    recipe = relationship("Recipe", back_populates="ingredient_index")
+
+    __table_args__ = (Index("ix_recipe_ingredients_name", "name", "recipe_id"),)
+
+
+class RecipeStats(Base):
+    """
+    Per-recipe rating aggregates backing the leaderboards. Maintained on
+    rating writes and rescored periodically (see leaderboard_service).
+    """
+
+    __tablename__ = "recipe_stats"
+
+    recipe_id = Column(
+        Integer, ForeignKey("recipes.id", ondelete="CASCADE"), primary_key=True
+    )
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
+    rating_count = Column(Integer, nullable=False, default=0)
+    rating_sum = Column(Float, nullable=False, default=0)
+    bayesian_rating = Column(Float, nullable=False)
+    last_cooked_at = Column(DateTime(timezone=True))
+    updated_at = Column(
+        DateTime(timezone=True), server_default=func.now(), onupdate=func.now()
+    )
+
+    recipe = relationship("Recipe", back_populates="stats")
+
+    __table_args__ = (
+        Index("ix_recipe_stats_top", "user_id", "bayesian_rating", "recipe_id"),
+        Index("ix_recipe_stats_cooked", "user_id", "last_cooked_at", "recipe_id"),
+    )
 
 
 class Tag(Base):
@@ -127,3 +210,65 @@ class Rating(Base):
 
     recipe = relationship("Recipe", back_populates="ratings")
     user = relationship("User", back_populates="ratings")
+
+
+class ChangeLogEntry(Base):
+    """
+    One row per recipe, rating or photo that changed, for the sync feed.
+    `seq` is the feed cursor; an entity's older entries are dropped when it
+    changes again, so the log holds one row per live entity plus tombstones.
+    On Postgres `xid` is the writing transaction (a database default), and
+    the feed is ordered by (xid, seq) instead.
+    """
+
+    __tablename__ = "change_log"
+
+    seq = Column(Integer, primary_key=True, autoincrement=True)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
+    entity = Column(String, nullable=False)  # recipe, rating, photo
+    entity_id = Column(Integer, nullable=False)
+    recipe_id = Column(Integer, nullable=False)
+    deleted = Column(Boolean, nullable=False, default=False)
+    changed_at = Column(DateTime(timezone=True), nullable=False)
+    xid = Column(BigInteger)
+
+    __table_args__ = (
+        Index("ix_change_log_user_seq", "user_id", "seq"),
+        Index("ix_change_log_user_xid", "user_id", "xid", "seq"),
+        Index("ix_change_log_entity", "entity", "entity_id"),
+        # Without AUTOINCREMENT SQLite reuses the highest rowid after a delete
+        {"sqlite_autoincrement": True},
+    )
+
+
+class RefreshToken(Base):
+    """
+    An issued refresh token, by JWT id. Revoked when the session is logged
+    out, or when it's rotated on use (`replaced_by` is then its successor).
+    Rows past `expires_at` can be deleted.
+    """
+
+    __tablename__ = "refresh_tokens"
+
+    jti = Column(String, primary_key=True)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False, index=True)
+    expires_at = Column(DateTime(timezone=True), nullable=False, index=True)
+    revoked_at = Column(DateTime(timezone=True))
+    replaced_by = Column(String)
+    created_at = Column(DateTime(timezone=True), server_default=func.now())
+
+
+class RevokedToken(Base):
+    """
+    A revoked access token, or with `jti` NULL every access token of the user
+    issued up to `revoked_at` (logout everywhere). Only needed until the
+    tokens it covers expire at `expires_at`; see auth_service.
+    """
+
+    __tablename__ = "revoked_tokens"
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
+    jti = Column(String)
+    revoked_at = Column(DateTime(timezone=True), nullable=False)
+    expires_at = Column(DateTime(timezone=True), nullable=False, index=True)
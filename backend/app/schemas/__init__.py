@@ -1,5 +1,5 @@
 from pydantic import BaseModel, EmailStr, Field
-from typing import Optional, List, Dict, Any
+from typing import Optional, List, Dict, Any, Union, Literal
 from datetime import datetime
 from enum import Enum
 
@@ -36,7 +36,18 @@ class User(UserBase):
 
 class Token(BaseModel):
     access_token: str
+    refresh_token: str
     token_type: str
+    expires_in: int  # seconds until access_token expires
+
+
+class RefreshRequest(BaseModel):
+    refresh_token: str
+
+
+class LogoutRequest(BaseModel):
+    refresh_token: Optional[str] = None
+    everywhere: bool = False  # revoke every session of the user
 
 
 # Recipe schemas
@@ -97,6 +108,32 @@ class Recipe(RecipeBase):
         from_attributes = True
 
 
+class RecipeSummary(BaseModel):
+    """Compact recipe projection used by list and search results."""
+
+    id: int
+    user_id: int
+    title: str
+    description: Optional[str] = None
+    source: RecipeSource
+    servings: int = 4
+    prep_time: Optional[int] = None
+    cook_time: Optional[int] = None
+    is_public: bool = False
+    created_at: datetime
+    updated_at: Optional[datetime] = None
+    avg_rating: Optional[float] = None
+    rating_count: int = 0
+    tags: List["Tag"] = []
+    hero_photo: Optional[str] = None
+
+    class Config:
+        from_attributes = True
+        # Full recipe payloads must not validate as summaries in
+        # Union[RecipeSummary, Recipe] responses
+        extra = "forbid"
+
+
 # Tag schemas
 class TagBase(BaseModel):
     name: str
@@ -136,6 +173,33 @@ class Photo(PhotoBase):
         from_attributes = True
 
 
+class PhotoUploadFile(BaseModel):
+    filename: str
+    content_type: str
+
+
+class PhotoPresignRequest(BaseModel):
+    recipe_id: int
+    files: List[PhotoUploadFile] = Field(min_length=1)
+
+
+class PresignedPhotoUpload(BaseModel):
+    key: str  # pass back to /photos/presigned once uploaded
+    upload_url: str  # POST the file here as multipart form data
+    fields: Dict[str, str]  # form fields to send before the file
+
+
+class PresignedPhoto(BaseModel):
+    key: str
+    caption: Optional[str] = None
+
+
+class PresignedPhotosCreate(BaseModel):
+    recipe_id: int
+    photos: List[PresignedPhoto] = Field(min_length=1)
+    hero_key: Optional[str] = None  # one of `photos` to make the hero
+
+
 # Rating schemas
 class RatingBase(BaseModel):
     recipe_id: int
@@ -176,14 +240,82 @@ class LLMGenerateResponse(BaseModel):
     suggested_tags: Optional[List[str]] = None
 
 
+class LLMBatchGenerateRequest(BaseModel):
+    requests: List[LLMGenerateRequest] = Field(min_length=1)
+
+
+class LLMBatchItemResult(BaseModel):
+    index: int  # position in the request list
+    status: Literal["ok", "error", "timeout"]
+    recipe: Optional[LLMGenerateResponse] = None
+    error: Optional[str] = None
+
+
+class LLMBatchGenerateResponse(BaseModel):
+    results: List[LLMBatchItemResult]
+
+
 # Search schemas
 class SearchRequest(BaseModel):
     query: str
     filters: Optional[Dict[str, Any]] = None
     limit: int = 20
+    expand: Optional[Literal["full"]] = None
+    fields: Optional[List[str]] = None
 
 
 class SearchResponse(BaseModel):
-    internal_results: List[Recipe]
+    internal_results: List[Union[RecipeSummary, Recipe]]
     suggest_llm: bool
     llm_result: Optional[LLMGenerateResponse] = None
+
+
+# Pantry search schemas
+class PantrySearchRequest(BaseModel):
+    ingredients: List[str] = Field(min_length=1)
+    max_missing: Optional[int] = Field(default=None, ge=0)
+    limit: int = Field(default=20, ge=1, le=100)
+
+
+class PantryMatch(BaseModel):
+    recipe: RecipeSummary
+    matched_count: int
+    total_count: int
+    coverage: float
+    missing: List[str]
+
+
+class PantrySearchResponse(BaseModel):
+    results: List[PantryMatch]
+
+
+class LeaderboardEntry(RecipeSummary):
+    bayesian_rating: float
+    last_cooked_at: Optional[datetime] = None
+
+
+class LeaderboardPage(BaseModel):
+    items: List[LeaderboardEntry]
+    next_cursor: Optional[str] = None
+
+
+class PublicRecipePage(BaseModel):
+    items: List[RecipeSummary]
+    next_cursor: Optional[str] = None
+
+
+# Sync schemas
+class Change(BaseModel):
+    seq: int
+    entity: Literal["recipe", "rating", "photo"]
+    id: int
+    recipe_id: int
+    deleted: bool
+    data: Optional[Dict[str, Any]] = None
+
+
+class ChangeFeed(BaseModel):
+    changes: List[Change]
+    cursor: str
+    has_more: bool
+    retry_after: Optional[float] = None  # seconds until held-back changes settle
@@ -0,0 +1,236 @@
+"""
+Token issuance, refresh rotation and revocation.
+
+Access tokens are short-lived (ACCESS_TOKEN_EXPIRE_MINUTES) and checked on
+every request without a database round trip. `revocations` keeps revoked
+token ids and per-user cutoffs ("logout everywhere") in memory:
+
+- It's loaded from `revoked_tokens` at startup.
+- It's reloaded every TOKEN_REVOCATION_SYNC_SECONDS, so a revocation made on
+  another worker applies within that interval.
+- The worker that made a revocation applies it at once.
+
+A row only matters until the access tokens it covers have expired, so the
+table and the in-memory list hold at most one access token lifetime's worth
+of revocations.
+
+Refresh tokens are long-lived and tracked in `refresh_tokens`. They're only
+checked when used, which is where the database is read. Each use rotates
+the token: the presented one is revoked and a new pair is issued. Presenting
+a token that was already rotated means it was copied, so every session of
+that user is revoked.
+"""
+
+import asyncio
+import logging
+import threading
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Optional, Tuple
+from uuid import uuid4
+
+from sqlalchemy import delete, select, update
+from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
+
+from app.core.config import settings
+from app.core.database import SessionLocal
+from app.core.security import create_access_token, create_refresh_token
+from app.models import RefreshToken, RevokedToken, User
+
+logger = logging.getLogger(__name__)
+
+
+class InvalidRefreshToken(Exception):
+    """The refresh token is expired, revoked or unknown."""
+
+
+def _aware(value: datetime) -> datetime:
+    # SQLite drops the offset
+    return value if value.tzinfo else value.replace(tzinfo=timezone.utc)
+
+
+class RevocationList:
+    """
+    Revoked access tokens by `jti`, and per user the time up to which all
+    of their access tokens are revoked. Entries are dropped once the tokens
+    they cover have expired. Lookups are a dict probe each.
+    """
+
+    def __init__(self):
+        self._jtis: Dict[str, float] = {}  # jti -> expiry
+        self._cutoffs: Dict[int, Tuple[float, float]] = {}  # user -> (cutoff, expiry)
+        self._lock = threading.Lock()
+
+    def is_revoked(self, claims: dict) -> bool:
+        if claims["jti"] in self._jtis:
+            return True
+        cutoff = self._cutoffs.get(int(claims["sub"]))
+        return cutoff is not None and claims.get("iat", 0) <= cutoff[0]
+
+    def add(
+        self,
+        user_id: int,
+        jti: Optional[str],
+        revoked_at: datetime,
+        expires_at: datetime,
+    ) -> None:
+        expiry = _aware(expires_at).timestamp()
+        with self._lock:
+            if jti is not None:
+                self._jtis[jti] = expiry
+                return
+            cutoff = _aware(revoked_at).timestamp()
+            current = self._cutoffs.get(user_id)
+            if current is None or cutoff > current[0]:
+                self._cutoffs[user_id] = (cutoff, expiry)
+
+    def load(self, db: Session) -> int:
+        """
+        Merge in the unexpired rows of `revoked_tokens` and drop expired
+        entries. Revocations are never undone, so merging instead of
+        replacing keeps ones added locally while the query ran.
+        """
+        rows = db.scalars(
+            select(RevokedToken).where(
+                RevokedToken.expires_at > datetime.now(timezone.utc)
+            )
+        ).all()
+        for row in rows:
+            self.add(row.user_id, row.jti, row.revoked_at, row.expires_at)
+        now = time.time()
+        with self._lock:
+            self._jtis = {jti: exp for jti, exp in self._jtis.items() if exp > now}
+            self._cutoffs = {
+                user_id: entry
+                for user_id, entry in self._cutoffs.items()
+                if entry[1] > now
+            }
+        return len(rows)
+
+
+revocations = RevocationList()
+
+
+def load_revocations() -> None:
+    db = SessionLocal()
+    try:
+        revocations.load(db)
+    finally:
+        db.close()
+
+
+async def run_periodic_revocation_sync(interval: float) -> None:
+    """Background task reloading `revocations` every `interval` seconds."""
+    while True:
+        await asyncio.sleep(interval)
+        try:
+            await run_in_threadpool(load_revocations)
+        except Exception:
+            logger.exception("Token revocation sync failed")
+
+
+def issue_tokens(
+    db: Session, user: User, replaces: Optional[RefreshToken] = None
+) -> dict:
+    """
+    A new access and refresh token pair for `user`, rotating out `replaces`
+    if given. Commits.
+    """
+    claims = {"sub": str(user.id), "email": user.email}
+    jti = uuid4().hex
+    now = datetime.now(timezone.utc)
+    expires_at = now + timedelta(days=settings.REFRESH_TOKEN_EXPIRE_DAYS)
+    db.add(RefreshToken(jti=jti, user_id=user.id, expires_at=expires_at))
+    if replaces is not None:
+        replaces.revoked_at = now
+        replaces.replaced_by = jti
+    db.commit()
+    return {
+        "access_token": create_access_token(claims),
+        "refresh_token": create_refresh_token(claims, jti, expires_at),
+        "token_type": "bearer",
+        "expires_in": settings.ACCESS_TOKEN_EXPIRE_MINUTES * 60,
+    }
+
+
+def refresh_tokens(db: Session, claims: dict) -> dict:
+    """
+    Rotate the refresh token with `claims` into a new pair, or raise
+    InvalidRefreshToken. Reuse of a rotated token revokes all sessions.
+    """
+    # Locks the row so two concurrent uses can't both rotate it
+    token = db.scalar(
+        select(RefreshToken).where(RefreshToken.jti == claims["jti"]).with_for_update()
+    )
+    if token is None or _aware(token.expires_at) <= datetime.now(timezone.utc):
+        raise InvalidRefreshToken()
+    if token.replaced_by is not None:
+        logger.warning("Rotated refresh token reused for user %s", token.user_id)
+        revoke_all(db, token.user_id)
+        raise InvalidRefreshToken()
+    if token.revoked_at is not None:
+        raise InvalidRefreshToken()
+
+    user = db.get(User, token.user_id)
+    if user is None or not user.is_active:
+        raise InvalidRefreshToken()
+    return issue_tokens(db, user, replaces=token)
+
+
+def revoke_access_token(db: Session, claims: dict) -> None:
+    """Revoke one access token until it would have expired. Commits."""
+    _revoke(
+        db,
+        int(claims["sub"]),
+        claims["jti"],
+        datetime.fromtimestamp(claims["exp"], timezone.utc),
+    )
+
+
+def revoke_refresh_token(db: Session, user_id: int, jti: str) -> None:
+    """Revoke one of `user_id`'s refresh tokens. Commits."""
+    db.execute(
+        update(RefreshToken)
+        .where(
+            RefreshToken.jti == jti,
+            RefreshToken.user_id == user_id,
+            RefreshToken.revoked_at.is_(None),
+        )
+        .values(revoked_at=datetime.now(timezone.utc))
+    )
+    db.commit()
+
+
+def revoke_all(db: Session, user_id: int) -> None:
+    """Log `user_id` out everywhere: all refresh and access tokens. Commits."""
+    db.execute(
+        update(RefreshToken)
+        .where(RefreshToken.user_id == user_id, RefreshToken.revoked_at.is_(None))
+        .values(revoked_at=datetime.now(timezone.utc))
+    )
+    _revoke(
+        db,
+        user_id,
+        None,
+        datetime.now(timezone.utc)
+        + timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES),
+    )
+
+
+def _revoke(
+    db: Session, user_id: int, jti: Optional[str], expires_at: datetime
+) -> None:
+    now = datetime.now(timezone.utc)
+    # Expired rows no longer cover any token; pruning here keeps the tables
+    # from growing past the tokens that are still live
+    for model in (RevokedToken, RefreshToken):
+        db.execute(
+            delete(model).where(model.expires_at <= now),
+            execution_options={"synchronize_session": False},
+        )
+    db.add(
+        RevokedToken(user_id=user_id, jti=jti, revoked_at=now, expires_at=expires_at)
+    )
+    db.commit()
+    revocations.add(user_id, jti, now, expires_at)
@@ -0,0 +1,298 @@
+"""
+Incremental sync feed of recipe, rating and photo changes.
+
+Every ORM flush that inserts, updates or deletes one of those rows appends
+an entry to `change_log` in the same transaction (see `_record_flush`), so
+API writes are captured without per-endpoint bookkeeping. Statements that
+bypass the ORM unit of work (bulk `query.update()` / `delete()`) must call
+`record_changes` themselves.
+
+Each entity keeps only its latest entry: writing it again deletes the older
+rows and appends a new one with a higher `seq`. A client syncing from cursor
+0 therefore receives one entry per live entity plus tombstones, and after
+that only what changed since its cursor.
+
+Sequence numbers are allocated at flush but become visible at commit, so on
+Postgres a slow transaction can commit an entry below a seq a client has
+already passed. There the feed is ordered by the writing transaction's id
+(`xid`) and then seq, and `changes_since` stops at the first entry from a
+transaction no older than the oldest one still running: until that one
+ends, it may commit entries that sort before. SQLite serializes writers;
+there entries younger than CHANGE_FEED_SETTLE_SECONDS are held back.
+"""
+
+from datetime import datetime, timedelta, timezone
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy import delete, event, insert, select, text, tuple_
+from sqlalchemy.orm import Session
+
+from app.core.config import settings
+from app.core.database import RoutingSession
+from app.models import ChangeLogEntry, Photo, Rating, Recipe, RecipeTag
+from app.schemas import Photo as PhotoSchema, Rating as RatingSchema
+from app.services.recipe_service import enrich_recipes
+
+# (entity, entity_id) -> (user_id, recipe_id, deleted)
+Changes = Dict[Tuple[str, int], Tuple[int, int, bool]]
+
+ENTITIES = {"recipe": Recipe, "rating": Rating, "photo": Photo}
+
+# Oldest transaction still running; every entry written by an older one has
+# committed or rolled back
+_OLDEST_RUNNING_XID = text("pg_snapshot_xmin(pg_current_snapshot())::text::bigint")
+
+
+def record_changes(
+    db: Session,
+    user_id: int,
+    entity: str,
+    entity_ids: Iterable[int],
+    recipe_id: int,
+    deleted: bool = False,
+) -> None:
+    """Log changes made with bulk statements the flush hook can't see."""
+    _write(
+        db.connection(),
+        {
+            (entity, entity_id): (user_id, recipe_id, deleted)
+            for entity_id in entity_ids
+        },
+    )
+
+
+def _collect(session: Session) -> Changes:
+    changes: Changes = {}
+
+    def add(entity: str, obj, deleted: bool) -> None:
+        recipe_id = obj.id if entity == "recipe" else obj.recipe_id
+        changes[(entity, obj.id)] = (obj.user_id, recipe_id, deleted)
+        if entity != "recipe":
+            # Recipe payloads embed rating averages and the hero photo
+            changes.setdefault(("recipe", recipe_id), (obj.user_id, recipe_id, False))
+
+    for obj in session.deleted:
+        if isinstance(obj, Recipe):
+            add("recipe", obj, True)
+    for obj in session.deleted:
+        if isinstance(obj, Rating):
+            add("rating", obj, True)
+        elif isinstance(obj, Photo):
+            add("photo", obj, True)
+    for obj in session.new:
+        if isinstance(obj, Recipe):
+            add("recipe", obj, False)
+        elif isinstance(obj, Rating):
+            add("rating", obj, False)
+        elif isinstance(obj, Photo):
+            add("photo", obj, False)
+    for obj in session.dirty:
+        if not session.is_modified(obj):
+            continue
+        if isinstance(obj, Recipe):
+            add("recipe", obj, False)
+        elif isinstance(obj, Rating):
+            add("rating", obj, False)
+        elif isinstance(obj, Photo):
+            add("photo", obj, False)
+
+    # Tag assignments are part of the recipe payload
+    for obj in (*session.new, *session.deleted):
+        if isinstance(obj, RecipeTag) and ("recipe", obj.recipe_id) not in changes:
+            owner = session.connection().scalar(
+                select(Recipe.user_id).where(Recipe.id == obj.recipe_id)
+            )
+            if owner is not None:
+                changes[("recipe", obj.recipe_id)] = (owner, obj.recipe_id, False)
+    return changes
+
+
+def _write(connection, changes: Changes) -> None:
+    if not changes:
+        return
+    by_entity: Dict[str, List[int]] = {}
+    for entity, entity_id in changes:
+        by_entity.setdefault(entity, []).append(entity_id)
+    for entity, ids in by_entity.items():
+        connection.execute(
+            delete(ChangeLogEntry).where(
+                ChangeLogEntry.entity == entity, ChangeLogEntry.entity_id.in_(ids)
+            )
+        )
+
+    now = datetime.now(timezone.utc)
+    connection.execute(
+        insert(ChangeLogEntry),
+        [
+            {
+                "user_id": user_id,
+                "entity": entity,
+                "entity_id": entity_id,
+                "recipe_id": recipe_id,
+                "deleted": deleted,
+                "changed_at": now,
+            }
+            for (entity, entity_id), (user_id, recipe_id, deleted) in changes.items()
+        ],
+    )
+
+
+@event.listens_for(RoutingSession, "after_flush")
+def _record_flush(session, flush_context) -> None:
+    # new/dirty/deleted still describe the flush here, and new rows have ids
+    _write(session.connection(), _collect(session))
+
+
+def _load_payloads(
+    db: Session, entries: List[ChangeLogEntry]
+) -> Dict[Tuple[str, int], Dict[str, Any]]:
+    """Current data for the live entities in a page, one query per type."""
+    ids: Dict[str, List[int]] = {}
+    for entry in entries:
+        if not entry.deleted:
+            ids.setdefault(entry.entity, []).append(entry.entity_id)
+
+    payloads: Dict[Tuple[str, int], Dict[str, Any]] = {}
+    if ids.get("recipe"):
+        recipes = db.scalars(select(Recipe).where(Recipe.id.in_(ids["recipe"]))).all()
+        for item in enrich_recipes(db, list(recipes), full=True):
+            payloads[("recipe", item["id"])] = item
+    for entity, schema in (("rating", RatingSchema), ("photo", PhotoSchema)):
+        if ids.get(entity):
+            model = ENTITIES[entity]
+            for row in db.scalars(select(model).where(model.id.in_(ids[entity]))):
+                payloads[(entity, row.id)] = schema.model_validate(row).model_dump()
+    return payloads
+
+
+def parse_cursor(cursor: Optional[str]) -> Tuple[int, int]:
+    """
+    (xid, seq) from a cursor: "seq", or "xid.seq" on Postgres. A bare seq
+    has xid 0, which sorts before every recorded transaction.
+    """
+    if not cursor:
+        return 0, 0
+    try:
+        parts = [int(part) for part in cursor.split(".")]
+    except ValueError:
+        parts = []
+    if len(parts) == 1:
+        parts.insert(0, 0)
+    if len(parts) != 2 or min(parts) < 0:
+        raise ValueError(f"Invalid cursor: {cursor}")
+    return parts[0], parts[1]
+
+
+def format_cursor(xid: Optional[int], seq: int) -> str:
+    return f"{xid}.{seq}" if xid else str(seq)
+
+
+def changes_since(
+    db: Session, user_id: int, cursor: Optional[str], limit: int = 500
+) -> Dict[str, Any]:
+    """
+    Changes after `cursor` (None for a full sync) in commit order. Upserts
+    carry the entity's current payload; tombstones have `data: null`.
+    `has_more` means another page can be fetched right away; entries held
+    back end the page with `has_more` false and `retry_after` set to the
+    seconds to wait before polling again. Raises ValueError for a malformed
+    cursor.
+    """
+    after_xid, after = parse_cursor(cursor)
+    postgres = db.get_bind().dialect.name == "postgresql"
+    query = select(ChangeLogEntry).where(ChangeLogEntry.user_id == user_id)
+    if postgres:
+        # Read before the entries, so anything committed in between is
+        # held back rather than handed out
+        oldest_running = db.scalar(select(_OLDEST_RUNNING_XID))
+        query = query.where(
+            tuple_(ChangeLogEntry.xid, ChangeLogEntry.seq) > tuple_(after_xid, after)
+        ).order_by(ChangeLogEntry.xid, ChangeLogEntry.seq)
+    else:
+        query = query.where(ChangeLogEntry.seq > after).order_by(ChangeLogEntry.seq)
+    entries = db.scalars(query.limit(limit + 1)).all()
+    has_more = len(entries) > limit
+    entries = entries[:limit]
+
+    retry_after = None
+    if postgres:
+        for n, entry in enumerate(entries):
+            if entry.xid >= oldest_running:
+                # Committed, but an older transaction is still open; there's
+                # no telling when it ends, so poll again shortly
+                entries, has_more = entries[:n], False
+                retry_after = settings.CHANGE_FEED_SETTLE_SECONDS
+                break
+    else:
+        settled = datetime.now(timezone.utc) - timedelta(
+            seconds=settings.CHANGE_FEED_SETTLE_SECONDS
+        )
+        for n, entry in enumerate(entries):
+            changed_at = entry.changed_at
+            if changed_at.tzinfo is None:  # SQLite drops the offset
+                changed_at = changed_at.replace(tzinfo=timezone.utc)
+            if changed_at > settled:
+                # Not a page to fetch now: the next poll after it settles gets it
+                entries, has_more = entries[:n], False
+                retry_after = (changed_at - settled).total_seconds()
+                break
+
+    payloads = _load_payloads(db, entries)
+    changes = []
+    for entry in entries:
+        data = None if entry.deleted else payloads.get((entry.entity, entry.entity_id))
+        changes.append(
+            {
+                "seq": entry.seq,
+                "entity": entry.entity,
+                "id": entry.entity_id,
+                "recipe_id": entry.recipe_id,
+                # Removed since the entry was read; its tombstone follows
+                "deleted": data is None,
+                "data": data,
+            }
+        )
+    return {
+        "changes": changes,
+        "cursor": (
+            format_cursor(entries[-1].xid, entries[-1].seq)
+            if entries
+            else format_cursor(after_xid, after)
+        ),
+        "has_more": has_more,
+        "retry_after": retry_after,
+    }
+
+
+def rebuild_change_log(db: Session) -> int:
+    """
+    Replace the log with one entry per existing recipe, rating and photo,
+    for data loaded outside the ORM. Tombstones are lost, so clients must
+    resync from scratch. Commits.
+    """
+    db.execute(delete(ChangeLogEntry))
+    now = datetime.now(timezone.utc)
+    total = 0
+    for entity, model in ENTITIES.items():
+        recipe_id = model.id if model is Recipe else model.recipe_id
+        rows = db.execute(
+            select(model.user_id, model.id, recipe_id).order_by(model.id)
+        ).all()
+        if rows:
+            db.execute(
+                insert(ChangeLogEntry),
+                [
+                    {
+                        "user_id": user_id,
+                        "entity": entity,
+                        "entity_id": entity_id,
+                        "recipe_id": recipe,
+                        "deleted": False,
+                        "changed_at": now,
+                    }
+                    for user_id, entity_id, recipe in rows
+                ],
+            )
+        total += len(rows)
+    db.commit()
+    return total
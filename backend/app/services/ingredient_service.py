@@ -0,0 +1,115 @@
+from sqlalchemy.orm import Session, aliased
+from sqlalchemy import func, case, literal
+from typing import List, Optional, Dict, Any, Iterable
+from app.models import Recipe, RecipeIngredient
+import re
+
+_WHITESPACE = re.compile(r"\s+")
+
+
+def normalize_ingredient_name(name: str) -> str:
+    """Normalize an ingredient name for index lookups ("  Kosher  Salt" -> "kosher salt")."""
+    return _WHITESPACE.sub(" ", str(name)).strip().lower()
+
+
+def normalize_pantry(names: Iterable[str]) -> List[str]:
+    """Normalize and de-duplicate a list of ingredient names, preserving order."""
+    seen = {}
+    for name in names:
+        normalized = normalize_ingredient_name(name)
+        if normalized:
+            seen.setdefault(normalized, None)
+    return list(seen)
+
+
+def sync_recipe_ingredients(recipe: Recipe) -> None:
+    """
+    Rebuild the ingredient index rows for a recipe from its ingredients JSON.
+    Must be called whenever `recipe.ingredients` is written.
+    """
+    names = normalize_pantry(
+        ing.get("name", "") if isinstance(ing, dict) else ing
+        for ing in (recipe.ingredients or [])
+    )
+    recipe.ingredient_index = [RecipeIngredient(name=name) for name in names]
+
+
+def pantry_search(
+    db: Session,
+    user_id: int,
+    pantry: List[str],
+    limit: int = 20,
+    max_missing: Optional[int] = None,
+) -> List[Dict[str, Any]]:
+    """
+    Rank recipes by how much of their ingredient list is covered by the pantry.
+
+    Only recipes sharing at least one ingredient with the pantry are considered,
+    so the candidate set is resolved through the (name, recipe_id) index rather
+    than by scanning every recipe. Results are ordered by coverage, then by
+    fewest missing ingredients.
+    """
+
+    pantry = normalize_pantry(pantry)
+    if not pantry:
+        return []
+
+    hit = aliased(RecipeIngredient)
+    candidates = db.query(hit.recipe_id).filter(hit.name.in_(pantry))
+
+    total = func.count(RecipeIngredient.name)
+    matched = func.sum(case((RecipeIngredient.name.in_(pantry), 1), else_=0))
+    missing = total - matched
+    coverage = matched * literal(1.0) / total
+
+    ranked = (
+        db.query(
+            RecipeIngredient.recipe_id,
+            total.label("total"),
+            matched.label("matched"),
+        )
+        .join(Recipe, Recipe.id == RecipeIngredient.recipe_id)
+        .filter(
+            Recipe.user_id == user_id,
+            RecipeIngredient.recipe_id.in_(candidates),
+        )
+        .group_by(RecipeIngredient.recipe_id)
+    )
+
+    if max_missing is not None:
+        ranked = ranked.having(missing <= max_missing)
+
+    rows = (
+        ranked.order_by(
+            coverage.desc(), missing.asc(), RecipeIngredient.recipe_id.desc()
+        )
+        .limit(limit)
+        .all()
+    )
+    if not rows:
+        return []
+
+    recipe_ids = [row.recipe_id for row in rows]
+
+    # Missing items are only resolved for the page being returned
+    missing_by_recipe: Dict[int, List[str]] = {rid: [] for rid in recipe_ids}
+    for recipe_id, name in (
+        db.query(RecipeIngredient.recipe_id, RecipeIngredient.name)
+        .filter(
+            RecipeIngredient.recipe_id.in_(recipe_ids),
+            RecipeIngredient.name.notin_(pantry),
+        )
+        .order_by(RecipeIngredient.name)
+    ):
+        missing_by_recipe[recipe_id].append(name)
+
+    return [
+        {
+            "recipe_id": row.recipe_id,
+            "matched_count": int(row.matched),
+            "total_count": int(row.total),
+            "coverage": int(row.matched) / row.total,
+            "missing": missing_by_recipe[row.recipe_id],
+        }
+        for row in rows
+    ]
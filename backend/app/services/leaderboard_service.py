@@ -0,0 +1,212 @@
+"""
+Top-rated and recently-cooked leaderboards.
+
+Aggregates live in `recipe_stats`, one row per rated recipe, updated in the
+same transaction as each rating write. Pages are read straight off the
+(user_id, bayesian_rating) and (user_id, last_cooked_at) indexes with keyset
+cursors, so serving a page costs O(page) regardless of catalog size.
+
+The Bayesian rating shrinks each recipe's mean toward the global mean:
+
+    (prior_weight * prior_mean + rating_sum) / (prior_weight + rating_count)
+
+so a single 5-star rating doesn't outrank a recipe with twenty 4.8s. The
+global mean drifts slowly; rating writes use the cached value and
+`refresh_leaderboards` periodically rescores every row against a fresh one.
+"""
+
+import asyncio
+import logging
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+from sqlalchemy import and_, delete, func, insert, literal, or_, select, update
+from sqlalchemy.orm import Session
+from starlette.concurrency import run_in_threadpool
+
+from app.core.cache import cache
+from app.core.config import settings
+from app.core.database import SessionLocal
+from app.models import Rating, Recipe, RecipeStats
+from app.services.recipe_service import enrich_recipes, summary_load_options
+
+logger = logging.getLogger(__name__)
+
+leaderboard_cache = cache.namespace("leaderboards")
+
+# Used until there are any ratings at all
+DEFAULT_PRIOR_MEAN = 3.0
+
+
+def bayesian_rating(rating_sum: float, rating_count: int, prior_mean: float) -> float:
+    weight = settings.LEADERBOARD_PRIOR_WEIGHT
+    return (weight * prior_mean + rating_sum) / (weight + rating_count)
+
+
+def compute_prior_mean(db: Session) -> float:
+    mean = db.scalar(select(func.avg(Rating.score)))
+    return float(mean) if mean is not None else DEFAULT_PRIOR_MEAN
+
+
+def prior_mean(db: Session) -> float:
+    """Global mean rating, cached between full refreshes."""
+    return leaderboard_cache.get_or_set(
+        "prior_mean",
+        lambda: compute_prior_mean(db),
+        ttl=settings.LEADERBOARD_REFRESH_SECONDS or None,
+    )
+
+
+def update_recipe_stats(db: Session, recipe_id: int, user_id: int) -> None:
+    """
+    Recompute one recipe's aggregates after a rating write. Flushes pending
+    changes first; the caller commits.
+    """
+    db.flush()
+    count, total, last_cooked = db.execute(
+        select(
+            func.count(Rating.id), func.sum(Rating.score), func.max(Rating.cooked_date)
+        ).where(Rating.recipe_id == recipe_id)
+    ).one()
+
+    stats = db.get(RecipeStats, recipe_id)
+    if not count:
+        if stats is not None:
+            db.delete(stats)
+        return
+
+    if stats is None:
+        stats = RecipeStats(recipe_id=recipe_id, user_id=user_id)
+        db.add(stats)
+    stats.rating_count = count
+    stats.rating_sum = float(total)
+    stats.last_cooked_at = last_cooked
+    stats.bayesian_rating = bayesian_rating(float(total), count, prior_mean(db))
+
+
+def refresh_leaderboards(db: Session, rebuild: bool = False) -> Dict[str, Any]:
+    """
+    Rescore every row against a freshly computed global mean. With
+    `rebuild`, first regenerate all aggregates from the ratings table (for
+    backfills or after bulk imports that bypassed the API). Commits.
+    """
+    mean = compute_prior_mean(db)
+    weight = settings.LEADERBOARD_PRIOR_WEIGHT
+
+    if rebuild:
+        db.execute(delete(RecipeStats))
+        aggregates = (
+            select(
+                Rating.recipe_id,
+                Recipe.user_id,
+                func.count(Rating.id),
+                func.sum(Rating.score),
+                func.max(Rating.cooked_date),
+                literal(0.0),  # scored below
+            )
+            .join(Recipe, Recipe.id == Rating.recipe_id)
+            .group_by(Rating.recipe_id, Recipe.user_id)
+        )
+        db.execute(
+            insert(RecipeStats).from_select(
+                [
+                    "recipe_id",
+                    "user_id",
+                    "rating_count",
+                    "rating_sum",
+                    "last_cooked_at",
+                    "bayesian_rating",
+                ],
+                aggregates,
+            )
+        )
+
+    result = db.execute(
+        update(RecipeStats).values(
+            bayesian_rating=(weight * mean + RecipeStats.rating_sum)
+            / (weight + RecipeStats.rating_count)
+        )
+    )
+    db.commit()
+    leaderboard_cache.set(
+        "prior_mean", mean, ttl=settings.LEADERBOARD_REFRESH_SECONDS or None
+    )
+    return {"prior_mean": mean, "recipes": result.rowcount, "rebuilt": rebuild}
+
+
+async def run_periodic_refresh(interval: float) -> None:
+    """Background task rescoring the leaderboards every `interval` seconds."""
+
+    def refresh():
+        db = SessionLocal()
+        try:
+            refresh_leaderboards(db)
+        finally:
+            db.close()
+
+    while True:
+        await asyncio.sleep(interval)
+        try:
+            await run_in_threadpool(refresh)
+        except Exception:
+            logger.exception("Leaderboard refresh failed")
+
+
+def _encode_cursor(value, recipe_id: int) -> str:
+    if isinstance(value, datetime):
+        value = value.isoformat()
+    return f"{value}|{recipe_id}"
+
+
+def _decode_cursor(cursor: str, kind: str) -> Tuple[Any, int]:
+    try:
+        value, recipe_id = cursor.rsplit("|", 1)
+        if kind == "top":
+            return float(value), int(recipe_id)
+        return datetime.fromisoformat(value), int(recipe_id)
+    except ValueError:
+        raise ValueError(f"Invalid cursor: {cursor}")
+
+
+def leaderboard_page(
+    db: Session,
+    user_id: int,
+    kind: str,
+    limit: int = 20,
+    cursor: Optional[str] = None,
+) -> Dict[str, Any]:
+    """
+    One page of the "top" (by Bayesian rating) or "recent" (by last cooked
+    date) leaderboard as recipe summaries plus their leaderboard fields.
+    Raises ValueError for a malformed cursor.
+    """
+    key = RecipeStats.bayesian_rating if kind == "top" else RecipeStats.last_cooked_at
+
+    query = (
+        db.query(RecipeStats, Recipe)
+        .join(Recipe, Recipe.id == RecipeStats.recipe_id)
+        .options(summary_load_options())
+        .filter(RecipeStats.user_id == user_id)
+    )
+    if kind == "recent":
+        query = query.filter(RecipeStats.last_cooked_at.isnot(None))
+    if cursor:
+        value, recipe_id = _decode_cursor(cursor, kind)
+        query = query.filter(
+            or_(key < value, and_(key == value, RecipeStats.recipe_id < recipe_id))
+        )
+    rows = query.order_by(key.desc(), RecipeStats.recipe_id.desc()).limit(limit).all()
+
+    items: List[Dict[str, Any]] = enrich_recipes(db, [recipe for _, recipe in rows])
+    for item, (stats, _) in zip(items, rows):
+        item["bayesian_rating"] = stats.bayesian_rating
+        item["last_cooked_at"] = stats.last_cooked_at
+
+    next_cursor = None
+    if len(rows) == limit:
+        last = rows[-1][0]
+        next_cursor = _encode_cursor(
+            last.bayesian_rating if kind == "top" else last.last_cooked_at,
+            last.recipe_id,
+        )
+    return {"items": items, "next_cursor": next_cursor}
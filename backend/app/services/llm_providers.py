@@ -0,0 +1,238 @@
+"""
+Chat completion backends for llm_service.
+
+    openai  the OpenAI API (OPENAI_API_KEY, OPENAI_MODEL)
+    local   any OpenAI-compatible server, e.g. llama.cpp's server or vLLM
+            (LOCAL_LLM_BASE_URL, LOCAL_LLM_MODEL)
+    fake    deterministic canned responses derived from the prompt; no
+            network, for tests, offline development and load tests
+
+LLM_PROVIDER picks the default and LLM_ROUTES can send individual operations
+elsewhere, e.g. {"revise_patch": "local"} to serve small patch revisions
+from a fast local model. Providers and their SDK clients are built on first
+use, so importing this module doesn't import or configure the OpenAI SDK.
+"""
+
+import hashlib
+import json
+import random
+import threading
+import time
+from typing import Dict, List, NamedTuple, Optional
+
+from app.core.config import settings
+
+
+class Usage(NamedTuple):
+    prompt_tokens: int
+    completion_tokens: int
+
+
+class Completion(NamedTuple):
+    content: str
+    usage: Optional[Usage]
+
+
+class LLMTimeoutError(TimeoutError):
+    """The backend didn't answer within the request timeout."""
+
+
+class LLMProvider:
+    """A JSON-mode chat completion backend."""
+
+    name: str = ""
+    model: str = ""
+
+    def complete(
+        self,
+        operation: str,
+        system_prompt: str,
+        user_prompt: str,
+        timeout: Optional[float] = None,
+    ) -> Completion:
+        """Blocking completion returning the JSON text and token usage."""
+        raise NotImplementedError
+
+    def warmup(self) -> None:
+        """Do first-use setup (SDK import, client construction) ahead of time."""
+
+
+class OpenAICompatibleProvider(LLMProvider):
+    """OpenAI or a server speaking its chat completions API."""
+
+    def __init__(
+        self,
+        name: str,
+        model: str,
+        api_key: str = "",
+        base_url: Optional[str] = None,
+        json_mode: bool = True,
+        client=None,
+    ):
+        self.name = name
+        self.model = model
+        self.api_key = api_key
+        self.base_url = base_url
+        self.json_mode = json_mode
+        self._client = client
+        self._timeout_errors: tuple = ()  # SDK exception types, once imported
+        self._lock = threading.Lock()
+
+    @property
+    def client(self):
+        if self._client is None:
+            with self._lock:
+                if self._client is None:
+                    from openai import APITimeoutError, OpenAI
+
+                    self._timeout_errors = (APITimeoutError,)
+                    self._client = OpenAI(
+                        api_key=self.api_key or "unused", base_url=self.base_url
+                    )
+        return self._client
+
+    def warmup(self):
+        self.client
+
+    def complete(self, operation, system_prompt, user_prompt, timeout=None):
+        kwargs = {}
+        if self.json_mode:
+            kwargs["response_format"] = {"type": "json_object"}
+        client = self.client
+        try:
+            response = client.chat.completions.create(
+                model=self.model,
+                messages=[
+                    {"role": "system", "content": system_prompt},
+                    {"role": "user", "content": user_prompt},
+                ],
+                temperature=0.7,
+                timeout=timeout,
+                **kwargs,
+            )
+        except self._timeout_errors as e:
+            raise LLMTimeoutError(str(e)) from e
+        usage = None
+        if response.usage is not None:
+            usage = Usage(
+                response.usage.prompt_tokens or 0,
+                response.usage.completion_tokens or 0,
+            )
+        return Completion(response.choices[0].message.content, usage)
+
+
+class FakeProvider(LLMProvider):
+    """
+    Canned but plausible responses, seeded from the prompt so the same
+    request always gets the same answer. `latency` (seconds) simulates the
+    upstream call with a blocking sleep, like the real SDK.
+    """
+
+    name = "fake"
+    model = "fake"
+
+    PROTEINS = ["chicken thighs", "short ribs", "salmon fillets", "pork belly"]
+    AROMATICS = ["garlic cloves", "shallot", "ginger", "fresh thyme", "lemon"]
+    FINISHES = ["Brown Butter", "Salsa Verde", "Red Wine Jus", "Chili Crisp"]
+
+    def __init__(self, latency: float = 0.0):
+        self.latency = latency
+
+    def complete(self, operation, system_prompt, user_prompt, timeout=None):
+        if self.latency:
+            time.sleep(self.latency)
+        rng = random.Random(hashlib.sha256(user_prompt.encode()).digest())
+        if operation == "revise_patch":
+            data = {
+                "ingredients": {
+                    "upsert": [
+                        {
+                            "name": "flaky sea salt",
+                            "amount": "1",
+                            "unit": "pinch",
+                            "notes": "to finish",
+                        }
+                    ]
+                },
+                "steps": {"insert": [{"text": "Taste and adjust seasoning."}]},
+            }
+        else:
+            data = self._recipe(rng)
+        content = json.dumps(data)
+        return Completion(
+            content,
+            Usage((len(system_prompt) + len(user_prompt)) // 4, len(content) // 4),
+        )
+
+    def _recipe(self, rng: random.Random) -> Dict:
+        protein = rng.choice(self.PROTEINS)
+        finish = rng.choice(self.FINISHES)
+        aromatics: List[str] = rng.sample(self.AROMATICS, 3)
+        return {
+            "title": f"Seared {protein.title()} with {finish}",
+            "description": f"Crisp-edged {protein} finished with {finish.lower()}.",
+            "ingredients": [
+                {"name": protein, "amount": "2", "unit": "lbs", "notes": None},
+                *(
+                    {"name": name, "amount": "2", "unit": "tbsp", "notes": None}
+                    for name in aromatics
+                ),
+                {"name": "butter", "amount": "3", "unit": "tbsp", "notes": "cold"},
+            ],
+            "instructions": "\n".join(
+                [
+                    f"1. Season the {protein} and rest 20 minutes.",
+                    "2. Sear in a hot pan until deeply browned.",
+                    f"3. Add the {', '.join(aromatics)} and baste with butter.",
+                    f"4. Rest, then finish with {finish.lower()}.",
+                ]
+            ),
+            "prep_time": rng.choice([10, 15, 20]),
+            "cook_time": rng.choice([20, 30, 45]),
+            "equipment": ["cast-iron skillet", "tongs"],
+            "plating_notes": "Slice against the grain and sauce underneath.",
+            "suggested_tags": ["restaurant-style"],
+        }
+
+
+def create_provider(name: str) -> LLMProvider:
+    if name == "openai":
+        return OpenAICompatibleProvider(
+            "openai", settings.OPENAI_MODEL, api_key=settings.OPENAI_API_KEY
+        )
+    if name == "local":
+        return OpenAICompatibleProvider(
+            "local",
+            settings.LOCAL_LLM_MODEL,
+            api_key=settings.LOCAL_LLM_API_KEY,
+            base_url=settings.LOCAL_LLM_BASE_URL,
+            json_mode=settings.LOCAL_LLM_JSON_MODE,
+        )
+    if name == "fake":
+        return FakeProvider(latency=settings.LLM_FAKE_LATENCY_MS / 1000)
+    raise ValueError(f"Unsupported LLM provider: {name}")
+
+
+_providers: Dict[str, LLMProvider] = {}
+_providers_lock = threading.Lock()
+_override: Optional[LLMProvider] = None
+
+
+def get_provider(operation: str) -> LLMProvider:
+    """The provider serving `operation` ("generate", "revise", ...)."""
+    if _override is not None:
+        return _override
+    name = settings.LLM_ROUTES.get(operation, settings.LLM_PROVIDER)
+    provider = _providers.get(name)
+    if provider is None:
+        with _providers_lock:
+            provider = _providers.get(name)
+            if provider is None:
+                provider = _providers[name] = create_provider(name)
+    return provider
+
+
+def override_provider(provider: Optional[LLMProvider]) -> None:
+    """Send every operation to `provider` (None restores routing); for tests."""
+    global _override
+    _override = provider
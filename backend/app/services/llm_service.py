@@ -1,9 +1,28 @@
-from openai import OpenAI
+import asyncio
+import hashlib
+import logging
+import threading
+from typing import AsyncIterator, Dict, List, Optional
+from starlette.concurrency import run_in_threadpool
+from app.core.cache import cache
+from app.core.circuit_breaker import CircuitBreaker, CircuitOpenError
 from app.core.config import settings
+from app.core.metrics import LLM_FALLBACKS, track_llm_call, record_llm_usage
+from app.core.rate_limit import record_token_usage
+from app.core.tracing import tracer
+from opentelemetry.trace import SpanKind
 from app.schemas import LLMGenerateRequest, LLMGenerateResponse, Ingredient
+from app.services.llm_providers import LLMProvider, LLMTimeoutError, get_provider
+from app.services.recipe_patch import PatchError, apply_patch, compact_recipe
 import json
 
-client = OpenAI(api_key=settings.OPENAI_API_KEY)
+logger = logging.getLogger(__name__)
+
+# Recent generations, served when the LLM is down and the same request repeats
+fallback_cache = cache.namespace("llm_fallback")
+
+_breakers: Dict[str, CircuitBreaker] = {}
+_breakers_lock = threading.Lock()
 
 SYSTEM_PROMPT = """You are an expert chef specializing in restaurant-quality recipes. 
 When generating recipes, focus on professional techniques, proper seasoning, plating presentation, 
@@ -25,9 +44,120 @@ Always respond with valid JSON matching this exact schema:
 }
 """
 
+PATCH_SYSTEM_PROMPT = """You are an expert chef revising restaurant-quality recipes.
+Make the smallest change that addresses the cook's feedback. The recipe's steps are
+numbered from 1 in the order given.
+
+Respond with valid JSON containing ONLY what changes; omit every field that stays the same:
+{
+    "title": "New title",
+    "description": "New description",
+    "ingredients": {
+        "remove": ["name of an ingredient to drop"],
+        "upsert": [{"name": "ingredient name", "amount": "2", "unit": "tbsp", "notes": "optional"}]
+    },
+    "steps": {
+        "replace": {"3": "full new text of step 3"},
+        "remove": [5],
+        "insert": [{"after": 2, "text": "new step after step 2 (0 inserts first)"}]
+    },
+    "equipment": {"add": ["item"], "remove": ["item"]},
+    "prep_time": 30,
+    "cook_time": 45,
+    "plating_notes": "New plating notes",
+    "suggested_tags": ["tag"]
+}
+An upserted ingredient replaces the existing ingredient with the same name, or is added.
+"""
+
+
+def _breaker(provider: LLMProvider) -> CircuitBreaker:
+    breaker = _breakers.get(provider.name)
+    if breaker is None:
+        with _breakers_lock:
+            breaker = _breakers.get(provider.name)
+            if breaker is None:
+                breaker = _breakers[provider.name] = CircuitBreaker(
+                    f"llm:{provider.name}",
+                    window=settings.LLM_CIRCUIT_WINDOW,
+                    min_calls=settings.LLM_CIRCUIT_MIN_CALLS,
+                    failure_rate=settings.LLM_CIRCUIT_FAILURE_RATE,
+                    slow_call_seconds=settings.LLM_CIRCUIT_SLOW_SECONDS,
+                    open_seconds=settings.LLM_CIRCUIT_OPEN_SECONDS,
+                )
+    return breaker
+
 
-async def generate_recipe(request: LLMGenerateRequest) -> LLMGenerateResponse:
-    """Generate a recipe using OpenAI API with structured output."""
+def llm_available(operation: str) -> bool:
+    """False while the circuit for `operation`'s provider is refusing calls."""
+    return _breaker(get_provider(operation)).allows_calls()
+
+
+def _complete(
+    operation: str,
+    user_prompt: str,
+    timeout: Optional[float] = None,
+    system_prompt: str = SYSTEM_PROMPT,
+) -> str:
+    """
+    Run a JSON-mode chat completion, recording latency, tokens and errors.
+    Blocking; async callers go through `_complete_async`. Raises
+    CircuitOpenError without calling out while the provider's circuit is open.
+    """
+    provider = get_provider(operation)
+    with tracer.start_as_current_span(
+        f"llm {operation}",
+        kind=SpanKind.CLIENT,
+        attributes={
+            "gen_ai.system": provider.name,
+            "gen_ai.operation.name": operation,
+            "gen_ai.request.model": provider.model,
+        },
+    ) as span:
+        with _breaker(provider).call(), track_llm_call(operation):
+            completion = provider.complete(
+                operation, system_prompt, user_prompt, timeout=timeout
+            )
+        record_llm_usage(operation, completion.usage)
+        record_token_usage(completion.usage)
+        if completion.usage is not None:
+            span.set_attribute(
+                "gen_ai.usage.input_tokens", completion.usage.prompt_tokens
+            )
+            span.set_attribute(
+                "gen_ai.usage.output_tokens", completion.usage.completion_tokens
+            )
+    return completion.content
+
+
+async def _complete_async(
+    operation: str,
+    user_prompt: str,
+    timeout: Optional[float] = None,
+    system_prompt: str = SYSTEM_PROMPT,
+) -> str:
+    # The SDK call blocks, so keep it off the event loop
+    return await run_in_threadpool(
+        _complete, operation, user_prompt, timeout, system_prompt
+    )
+
+
+def _fallback_key(request: LLMGenerateRequest) -> str:
+    prompt = " ".join(request.prompt.lower().split())
+    key = f"{prompt}|{request.style}|{request.servings}"
+    return hashlib.sha1(key.encode()).hexdigest()
+
+
+async def generate_recipe(
+    request: LLMGenerateRequest, timeout: Optional[float] = None
+) -> LLMGenerateResponse:
+    """
+    Generate a recipe using OpenAI API with structured output.
+
+    If the LLM call fails (or its circuit is open) and the same request
+    was answered recently, that answer is returned instead.
+    CircuitOpenError is raised unwrapped so callers can fail fast.
+    """
 
     user_prompt = f"""Generate a {request.style} recipe for: {request.prompt}
     
@@ -43,17 +173,7 @@ Focus on:
 Return ONLY valid JSON following the schema."""
 
     try:
-        response = client.chat.completions.create(
-            model=settings.OPENAI_MODEL,
-            messages=[
-                {"role": "system", "content": SYSTEM_PROMPT},
-                {"role": "user", "content": user_prompt},
-            ],
-            temperature=0.7,
-            response_format={"type": "json_object"},
-        )
-
-        content = response.choices[0].message.content
+        content = await _complete_async("generate", user_prompt, timeout)
         recipe_data = json.loads(content)
 
         # Convert ingredients to Pydantic models
@@ -64,7 +184,7 @@ Return ONLY valid JSON following the schema."""
             for ing in recipe_data.get("ingredients", [])
         ]
 
-        return LLMGenerateResponse(
+        result = LLMGenerateResponse(
             title=recipe_data.get("title", "Untitled Recipe"),
             description=recipe_data.get("description", ""),
             ingredients=ingredients,
@@ -76,34 +196,78 @@ Return ONLY valid JSON following the schema."""
             suggested_tags=recipe_data.get("suggested_tags", []),
         )
     except Exception as e:
+        cached = fallback_cache.get(_fallback_key(request))
+        if cached is not None:
+            LLM_FALLBACKS.inc()
+            logger.warning("Serving cached generation after LLM failure: %s", e)
+            return LLMGenerateResponse(**cached)
+        if isinstance(e, CircuitOpenError):
+            raise
         raise Exception(f"Failed to generate recipe: {str(e)}")
 
+    if settings.LLM_FALLBACK_CACHE_TTL:
+        fallback_cache.set(
+            _fallback_key(request),
+            result.model_dump(mode="json"),
+            ttl=settings.LLM_FALLBACK_CACHE_TTL,
+        )
+    return result
+
 
-async def revise_recipe(recipe_data: dict, notes: str) -> LLMGenerateResponse:
-    """Revise an existing recipe based on user notes."""
+def revision_prompt(recipe_data: dict, notes: str, mode: str) -> str:
+    """User prompt for a full or patch revision of `recipe_data`."""
+    if mode == "patch":
+        return f"""Recipe:
+{compact_recipe(recipe_data, numbered_steps=True)}
+
+Feedback:
+{notes}
 
-    user_prompt = f"""Revise this recipe based on the following feedback:
+Return ONLY the JSON patch."""
+
+    return f"""Revise this recipe based on the following feedback:
 
 Current Recipe:
-{json.dumps(recipe_data, indent=2)}
+{compact_recipe(recipe_data)}
 
 Feedback:
 {notes}
 
 Generate an improved version addressing the feedback. Return ONLY valid JSON following the schema."""
 
-    try:
-        response = client.chat.completions.create(
-            model=settings.OPENAI_MODEL,
-            messages=[
-                {"role": "system", "content": SYSTEM_PROMPT},
-                {"role": "user", "content": user_prompt},
-            ],
-            temperature=0.7,
-            response_format={"type": "json_object"},
-        )
 
-        content = response.choices[0].message.content
+async def revise_recipe(
+    recipe_data: dict, notes: str, mode: Optional[str] = None
+) -> LLMGenerateResponse:
+    """
+    Revise an existing recipe based on user notes.
+
+    "patch" mode (the default, see LLM_REVISION_MODE) asks only for the
+    changes and applies them here, so tokens scale with the edit rather
+    than the recipe. A patch that doesn't apply falls back to a full
+    revision. CircuitOpenError is raised unwrapped.
+    """
+
+    mode = mode or settings.LLM_REVISION_MODE
+    if mode == "patch":
+        try:
+            content = await _complete_async(
+                "revise_patch",
+                revision_prompt(recipe_data, notes, "patch"),
+                system_prompt=PATCH_SYSTEM_PROMPT,
+            )
+            return apply_patch(recipe_data, json.loads(content))
+        except (PatchError, json.JSONDecodeError) as e:
+            logger.warning("Revision patch rejected, retrying in full mode: %s", e)
+        except CircuitOpenError:
+            raise
+        except Exception as e:
+            raise Exception(f"Failed to revise recipe: {str(e)}")
+
+    user_prompt = revision_prompt(recipe_data, notes, "full")
+
+    try:
+        content = await _complete_async("revise", user_prompt)
         recipe_data = json.loads(content)
 
         ingredients = [
@@ -124,5 +288,53 @@ Generate an improved version addressing the feedback. Return ONLY valid JSON fol
             plating_notes=recipe_data.get("plating_notes"),
             suggested_tags=recipe_data.get("suggested_tags", []),
         )
+    except CircuitOpenError:
+        raise
     except Exception as e:
         raise Exception(f"Failed to revise recipe: {str(e)}")
+
+
+async def generate_batch(
+    requests: List[LLMGenerateRequest],
+    concurrency: Optional[int] = None,
+    timeout: Optional[float] = None,
+) -> AsyncIterator[Dict]:
+    """
+    Generate several recipes concurrently, yielding one result per request
+    as soon as it finishes (not in request order). At most `concurrency`
+    completions run at once and each gets `timeout` seconds; a failure or
+    timeout is reported in that item's result and doesn't affect the rest.
+
+    Results: {"index", "status": "ok" | "error" | "timeout", "recipe", "error"}
+    """
+    concurrency = concurrency or settings.LLM_BATCH_CONCURRENCY
+    timeout = timeout or settings.LLM_BATCH_ITEM_TIMEOUT
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def run(index: int, request: LLMGenerateRequest) -> Dict:
+        result = {"index": index, "status": "ok", "recipe": None, "error": None}
+        async with semaphore:
+            try:
+                # The SDK timeout frees the worker thread; wait_for bounds
+                # the wait even if the SDK overruns it
+                recipe = await asyncio.wait_for(
+                    generate_recipe(request, timeout=timeout), timeout + 1
+                )
+                result["recipe"] = recipe.model_dump(mode="json")
+            except asyncio.TimeoutError:
+                result.update(status="timeout", error=f"Timed out after {timeout:g}s")
+            except Exception as e:
+                # generate_recipe wraps SDK errors; look through to the cause
+                timed_out = isinstance(e.__context__, LLMTimeoutError)
+                result.update(status="timeout" if timed_out else "error", error=str(e))
+        return result
+
+    tasks = [asyncio.create_task(run(i, r)) for i, r in enumerate(requests)]
+    try:
+        for finished in asyncio.as_completed(tasks):
+            yield await finished
+    finally:
+        # Client went away mid-stream; don't keep spending tokens
+        for task in tasks:
+            task.cancel()
+
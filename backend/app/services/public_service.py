@@ -0,0 +1,184 @@
+"""
+Public recipe gallery: auth-free listing, detail and search.
+
+Responses are built to be cached at the edge. Each one carries a
+`Surrogate-Key` header naming what it depends on: `recipe-<id>` for every
+recipe in it, plus `public-recipes` for pages whose membership can change
+(listings and search). The same keys tag the origin-side cache entries.
+
+A flush hook collects the keys touched by each transaction and purges them
+after commit, both from the origin cache and, when CDN_PURGE_URL is set,
+from the CDN:
+
+- any change to a recipe that is or was public purges its key and
+  `public-recipes`, since it may enter, leave or reorder listings;
+- rating, photo and tag changes on a public recipe purge only its key,
+  which covers every cached page that embeds it.
+"""
+
+import hashlib
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+from sqlalchemy import event, inspect, select
+from sqlalchemy.orm import Session
+
+from app.core.cache import cache
+from app.core.config import settings
+from app.core.database import RoutingSession
+from app.models import Photo, Rating, Recipe, RecipeTag
+from app.services.recipe_service import enrich_recipes, summary_load_options
+from app.services.search_service import search_recipes
+
+logger = logging.getLogger(__name__)
+
+public_cache = cache.namespace("public")
+
+LIST_KEY = "public-recipes"
+
+# Purges go out in the background so writes don't wait on the CDN API
+_purge_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="cdn-purge")
+
+
+def recipe_key(recipe_id: int) -> str:
+    return f"recipe-{recipe_id}"
+
+
+def cache_headers(keys: Iterable[str]) -> Dict[str, str]:
+    return {
+        "Cache-Control": (
+            f"public, max-age={settings.PUBLIC_CACHE_MAX_AGE}, "
+            f"s-maxage={settings.PUBLIC_CACHE_S_MAXAGE}, stale-while-revalidate=60"
+        ),
+        "Surrogate-Key": " ".join(sorted(keys)),
+    }
+
+
+def _cached(key: str, loader) -> Tuple[Any, List[str]]:
+    """
+    Origin cache for public payloads. `loader` returns (payload, surrogate
+    keys); entries are tagged with those keys so purges drop them too.
+    """
+    entry = public_cache.get(key)
+    if entry is None:
+        payload, keys = loader()
+        entry = {"payload": payload, "keys": sorted(keys)}
+        public_cache.set(key, entry, tags=entry["keys"])
+    return entry["payload"], entry["keys"]
+
+
+def list_public(
+    db: Session, limit: int = 20, cursor: Optional[str] = None
+) -> Tuple[Dict[str, Any], List[str]]:
+    """
+    Newest public recipes as summaries, keyset-paginated by id over the
+    partial index on public recipes. Raises ValueError for a malformed cursor.
+    """
+    try:
+        before = int(cursor) if cursor else None
+    except ValueError:
+        raise ValueError(f"Invalid cursor: {cursor}")
+
+    def load():
+        query = (
+            db.query(Recipe)
+            .options(summary_load_options())
+            .filter(Recipe.is_public == True)
+        )
+        if before is not None:
+            query = query.filter(Recipe.id < before)
+        recipes = query.order_by(Recipe.id.desc()).limit(limit).all()
+        next_cursor = str(recipes[-1].id) if len(recipes) == limit else None
+        page = {"items": enrich_recipes(db, recipes), "next_cursor": next_cursor}
+        return page, [LIST_KEY, *(recipe_key(r.id) for r in recipes)]
+
+    return _cached(f"list:{limit}:{before or ''}", load)
+
+
+def get_public(db: Session, recipe_id: int) -> Tuple[Optional[Dict], List[str]]:
+    """A full public recipe, or None when it doesn't exist or is private."""
+
+    def load():
+        recipe = (
+            db.query(Recipe)
+            .filter(Recipe.id == recipe_id, Recipe.is_public == True)
+            .first()
+        )
+        # Misses are cached under the same key so publishing purges them
+        payload = enrich_recipes(db, [recipe], full=True)[0] if recipe else None
+        return payload, [recipe_key(recipe_id)]
+
+    return _cached(f"recipe:{recipe_id}", load)
+
+
+def search_public(
+    db: Session, query: str, limit: int = 20
+) -> Tuple[List[Dict[str, Any]], List[str]]:
+    query = " ".join(query.split()).lower()
+    digest = hashlib.sha1(query.encode()).hexdigest()
+
+    def load():
+        results = search_recipes(db, None, query, limit=limit, public=True)
+        return results, [LIST_KEY, *(recipe_key(r["id"]) for r in results)]
+
+    return _cached(f"search:{limit}:{digest}", load)
+
+
+def purge(keys: Iterable[str]) -> None:
+    """Drop origin cache entries and CDN objects tagged with any of `keys`."""
+    keys = sorted(set(keys))
+    if not keys:
+        return
+    public_cache.invalidate(*keys)
+    if settings.CDN_PURGE_URL:
+        _purge_executor.submit(_purge_cdn, keys)
+
+
+def _purge_cdn(keys: List[str]) -> None:
+    import httpx
+
+    headers = {"Surrogate-Key": " ".join(keys)}
+    if settings.CDN_PURGE_TOKEN:
+        headers["Fastly-Key"] = settings.CDN_PURGE_TOKEN
+    try:
+        response = httpx.post(settings.CDN_PURGE_URL, headers=headers, timeout=10)
+        response.raise_for_status()
+    except httpx.HTTPError:
+        logger.exception("CDN purge failed for %s", " ".join(keys))
+
+
+def _was_public(recipe: Recipe) -> bool:
+    history = inspect(recipe).attrs.is_public.history
+    return bool(recipe.is_public) or any(history.deleted)
+
+
+@event.listens_for(RoutingSession, "after_flush")
+def _collect_surrogate_keys(session, flush_context) -> None:
+    keys: Set[str] = session.info.setdefault("surrogate_keys", set())
+    related: Set[int] = set()
+    for obj in (*session.new, *session.dirty, *session.deleted):
+        if isinstance(obj, Recipe):
+            if _was_public(obj) and (
+                obj not in session.dirty or session.is_modified(obj)
+            ):
+                keys.update((recipe_key(obj.id), LIST_KEY))
+        elif isinstance(obj, (Rating, Photo, RecipeTag)):
+            related.add(obj.recipe_id)
+
+    related.difference_update(int(key.split("-")[1]) for key in keys if key != LIST_KEY)
+    if related:
+        public_ids = session.connection().scalars(
+            select(Recipe.id).where(Recipe.id.in_(related), Recipe.is_public == True)
+        )
+        keys.update(recipe_key(recipe_id) for recipe_id in public_ids)
+
+
+@event.listens_for(RoutingSession, "after_commit")
+def _purge_after_commit(session) -> None:
+    purge(session.info.pop("surrogate_keys", ()))
+
+
+@event.listens_for(RoutingSession, "after_rollback")
+def _discard_keys(session) -> None:
+    session.info.pop("surrogate_keys", None)
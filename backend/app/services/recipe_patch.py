@@ -0,0 +1,201 @@
+"""
+Compact recipe encoding and structured patches for LLM revisions.
+
+Full revisions send the whole recipe and get the whole recipe back, so both
+prompt and completion grow with recipe length. In patch mode the recipe is
+sent compactly (no indentation, no null fields, instructions split into
+numbered steps) and the model answers with only what changed:
+
+    {
+        "title": "...",
+        "ingredients": {"remove": ["capers"], "upsert": [{"name": "lemon", ...}]},
+        "steps": {"replace": {"3": "..."}, "remove": [5], "insert": [{"after": 2, "text": "..."}]},
+        "equipment": {"add": ["..."], "remove": ["..."]},
+        "cook_time": 40
+    }
+
+`apply_patch` applies it to the stored recipe and validates the result the
+same way a full response is validated.
+"""
+
+import json
+import re
+from typing import Any, Dict, List, Optional
+
+from pydantic import ValidationError
+
+from app.schemas import Ingredient, LLMGenerateResponse
+from app.services.ingredient_service import normalize_ingredient_name
+
+SCALAR_FIELDS = ("title", "description", "prep_time", "cook_time", "plating_notes")
+
+_STEP_NUMBER = re.compile(r"^\s*\d+[.)]\s*")
+
+
+class PatchError(ValueError):
+    """The model's patch is malformed or doesn't fit the recipe."""
+
+
+def dumps_compact(data: Any) -> str:
+    """JSON without whitespace or non-ASCII escapes, for prompts."""
+    return json.dumps(data, separators=(",", ":"), ensure_ascii=False)
+
+
+def split_steps(instructions: Optional[str]) -> List[str]:
+    """Instruction text as a list of steps, with any leading numbering removed."""
+    return [
+        _STEP_NUMBER.sub("", line).strip()
+        for line in (instructions or "").splitlines()
+        if line.strip()
+    ]
+
+
+def join_steps(steps: List[str]) -> str:
+    return "\n".join(f"{n}. {step}" for n, step in enumerate(steps, start=1))
+
+
+def _drop_empty(item: Dict[str, Any]) -> Dict[str, Any]:
+    return {key: value for key, value in item.items() if value not in (None, "", [])}
+
+
+def compact_recipe(recipe_data: Dict[str, Any], numbered_steps: bool = False) -> str:
+    """
+    Prompt encoding of a recipe: empty fields and ingredient keys dropped.
+    With `numbered_steps`, instructions become a "steps" list the patch can
+    address by number.
+    """
+    data = _drop_empty(dict(recipe_data))
+    data["ingredients"] = [
+        _drop_empty(ing) if isinstance(ing, dict) else ing
+        for ing in recipe_data.get("ingredients") or []
+    ]
+    if numbered_steps:
+        data.pop("instructions", None)
+        data["steps"] = split_steps(recipe_data.get("instructions"))
+    return dumps_compact(data)
+
+
+def _ingredient(item: Any) -> Ingredient:
+    try:
+        if isinstance(item, dict):
+            return Ingredient(**item)
+        return Ingredient(name=str(item), amount="", unit=None)
+    except (TypeError, ValidationError) as e:
+        raise PatchError(f"Invalid ingredient {item!r}: {e}")
+
+
+def _section(patch: Dict[str, Any], name: str) -> Dict[str, Any]:
+    section = patch.get(name) or {}
+    if not isinstance(section, dict):
+        raise PatchError(f'"{name}" must be an object')
+    return section
+
+
+def _apply_ingredients(
+    ingredients: List[Ingredient], section: Dict[str, Any]
+) -> List[Ingredient]:
+    remove = {normalize_ingredient_name(name) for name in section.get("remove", [])}
+    result = [
+        ing for ing in ingredients if normalize_ingredient_name(ing.name) not in remove
+    ]
+    positions = {normalize_ingredient_name(ing.name): n for n, ing in enumerate(result)}
+    for item in section.get("upsert", []):
+        ingredient = _ingredient(item)
+        key = normalize_ingredient_name(ingredient.name)
+        if key in positions:
+            result[positions[key]] = ingredient
+        else:
+            positions[key] = len(result)
+            result.append(ingredient)
+    return result
+
+
+def _step_number(value: Any, count: int, allow_zero: bool = False) -> int:
+    try:
+        number = int(value)
+    except (TypeError, ValueError):
+        raise PatchError(f"Invalid step number {value!r}")
+    if not (0 if allow_zero else 1) <= number <= count:
+        raise PatchError(f"Step {number} is out of range (recipe has {count})")
+    return number
+
+
+def _apply_steps(steps: List[str], section: Dict[str, Any]) -> List[str]:
+    """Step numbers refer to the original list, so apply everything at once."""
+    count = len(steps)
+    replaced = {
+        _step_number(number, count): str(text)
+        for number, text in (section.get("replace") or {}).items()
+    }
+    removed = {_step_number(number, count) for number in section.get("remove", [])}
+    inserted: Dict[int, List[str]] = {}
+    for item in section.get("insert", []):
+        if not isinstance(item, dict) or "text" not in item:
+            raise PatchError(f"Invalid step insert {item!r}")
+        after = _step_number(item.get("after", count), count, allow_zero=True)
+        inserted.setdefault(after, []).append(str(item["text"]))
+
+    result = list(inserted.get(0, []))
+    for number, step in enumerate(steps, start=1):
+        if number not in removed:
+            result.append(replaced.get(number, step))
+        result.extend(inserted.get(number, []))
+    return result
+
+
+def apply_patch(
+    recipe_data: Dict[str, Any], patch: Dict[str, Any]
+) -> LLMGenerateResponse:
+    """
+    Apply a revision patch to a stored recipe. Fields the patch leaves out
+    are kept. Raises PatchError when the patch can't be applied.
+    """
+    if not isinstance(patch, dict):
+        raise PatchError("Patch must be a JSON object")
+    try:
+        return _apply(recipe_data, patch)
+    except (TypeError, AttributeError) as e:
+        # Wrong shapes inside a section (a string where a list belongs, ...)
+        raise PatchError(f"Malformed patch: {e}")
+
+
+def _apply(recipe_data: Dict[str, Any], patch: Dict[str, Any]) -> LLMGenerateResponse:
+    ingredients = _apply_ingredients(
+        [_ingredient(ing) for ing in recipe_data.get("ingredients") or []],
+        _section(patch, "ingredients"),
+    )
+
+    steps_section = _section(patch, "steps")
+    instructions = recipe_data.get("instructions") or ""
+    if steps_section:
+        instructions = join_steps(
+            _apply_steps(split_steps(instructions), steps_section)
+        )
+
+    equipment_section = _section(patch, "equipment")
+    removed_equipment = {item.lower() for item in equipment_section.get("remove", [])}
+    equipment = [
+        item
+        for item in recipe_data.get("equipment") or []
+        if item.lower() not in removed_equipment
+    ]
+    equipment += [
+        item for item in equipment_section.get("add", []) if item not in equipment
+    ]
+
+    fields = {field: recipe_data.get(field) for field in SCALAR_FIELDS}
+    fields.update({field: patch[field] for field in SCALAR_FIELDS if field in patch})
+    try:
+        return LLMGenerateResponse(
+            title=fields["title"] or "Untitled Recipe",
+            description=fields["description"] or "",
+            ingredients=ingredients,
+            instructions=instructions,
+            prep_time=fields["prep_time"],
+            cook_time=fields["cook_time"],
+            equipment=equipment,
+            plating_notes=fields["plating_notes"],
+            suggested_tags=patch.get("suggested_tags", []),
+        )
+    except ValidationError as e:
+        raise PatchError(str(e))
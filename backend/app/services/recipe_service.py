@@ -0,0 +1,158 @@
+from sqlalchemy.orm import Session, load_only
+from sqlalchemy import func
+from typing import List, Dict, Any, Tuple, Optional, Union
+from app.models import Recipe, RecipeTag, Tag, Rating, Photo
+from app.schemas import Recipe as RecipeSchema
+
+# Columns needed to render a recipe card; everything else is left unloaded
+SUMMARY_COLUMNS = (
+    Recipe.id,
+    Recipe.user_id,
+    Recipe.title,
+    Recipe.description,
+    Recipe.source,
+    Recipe.servings,
+    Recipe.prep_time,
+    Recipe.cook_time,
+    Recipe.hero_photo,
+    Recipe.is_public,
+    Recipe.created_at,
+    Recipe.updated_at,
+)
+
+DETAIL_FIELDS = (
+    "base_prompt",
+    "instructions",
+    "ingredients",
+    "equipment",
+    "plating_notes",
+)
+
+RECIPE_FIELDS = frozenset(RecipeSchema.model_fields)
+
+
+def parse_fields(fields: Union[str, List[str], None]) -> Optional[List[str]]:
+    """
+    Parse a sparse fieldset ("title,hero_photo" or a list of names).
+    Returns None when no selection was requested; `id` is always included.
+    Raises ValueError for unknown field names.
+    """
+    if not fields:
+        return None
+    if isinstance(fields, str):
+        fields = fields.split(",")
+    requested = [f.strip() for f in fields if f.strip()]
+    unknown = sorted(set(requested) - RECIPE_FIELDS)
+    if unknown:
+        raise ValueError(f"Unknown fields: {', '.join(unknown)}")
+    return ["id", *dict.fromkeys(f for f in requested if f != "id")]
+
+
+def needs_detail(fields: Optional[List[str]]) -> bool:
+    """Whether a fieldset asks for columns outside the summary projection."""
+    return fields is not None and any(f in DETAIL_FIELDS for f in fields)
+
+
+def select_fields(
+    items: List[Dict[str, Any]], fields: Optional[List[str]]
+) -> List[Dict[str, Any]]:
+    """Trim recipe payloads down to the requested fieldset."""
+    if fields is None:
+        return items
+    return [{f: item[f] for f in fields} for item in items]
+
+
+def summary_load_options():
+    """Query options restricting a Recipe query to summary columns."""
+    return load_only(*SUMMARY_COLUMNS)
+
+
+def load_recipe_stats(
+    db: Session, recipe_ids: List[int]
+) -> Tuple[Dict[int, Tuple[float, int]], Dict[int, List[dict]], Dict[int, str]]:
+    """
+    Fetch ratings, tags and fallback hero photos for a page of recipes.
+    Issues one query per relation regardless of page size.
+    """
+
+    ratings = {
+        recipe_id: (float(avg) if avg else None, count)
+        for recipe_id, avg, count in db.query(
+            Rating.recipe_id, func.avg(Rating.score), func.count(Rating.id)
+        )
+        .filter(Rating.recipe_id.in_(recipe_ids))
+        .group_by(Rating.recipe_id)
+    }
+
+    tags: Dict[int, List[dict]] = {}
+    for recipe_id, tag in (
+        db.query(RecipeTag.recipe_id, Tag)
+        .join(Tag, Tag.id == RecipeTag.tag_id)
+        .filter(RecipeTag.recipe_id.in_(recipe_ids))
+        .order_by(RecipeTag.id)
+    ):
+        tags.setdefault(recipe_id, []).append(
+            {
+                "id": tag.id,
+                "name": tag.name,
+                "type": tag.type,
+                "created_at": tag.created_at,
+            }
+        )
+
+    # Prefer the photo flagged as hero, else the first uploaded
+    photos: Dict[int, str] = {}
+    for recipe_id, url in (
+        db.query(Photo.recipe_id, Photo.url)
+        .filter(Photo.recipe_id.in_(recipe_ids))
+        .order_by(Photo.is_hero.desc(), Photo.id)
+    ):
+        photos.setdefault(recipe_id, url)
+
+    return ratings, tags, photos
+
+
+def enrich_recipes(
+    db: Session, recipes: List[Recipe], full: bool = False
+) -> List[Dict[str, Any]]:
+    """
+    Build API payloads for a page of recipes with ratings, tags and hero photo.
+    Summaries only touch SUMMARY_COLUMNS, so they are safe to use on rows
+    loaded with summary_load_options().
+
+    Payloads are plain dicts ready for ORJSONResponse; ingredient lists are
+    passed through as stored since they were validated on write.
+    """
+
+    if not recipes:
+        return []
+
+    ratings, tags, photos = load_recipe_stats(db, [r.id for r in recipes])
+
+    result = []
+    for recipe in recipes:
+        avg_rating, rating_count = ratings.get(recipe.id, (None, 0))
+        data = {
+            "id": recipe.id,
+            "user_id": recipe.user_id,
+            "title": recipe.title,
+            "description": recipe.description,
+            "source": recipe.source,
+            "servings": recipe.servings,
+            "prep_time": recipe.prep_time,
+            "cook_time": recipe.cook_time,
+            "is_public": recipe.is_public,
+            "created_at": recipe.created_at,
+            "updated_at": recipe.updated_at,
+            "avg_rating": avg_rating,
+            "rating_count": rating_count,
+            "tags": tags.get(recipe.id, []),
+            "hero_photo": recipe.hero_photo or photos.get(recipe.id),
+        }
+        if full:
+            for field in DETAIL_FIELDS:
+                data[field] = getattr(recipe, field)
+            data["ingredients"] = data["ingredients"] or []
+        result.append(data)
+
+    return result
@@ -1,23 +1,66 @@
 from sqlalchemy.orm import Session
-from sqlalchemy import func, or_, and_
+from sqlalchemy import func, or_, and_, exists, true, type_coerce
+from sqlalchemy.dialects.postgresql import JSONB
 from typing import List, Optional, Dict, Any
-from app.models import Recipe, RecipeTag, Tag, Rating
-from app.schemas import Recipe as RecipeSchema
+from app.models import Recipe, RecipeIngredient, RecipeTag, Rating
+from app.services.ingredient_service import normalize_pantry
+from app.services.recipe_service import enrich_recipes, summary_load_options
+
+
+def json_contains(dialect: str, column, value):
+    """
+    `column @> value` on Postgres. Other dialects get the same semantics
+    from SQLite's JSON1 functions: objects match key by key, and every
+    element of a list must match some element of the stored array.
+    """
+    if dialect == "postgresql":
+        return type_coerce(column, JSONB).contains(value)
+    return _json1_contains(column, value, "$")
+
+
+def _json1_contains(document, value, path: str):
+    if isinstance(value, dict):
+        return and_(
+            true(),
+            *(
+                _json1_contains(document, item, f'{path}."{key}"')
+                for key, item in value.items()
+            ),
+        )
+    if isinstance(value, list):
+        clauses = []
+        for item in value:
+            elements = func.json_each(document, path).table_valued("value").alias()
+            if isinstance(item, (dict, list)):
+                match = _json1_contains(elements.c.value, item, "$")
+            else:
+                match = elements.c.value == item
+            clauses.append(exists().select_from(elements).where(match))
+        return and_(true(), *clauses)
+    return func.json_extract(document, path) == value
 
 
 def search_recipes(
     db: Session,
-    user_id: int,
+    user_id: Optional[int],
     query: str,
     filters: Optional[Dict[str, Any]] = None,
     limit: int = 20,
-) -> List[RecipeSchema]:
+    expand: bool = False,
+    public: bool = False,
+) -> List[Dict[str, Any]]:
     """
     Search recipes using full-text search and filters.
+    Returns recipe summaries unless expand is set. With `public`, searches
+    every user's public recipes instead of `user_id`'s vault. Raises
+    ValueError for malformed filters.
     """
 
     # Base query
-    base_query = db.query(Recipe).filter(Recipe.user_id == user_id)
+    if public:
+        base_query = db.query(Recipe).filter(Recipe.is_public == True)
+    else:
+        base_query = db.query(Recipe).filter(Recipe.user_id == user_id)
 
     # Text search
     if query:
@@ -39,6 +82,28 @@ def search_recipes(
         if filters.get("source"):
             base_query = base_query.filter(Recipe.source == filters["source"])
 
+        ingredients = filters.get("ingredients")
+        if ingredients:
+            if not isinstance(ingredients, list) or not all(
+                isinstance(name, str) for name in ingredients
+            ):
+                raise ValueError("filters.ingredients must be a list of names")
+            # Exact match on normalized names ("Garlic" finds "garlic", not
+            # "garlic cloves"), through the index pantry search uses
+            for name in normalize_pantry(ingredients):
+                base_query = base_query.filter(
+                    exists().where(
+                        RecipeIngredient.recipe_id == Recipe.id,
+                        RecipeIngredient.name == name,
+                    )
+                )
+
+        if filters.get("llm_metadata"):
+            dialect = db.get_bind().dialect.name
+            base_query = base_query.filter(
+                json_contains(dialect, Recipe.llm_response, filters["llm_metadata"])
+            )
+
         if filters.get("min_rating"):
             # Subquery for average rating
             rating_subq = (
@@ -59,67 +124,17 @@ def search_recipes(
     else:
         base_query = base_query.order_by(Recipe.created_at.desc())
 
+    if not expand:
+        base_query = base_query.options(summary_load_options())
+
     # Limit results
     recipes = base_query.limit(limit).all()
 
-    # Enrich with ratings and tags
-    result = []
-    for recipe in recipes:
-        recipe_dict = {
-            "id": recipe.id,
-            "user_id": recipe.user_id,
-            "title": recipe.title,
-            "description": recipe.description,
-            "source": recipe.source,
-            "instructions": recipe.instructions,
-            "ingredients": recipe.ingredients,
-            "servings": recipe.servings,
-            "prep_time": recipe.prep_time,
-            "cook_time": recipe.cook_time,
-            "equipment": recipe.equipment,
-            "plating_notes": recipe.plating_notes,
-            "is_public": recipe.is_public,
-            "base_prompt": recipe.base_prompt,
-            "created_at": recipe.created_at,
-            "updated_at": recipe.updated_at,
-        }
-
-        # Get average rating
-        avg_rating = (
-            db.query(func.avg(Rating.score))
-            .filter(Rating.recipe_id == recipe.id)
-            .scalar()
-        )
-        rating_count = (
-            db.query(func.count(Rating.id))
-            .filter(Rating.recipe_id == recipe.id)
-            .scalar()
-        )
-
-        recipe_dict["avg_rating"] = float(avg_rating) if avg_rating else None
-        recipe_dict["rating_count"] = rating_count or 0
-
-        # Get tags
-        tags = (
-            db.query(Tag).join(RecipeTag).filter(RecipeTag.recipe_id == recipe.id).all()
-        )
-        recipe_dict["tags"] = [
-            {"id": t.id, "name": t.name, "type": t.type, "created_at": t.created_at}
-            for t in tags
-        ]
-
-        # Get hero photo
-        hero_photo = next((p for p in recipe.photos if p.is_hero), None)
-        if not hero_photo and recipe.photos:
-            hero_photo = recipe.photos[0]
-        recipe_dict["hero_photo"] = hero_photo.url if hero_photo else None
-
-        result.append(RecipeSchema(**recipe_dict))
-
-    return result
+    # Enrich with ratings, tags and hero photo in one batch
+    return enrich_recipes(db, recipes, full=expand)
 
 
-def should_suggest_llm(results: List[RecipeSchema], query: str) -> bool:
+def should_suggest_llm(results: List[Dict[str, Any]], query: str) -> bool:
     """
     Determine if we should suggest LLM generation based on search results.
     """
@@ -1,65 +1,220 @@
-import boto3
-from botocore.exceptions import ClientError
+import asyncio
+import logging
+import threading
+from starlette.concurrency import run_in_threadpool
 from app.core.config import settings
+from app.core.metrics import track_storage_call
+from app.core.tracing import tracer
+from opentelemetry.trace import SpanKind
 import uuid
-from typing import Optional
+from urllib.parse import urlparse
+from typing import Dict, List, Optional, Tuple
 
+logger = logging.getLogger(__name__)
 
-def get_s3_client():
-    """Get configured S3 client."""
-    return boto3.client(
-        "s3",
-        endpoint_url=settings.S3_ENDPOINT_URL or None,
-        aws_access_key_id=settings.S3_ACCESS_KEY_ID,
-        aws_secret_access_key=settings.S3_SECRET_ACCESS_KEY,
-        region_name=settings.S3_REGION,
+
+def _s3_span(operation: str, key: str, content_length: Optional[int] = None):
+    """Client span for one S3 call."""
+    attributes = {
+        "rpc.system": "aws-api",
+        "rpc.service": "S3",
+        "rpc.method": operation,
+        "aws.s3.bucket": settings.S3_BUCKET_NAME,
+        "aws.s3.key": key,
+    }
+    if content_length is not None:
+        attributes["aws.s3.content_length"] = content_length
+    return tracer.start_as_current_span(
+        f"s3 {operation}",
+        kind=SpanKind.CLIENT,
+        attributes=attributes,
     )
 
 
-async def upload_photo(file_content: bytes, filename: str, content_type: str) -> str:
+_s3_client = None
+_s3_client_lock = threading.Lock()
+
+
+def get_s3_client():
     """
-    Upload a photo to S3 and return the URL.
+    Get the configured S3 client. It's built once, on first use or during
+    warmup, so boto3 stays out of app import; boto3 clients are thread-safe.
     """
-    try:
-        s3_client = get_s3_client()
+    global _s3_client
+    if _s3_client is None:
+        with _s3_client_lock:
+            if _s3_client is None:
+                import boto3
+
+                _s3_client = boto3.client(
+                    "s3",
+                    endpoint_url=settings.S3_ENDPOINT_URL or None,
+                    aws_access_key_id=settings.S3_ACCESS_KEY_ID,
+                    aws_secret_access_key=settings.S3_SECRET_ACCESS_KEY,
+                    region_name=settings.S3_REGION,
+                )
+    return _s3_client
+
+
+def _photo_key(filename: str, prefix: str = "photos") -> str:
+    """A unique object key keeping the file's extension."""
+    file_extension = filename.split(".")[-1]
+    return f"{prefix}/{uuid.uuid4()}.{file_extension}"
+
+
+def photo_url(key: str) -> str:
+    """Public URL of a stored photo."""
+    if settings.S3_ENDPOINT_URL:
+        return f"{settings.S3_ENDPOINT_URL}/{settings.S3_BUCKET_NAME}/{key}"
+    return (
+        f"https://{settings.S3_BUCKET_NAME}.s3.{settings.S3_REGION}.amazonaws.com/{key}"
+    )
 
-        # Generate unique filename
-        file_extension = filename.split(".")[-1]
-        unique_filename = f"photos/{uuid.uuid4()}.{file_extension}"
 
-        # Upload to S3
-        s3_client.put_object(
+def photo_key(url: str) -> str:
+    """Key of a stored photo from its URL; the inverse of `photo_url`."""
+    prefix = photo_url("")
+    if url.startswith(prefix):
+        return url[len(prefix) :]
+    # Stored under other settings: virtual-hosted or path-style
+    path = urlparse(url).path.lstrip("/")
+    return path.removeprefix(f"{settings.S3_BUCKET_NAME}/")
+
+
+def _put_photo(key: str, file_content: bytes, content_type: str) -> None:
+    with _s3_span("PutObject", key, len(file_content)), track_storage_call(
+        "put_object"
+    ):
+        get_s3_client().put_object(
             Bucket=settings.S3_BUCKET_NAME,
-            Key=unique_filename,
+            Key=key,
             Body=file_content,
             ContentType=content_type,
             ACL="public-read",  # Adjust based on your security requirements
         )
 
-        # Generate URL
-        if settings.S3_ENDPOINT_URL:
-            url = f"{settings.S3_ENDPOINT_URL}/{settings.S3_BUCKET_NAME}/{unique_filename}"
-        else:
-            url = f"https://{settings.S3_BUCKET_NAME}.s3.{settings.S3_REGION}.amazonaws.com/{unique_filename}"
 
-        return url
+async def upload_photo(file_content: bytes, filename: str, content_type: str) -> str:
+    """
+    Upload a photo to S3 and return the URL. The blocking boto3 call runs
+    on the threadpool.
+    """
+    from botocore.exceptions import ClientError
+
+    key = _photo_key(filename)
+    try:
+        await run_in_threadpool(_put_photo, key, file_content, content_type)
     except ClientError as e:
         raise Exception(f"Failed to upload photo: {str(e)}")
+    return photo_url(key)
+
+
+async def upload_photos(
+    files: List[Tuple[bytes, str, str]], concurrency: Optional[int] = None
+) -> List[str]:
+    """
+    Upload (content, filename, content_type) files with at most
+    `concurrency` uploads in flight, returning their URLs in order. If any
+    upload fails, the ones that succeeded are deleted and the error raised.
+    """
+    semaphore = asyncio.Semaphore(concurrency or settings.PHOTO_UPLOAD_CONCURRENCY)
+
+    async def upload(file: Tuple[bytes, str, str]) -> str:
+        async with semaphore:
+            return await upload_photo(*file)
+
+    results = await asyncio.gather(
+        *(upload(file) for file in files), return_exceptions=True
+    )
+    errors = [result for result in results if isinstance(result, BaseException)]
+    if errors:
+        await delete_photos([r for r in results if isinstance(r, str)])
+        raise errors[0]
+    return results
+
+
+def presign_photo_upload(user_id: int, filename: str, content_type: str) -> Dict:
+    """
+    A presigned POST letting the client upload one photo straight to the
+    bucket, under a key scoped to `user_id`. The policy pins the key, the
+    content type and PHOTO_MAX_BYTES, and expires after
+    PHOTO_PRESIGN_EXPIRES_SECONDS.
+    """
+    key = _photo_key(filename, prefix=f"photos/{user_id}")
+    fields = {"acl": "public-read", "Content-Type": content_type}
+    with _s3_span("PresignPost", key):
+        post = get_s3_client().generate_presigned_post(
+            Bucket=settings.S3_BUCKET_NAME,
+            Key=key,
+            Fields=fields,
+            Conditions=[
+                {"acl": "public-read"},
+                {"Content-Type": content_type},
+                ["content-length-range", 1, settings.PHOTO_MAX_BYTES],
+            ],
+            ExpiresIn=settings.PHOTO_PRESIGN_EXPIRES_SECONDS,
+        )
+    return {"key": key, "upload_url": post["url"], "fields": post["fields"]}
+
+
+def _photo_uploaded(key: str) -> bool:
+    from botocore.exceptions import ClientError
+
+    try:
+        with _s3_span("HeadObject", key), track_storage_call("head_object"):
+            get_s3_client().head_object(Bucket=settings.S3_BUCKET_NAME, Key=key)
+        return True
+    except ClientError:
+        return False
+
+
+async def photos_uploaded(keys: List[str]) -> List[bool]:
+    """Whether each presigned upload has landed in the bucket."""
+    semaphore = asyncio.Semaphore(settings.PHOTO_UPLOAD_CONCURRENCY)
+
+    async def check(key: str) -> bool:
+        async with semaphore:
+            return await run_in_threadpool(_photo_uploaded, key)
+
+    return await asyncio.gather(*(check(key) for key in keys))
 
 
 async def delete_photo(url: str) -> bool:
     """
     Delete a photo from S3.
     """
+    from botocore.exceptions import ClientError
+
     try:
         s3_client = get_s3_client()
+        key = photo_key(url)
 
-        # Extract key from URL
-        key = url.split(f"{settings.S3_BUCKET_NAME}/")[-1]
-
-        s3_client.delete_object(Bucket=settings.S3_BUCKET_NAME, Key=key)
+        def delete():
+            with _s3_span("DeleteObject", key), track_storage_call("delete_object"):
+                s3_client.delete_object(Bucket=settings.S3_BUCKET_NAME, Key=key)
 
+        await run_in_threadpool(delete)
         return True
     except ClientError as e:
         print(f"Failed to delete photo: {str(e)}")
         return False
+
+
+async def delete_photos(urls: List[str]) -> None:
+    """
+    Delete photos concurrently, e.g. uploads orphaned by a failed request.
+    Never raises, so cleanup can't mask the error that prompted it;
+    failures are logged and the objects left behind.
+    """
+    semaphore = asyncio.Semaphore(settings.PHOTO_UPLOAD_CONCURRENCY)
+
+    async def delete(url: str) -> None:
+        async with semaphore:
+            await delete_photo(url)
+
+    results = await asyncio.gather(
+        *(delete(url) for url in urls), return_exceptions=True
+    )
+    for url, result in zip(urls, results):
+        if isinstance(result, BaseException):
+            logger.warning("Failed to delete photo %s: %r", url, result)
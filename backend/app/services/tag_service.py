@@ -0,0 +1,27 @@
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy.orm import Session
+
+from app.core.cache import cache
+from app.models import Tag
+from app.schemas import Tag as TagSchema
+
+# The tag catalog is small, read on every page load and rarely written
+tag_cache = cache.namespace("tags", default_ttl=3600)
+
+
+def tag_catalog(db: Session, type: Optional[str] = None) -> List[Dict[str, Any]]:
+    """All tags (of one type, if given) sorted by name, through the cache."""
+
+    def load_tags():
+        query = db.query(Tag)
+
+        if type:
+            query = query.filter(Tag.type == type)
+
+        return [
+            TagSchema.model_validate(tag).model_dump(mode="json")
+            for tag in query.order_by(Tag.name)
+        ]
+
+    return tag_cache.get_or_set(f"list:{type or ''}", load_tags, tags=["tags"])
@@ -0,0 +1,100 @@
+"""
+Startup warmup, so a fresh worker's first requests don't pay one-time costs:
+
+- database pools: open WARMUP_DB_CONNECTIONS connections to the primary
+  (and one per replica) instead of connecting inside the first requests;
+- SQLAlchemy mappers, which are configured on first query;
+- the tag catalog, read on every page load, into the shared cache;
+- the OpenAPI schema, generated from the Pydantic models on first /docs hit;
+- SDKs kept out of app import (boto3, jose, passlib, httpx, openai) and the
+  S3 and LLM provider clients built from them.
+
+Runs in each worker's lifespan startup, before it accepts connections.
+Failures are logged and skipped: a worker that can't warm up still serves.
+"""
+
+import importlib
+import logging
+import time
+from contextlib import ExitStack
+from typing import Callable, Dict
+
+from fastapi import FastAPI
+from sqlalchemy.orm import configure_mappers
+
+from app.core.config import settings
+from app.core.database import SessionLocal, engine, replicas
+from app.services.llm_providers import get_provider
+from app.services.storage_service import get_s3_client
+from app.services.tag_service import tag_catalog
+
+logger = logging.getLogger(__name__)
+
+# Imported on first use rather than with the app (see bench_imports)
+LAZY_MODULES = (
+    "boto3",
+    "botocore.exceptions",
+    "jose.jwt",
+    "passlib.context",
+    "httpx",
+    "openai",
+)
+
+
+def import_sdks() -> None:
+    """
+    Import the lazily loaded SDKs now. gunicorn calls this in the master
+    so forked workers share them; elsewhere it runs as part of warmup.
+    """
+    for name in LAZY_MODULES:
+        try:
+            importlib.import_module(name)
+        except ImportError:
+            logger.warning("Optional module %s is not installed", name)
+
+
+def _connect_pools() -> None:
+    # Hold the connections together so the pool opens that many
+    with ExitStack() as stack:
+        for _ in range(settings.WARMUP_DB_CONNECTIONS):
+            stack.enter_context(engine.connect())
+    for replica in replicas.engines:
+        with replica.connect():
+            pass
+
+
+def _load_tag_catalog() -> None:
+    with SessionLocal() as db:
+        tag_catalog(db)
+
+
+def _warm_llm_clients() -> None:
+    operations = {"generate", "revise", "revise_patch", *settings.LLM_ROUTES}
+    for provider in {id(p): p for p in map(get_provider, operations)}.values():
+        provider.warmup()
+
+
+def warmup(app: FastAPI) -> Dict[str, float]:
+    """Run each warmup step; returns milliseconds per step."""
+    steps: Dict[str, Callable[[], object]] = {
+        "db_pool": _connect_pools,
+        "mappers": configure_mappers,
+        "tag_catalog": _load_tag_catalog,
+        "openapi": app.openapi,
+        "sdk_imports": import_sdks,
+        "s3_client": get_s3_client,
+        "llm_clients": _warm_llm_clients,
+    }
+    timings = {}
+    for name, step in steps.items():
+        start = time.perf_counter()
+        try:
+            step()
+        except Exception:
+            logger.exception("Warmup step %s failed", name)
+        timings[name] = (time.perf_counter() - start) * 1000
+    logger.info(
+        "Warmup finished: %s",
+        ", ".join(f"{name} {ms:.0f}ms" for name, ms in timings.items()),
+    )
+    return timings
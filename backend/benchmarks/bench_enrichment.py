@@ -0,0 +1,60 @@
+"""
+Microbenchmark for recipe enrichment against a populated database.
+
+Times the list-page building blocks in isolation: loading a page of recipes
+(summary vs full columns) and enriching it with ratings, tags and hero
+photos, and reports SQL statements per page.
+
+    cd backend
+    python -m benchmarks.datagen --recipes 20000
+    python -m benchmarks.bench_enrichment --page 100
+"""
+
+import argparse
+
+from app.core.database import SessionLocal, track_queries
+from app.models import Recipe, User
+from app.services.recipe_service import enrich_recipes, summary_load_options
+from benchmarks.common import timed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--page", type=int, default=100)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    db = SessionLocal()
+    try:
+        user_id = db.query(User.id).order_by(User.id).first()[0]
+
+        def load(full: bool):
+            query = db.query(Recipe).filter(Recipe.user_id == user_id)
+            if not full:
+                query = query.options(summary_load_options())
+            return query.order_by(Recipe.created_at.desc()).limit(args.page).all()
+
+        def page(full: bool):
+            db.expunge_all()
+            return enrich_recipes(db, load(full), full=full)
+
+        print(f"page={args.page}, median of {args.repeat} runs")
+        for label, full in (("summary", False), ("full", True)):
+            db.expunge_all()
+            load_ms = timed(lambda: (db.expunge_all(), load(full)), args.repeat)
+            recipes = load(full)
+            enrich_ms = timed(
+                lambda: enrich_recipes(db, recipes, full=full), args.repeat
+            )
+            with track_queries() as stats:
+                page(full)
+            print(
+                f"{label:8s} load {load_ms:8.2f} ms  enrich {enrich_ms:8.2f} ms  "
+                f"{stats.count} SQL statements"
+            )
+    finally:
+        db.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,105 @@
+"""
+Benchmark: import time of `app.main`, with a budget.
+
+Imports the app in fresh interpreters under `python -X importtime` and
+reports the median total, the heaviest top-level packages (self time summed
+over their modules) and the heaviest app modules. Exits non-zero when:
+
+- the median exceeds --budget-ms; or
+- any module in app.services.warmup.LAZY_MODULES was imported eagerly.
+  Those modules must load on first use or during warmup.
+
+    cd backend
+    python -m benchmarks.bench_imports --runs 5 --budget-ms 1500
+
+The budget is wall time on the machine running the check; set it from
+a few runs on your CI hardware. Only the SDK list is hardware independent.
+"""
+
+import argparse
+import re
+import statistics
+import subprocess
+import sys
+from collections import defaultdict
+from typing import Dict, List, Set, Tuple
+
+from app.services.warmup import LAZY_MODULES
+
+LINE = re.compile(r"import time:\s+(\d+) \|\s+(\d+) \| (\s*)(\S+)")
+
+
+def profile_once() -> Tuple[float, Dict[str, int], Set[str]]:
+    """Total ms, self time (us) per module and the set of imported modules."""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import app.main"],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    self_us: Dict[str, int] = {}
+    total_us = 0
+    for line in result.stderr.splitlines():
+        match = LINE.match(line)
+        if not match:
+            continue
+        own, cumulative, indent, name = match.groups()
+        self_us[name] = int(own)
+        if name == "app.main":
+            total_us = int(cumulative)
+    return total_us / 1000, self_us, set(self_us)
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--budget-ms", type=float, default=1500.0)
+    parser.add_argument("--top", type=int, default=10)
+    args = parser.parse_args()
+
+    totals: List[float] = []
+    packages: Dict[str, List[int]] = defaultdict(list)
+    app_modules: Dict[str, List[int]] = defaultdict(list)
+    imported: Set[str] = set()
+    for _ in range(args.runs):
+        total, self_us, modules = profile_once()
+        totals.append(total)
+        imported |= modules
+        per_package: Dict[str, int] = defaultdict(int)
+        for name, own in self_us.items():
+            per_package[name.split(".")[0]] += own
+            if name.startswith("app."):
+                app_modules[name].append(own)
+        for name, own in per_package.items():
+            packages[name].append(own)
+
+    median = statistics.median(totals)
+    print(f"import app.main: median {median:.0f}ms over {args.runs} runs\n")
+    for title, table in (("package", packages), ("app module", app_modules)):
+        print(f"{title:40s} {'self ms':>8s}")
+        ranked = sorted(table.items(), key=lambda item: -statistics.median(item[1]))
+        for name, samples in ranked[: args.top]:
+            print(f"{name:40s} {statistics.median(samples) / 1000:8.1f}")
+        print()
+
+    failures = []
+    eager = sorted(
+        name
+        for name in LAZY_MODULES
+        if name in imported or name.split(".")[0] in imported
+    )
+    if eager:
+        failures.append(f"imported at startup: {', '.join(eager)}")
+    if median > args.budget_ms:
+        failures.append(f"{median:.0f}ms exceeds the {args.budget_ms:.0f}ms budget")
+    for failure in failures:
+        print(f"FAIL: {failure}")
+    if failures:
+        sys.exit(1)
+    print(f"OK: within {args.budget_ms:.0f}ms, no eager SDK imports")
+
+
+if __name__ == "__main__":
+    main()
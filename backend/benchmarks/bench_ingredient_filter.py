@@ -0,0 +1,138 @@
+"""
+Before/after benchmark for ingredient-based recipe filtering.
+
+Before: ingredients stored as JSON text, so filtering means loading every
+row and parsing it in Python. After: JSONB with a jsonb_path_ops GIN index,
+filtered in the database with a containment (@>) predicate.
+
+Runs against DATABASE_URL (Postgres) using temporary tables only:
+
+    cd backend
+    python -m benchmarks.bench_ingredient_filter --rows 20000
+"""
+
+import argparse
+import json
+import random
+
+from sqlalchemy import create_engine, text
+
+from app.core.config import settings
+from benchmarks.common import timed
+
+PANTRY = [
+    "kosher salt",
+    "black pepper",
+    "olive oil",
+    "butter",
+    "garlic",
+    "shallot",
+    "thyme",
+    "rosemary",
+    "lemon",
+    "heavy cream",
+    "parmesan",
+    "chicken thighs",
+    "ribeye steak",
+    "pork belly",
+    "salmon fillet",
+    "white wine",
+    "chicken stock",
+    "soy sauce",
+    "ginger",
+    "scallions",
+    "sesame oil",
+    "rice vinegar",
+    "cumin",
+    "smoked paprika",
+    "brown sugar",
+    "dijon mustard",
+    "capers",
+    "egg yolks",
+    "arborio rice",
+    "mushrooms",
+    "red onion",
+    "cilantro",
+    "lime",
+    "jalapeno",
+]
+
+
+def make_ingredients(rng: random.Random) -> list:
+    return [
+        {"name": name, "amount": str(rng.randint(1, 4)), "unit": "tbsp"}
+        for name in rng.sample(PANTRY, rng.randint(5, 14))
+    ]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=20000)
+    parser.add_argument("--repeat", type=int, default=7)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    wanted = ["salmon fillet", "capers"]
+
+    engine = create_engine(settings.DATABASE_URL)
+    with engine.connect() as conn:
+        conn.execute(text("CREATE TEMP TABLE bench_json (id serial, ingredients json)"))
+        conn.execute(
+            text("CREATE TEMP TABLE bench_jsonb (id serial, ingredients jsonb)")
+        )
+        rows = [
+            {"ingredients": json.dumps(make_ingredients(rng))} for _ in range(args.rows)
+        ]
+        conn.execute(
+            text(
+                "INSERT INTO bench_json (ingredients) VALUES (CAST(:ingredients AS json))"
+            ),
+            rows,
+        )
+        conn.execute(
+            text(
+                "INSERT INTO bench_jsonb (ingredients) SELECT ingredients::jsonb FROM bench_json"
+            )
+        )
+        conn.execute(
+            text("CREATE INDEX ON bench_jsonb USING gin (ingredients jsonb_path_ops)")
+        )
+        conn.execute(text("ANALYZE bench_json"))
+        conn.execute(text("ANALYZE bench_jsonb"))
+
+        def before():
+            result = conn.execute(text("SELECT id, ingredients FROM bench_json"))
+            return [
+                row.id
+                for row in result
+                if set(wanted) <= {ing["name"] for ing in row.ingredients}
+            ]
+
+        needle = json.dumps([{"name": name} for name in wanted])
+
+        def after():
+            return conn.execute(
+                text(
+                    "SELECT id FROM bench_jsonb "
+                    "WHERE ingredients @> CAST(:needle AS jsonb)"
+                ),
+                {"needle": needle},
+            ).all()
+
+        assert len(before()) == len(after())
+        matches = len(after())
+
+        before_ms = timed(before, args.repeat)
+        after_ms = timed(after, args.repeat)
+
+        print(f"rows={args.rows} matches={matches}")
+        print(f"json  + python filter : {before_ms:9.2f} ms")
+        print(f"jsonb + GIN @>        : {after_ms:9.2f} ms")
+        print(f"speedup               : {before_ms / after_ms:9.1f}x")
+
+        conn.rollback()
+
+
+if __name__ == "__main__":
+    main()
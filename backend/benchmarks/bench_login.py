@@ -0,0 +1,137 @@
+"""
+Benchmark: login throughput and its impact on other endpoints.
+
+Runs the app in-process and drives POST /api/auth/login from --logins
+concurrent clients, while --probes clients keep requesting a cheap sync
+endpoint (GET /api/tags/). This simulates a login storm after a deploy.
+Reported per mode:
+
+    logins/s      successful logins per second
+    login p95     login latency
+    refused       503s from the hashing pool's pending limit
+    probe p50/95  latency of the bystander endpoint during the storm
+
+Modes:
+    pool    bcrypt on the dedicated hashing pool (current behaviour)
+    inline  bcrypt on the shared threadpool that sync endpoints use, as
+            when login was a sync endpoint
+
+Uses the users from benchmarks/datagen.py (password "benchmark").
+
+    cd backend
+    python -m benchmarks.datagen --users 50 --recipes 500
+    python -m benchmarks.bench_login --logins 32 --probes 4 --duration 10
+"""
+
+import argparse
+import asyncio
+import time
+from typing import Dict, List
+
+import httpx
+from sqlalchemy import select
+from starlette.concurrency import run_in_threadpool
+
+from app.core import security
+from app.core.config import settings
+from app.core.database import SessionLocal
+from app.models import User
+from benchmarks.common import percentiles
+from benchmarks.datagen import BENCH_PASSWORD
+
+
+async def run_mode(
+    mode: str, emails: List[str], logins: int, probes: int, duration: float
+) -> Dict[str, float]:
+    from app.main import app
+
+    pooled = security._run_hashing
+    if mode == "inline":
+        security._run_hashing = lambda fn, *args: run_in_threadpool(fn, *args)
+
+    login_ms: List[float] = []
+    probe_ms: List[float] = []
+    refused = 0
+    deadline = time.perf_counter() + duration
+
+    async def login_client(client: httpx.AsyncClient, n: int):
+        nonlocal refused
+        while time.perf_counter() < deadline:
+            email = emails[n % len(emails)]
+            n += logins
+            start = time.perf_counter()
+            response = await client.post(
+                "/api/auth/login", json={"email": email, "password": BENCH_PASSWORD}
+            )
+            if response.status_code == 503:
+                refused += 1
+                await asyncio.sleep(float(response.headers["Retry-After"]))
+                continue
+            response.raise_for_status()
+            login_ms.append((time.perf_counter() - start) * 1000)
+
+    async def probe_client(client: httpx.AsyncClient):
+        while time.perf_counter() < deadline:
+            start = time.perf_counter()
+            (await client.get("/api/tags/")).raise_for_status()
+            probe_ms.append((time.perf_counter() - start) * 1000)
+            await asyncio.sleep(0.01)
+
+    try:
+        async with httpx.AsyncClient(
+            transport=httpx.ASGITransport(app=app), base_url="http://bench", timeout=120
+        ) as client:
+            await asyncio.gather(
+                *(login_client(client, n) for n in range(logins)),
+                *(probe_client(client) for _ in range(probes)),
+            )
+    finally:
+        security._run_hashing = pooled
+
+    login = percentiles(login_ms)
+    probe = percentiles(probe_ms)
+    return {
+        "logins/s": len(login_ms) / duration,
+        "login p95": login["p95"],
+        "refused": refused,
+        "probe p50": probe["p50"],
+        "probe p95": probe["p95"],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("--logins", type=int, default=32)
+    parser.add_argument("--probes", type=int, default=4)
+    parser.add_argument("--duration", type=float, default=10.0)
+    parser.add_argument("--modes", nargs="+", default=["inline", "pool"])
+    args = parser.parse_args()
+
+    settings.RATE_LIMIT_ENABLED = False
+    with SessionLocal() as db:
+        emails = list(
+            db.scalars(
+                select(User.email).where(User.email.like("bench-%")).order_by(User.id)
+            )
+        )
+    if not emails:
+        raise SystemExit("No benchmark users; run benchmarks.datagen first")
+
+    print(
+        f"{args.logins} login clients, {args.probes} probe clients, "
+        f"{args.duration:g}s, bcrypt rounds {settings.BCRYPT_ROUNDS}, "
+        f"hashing pool {security._hash_executor._max_workers} threads\n"
+    )
+    columns = ["logins/s", "login p95", "refused", "probe p50", "probe p95"]
+    print(f"{'mode':8s} " + " ".join(f"{c:>10s}" for c in columns))
+    for mode in args.modes:
+        result = asyncio.run(
+            run_mode(mode, emails, args.logins, args.probes, args.duration)
+        )
+        print(f"{mode:8s} " + " ".join(f"{result[c]:10.1f}" for c in columns))
+
+
+if __name__ == "__main__":
+    main()
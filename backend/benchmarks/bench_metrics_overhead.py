@@ -0,0 +1,61 @@
+"""
+Measure per-request overhead of MetricsMiddleware.
+
+Serves a trivial route in-process (no sockets, no database) with and
+without the middleware and reports the difference in mean latency.
+
+    cd backend
+    python -m benchmarks.bench_metrics_overhead --requests 5000
+"""
+
+import argparse
+import asyncio
+import time
+
+import httpx
+from fastapi import FastAPI
+
+from app.core.metrics import MetricsMiddleware
+
+
+def build_app(with_metrics: bool) -> FastAPI:
+    app = FastAPI()
+
+    @app.get("/items/{item_id}")
+    async def get_item(item_id: int):
+        return {"id": item_id}
+
+    if with_metrics:
+        app.add_middleware(MetricsMiddleware)
+    return app
+
+
+async def run(app: FastAPI, requests: int) -> float:
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(
+        transport=transport, base_url="http://bench"
+    ) as client:
+        for i in range(200):  # warmup
+            await client.get(f"/items/{i}")
+        start = time.perf_counter()
+        for i in range(requests):
+            await client.get(f"/items/{i}")
+        return (time.perf_counter() - start) / requests * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--requests", type=int, default=5000)
+    args = parser.parse_args()
+
+    plain = asyncio.run(run(build_app(False), args.requests))
+    instrumented = asyncio.run(run(build_app(True), args.requests))
+
+    print(f"requests={args.requests}")
+    print(f"without metrics : {plain:8.1f} us/request")
+    print(f"with metrics    : {instrumented:8.1f} us/request")
+    print(f"overhead        : {instrumented - plain:8.1f} us/request")
+
+
+if __name__ == "__main__":
+    main()
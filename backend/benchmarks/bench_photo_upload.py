@@ -0,0 +1,127 @@
+"""
+Benchmark: uploading a recipe's photos one request at a time vs in a batch.
+
+Runs the app in-process with S3 replaced by the fake from benchmarks/stubs.py
+(a blocking sleep of --s3-latency-ms per call, like the real SDK) and
+uploads --photos photos of --size-kb each to one recipe, --rounds times per
+mode. Meanwhile --probes clients keep requesting a cheap endpoint
+(GET /api/tags/) to show whether uploads hold up the event loop.
+Reported per mode:
+
+    seconds       median wall time to upload all the photos
+    photos/s      photos uploaded per second
+    probe p50/95  latency of the bystander endpoint during the uploads
+
+Modes:
+    single  one POST /api/photos/ per photo, in sequence
+    batch   one POST /api/photos/batch with every photo
+
+    cd backend
+    python -m benchmarks.datagen --users 2 --recipes 50
+    python -m benchmarks.bench_photo_upload --photos 8 --s3-latency-ms 100
+"""
+
+import argparse
+import asyncio
+import statistics
+import time
+from typing import Dict, List
+
+import httpx
+from sqlalchemy import select
+
+from app.core.database import SessionLocal
+from app.models import Recipe
+from benchmarks import stubs
+from benchmarks.common import percentiles
+
+
+async def run_mode(
+    mode: str, recipe_id: int, files: List[tuple], rounds: int, probes: int
+) -> Dict[str, float]:
+    from app.main import app
+
+    durations: List[float] = []
+    probe_ms: List[float] = []
+    done = False
+
+    async def upload(client: httpx.AsyncClient):
+        nonlocal done
+        for _ in range(rounds):
+            start = time.perf_counter()
+            if mode == "batch":
+                response = await client.post(
+                    "/api/photos/batch",
+                    params={"recipe_id": recipe_id},
+                    files=[("files", file) for file in files],
+                )
+                response.raise_for_status()
+            else:
+                for file in files:
+                    response = await client.post(
+                        "/api/photos/",
+                        params={"recipe_id": recipe_id},
+                        files={"file": file},
+                    )
+                    response.raise_for_status()
+            durations.append(time.perf_counter() - start)
+        done = True
+
+    async def probe_client(client: httpx.AsyncClient):
+        while not done:
+            start = time.perf_counter()
+            (await client.get("/api/tags/")).raise_for_status()
+            probe_ms.append((time.perf_counter() - start) * 1000)
+            await asyncio.sleep(0.01)
+
+    async with httpx.AsyncClient(
+        transport=httpx.ASGITransport(app=app), base_url="http://bench", timeout=120
+    ) as client:
+        await asyncio.gather(
+            upload(client), *(probe_client(client) for _ in range(probes))
+        )
+
+    seconds = statistics.median(durations)
+    probe = percentiles(probe_ms)
+    return {
+        "seconds": seconds,
+        "photos/s": len(files) / seconds,
+        "probe p50": probe["p50"],
+        "probe p95": probe["p95"],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("--photos", type=int, default=8)
+    parser.add_argument("--size-kb", type=int, default=500)
+    parser.add_argument("--s3-latency-ms", type=float, default=100.0)
+    parser.add_argument("--rounds", type=int, default=3)
+    parser.add_argument("--probes", type=int, default=2)
+    parser.add_argument("--modes", nargs="+", default=["single", "batch"])
+    args = parser.parse_args()
+
+    stubs.install(s3_latency=args.s3_latency_ms / 1000)
+    with SessionLocal() as db:
+        recipe_id = db.scalar(select(Recipe.id).where(Recipe.user_id == 1).limit(1))
+    if recipe_id is None:
+        raise SystemExit("No recipes for user 1; run benchmarks.datagen first")
+
+    content = b"\xff" * (args.size_kb * 1024)
+    files = [(f"photo-{i}.jpg", content, "image/jpeg") for i in range(args.photos)]
+
+    print(
+        f"{args.photos} photos of {args.size_kb}KB, S3 latency "
+        f"{args.s3_latency_ms:g}ms, {args.rounds} rounds, {args.probes} probes\n"
+    )
+    columns = ["seconds", "photos/s", "probe p50", "probe p95"]
+    print(f"{'mode':8s} " + " ".join(f"{c:>10s}" for c in columns))
+    for mode in args.modes:
+        result = asyncio.run(run_mode(mode, recipe_id, files, args.rounds, args.probes))
+        print(f"{mode:8s} " + " ".join(f"{result[c]:10.2f}" for c in columns))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,204 @@
+"""
+Benchmark: token use and latency of full vs patch recipe revisions.
+
+Runs `revise_recipe` over synthetic recipes (benchmarks/datagen.py shapes,
+no database needed) against a local fake LLM. For each mode the fake makes
+the same edit: one ingredient amount and one step change. In full mode it
+returns the whole revised recipe; in patch mode it returns just the patch.
+Latency is simulated as a fixed overhead plus a per-output-token cost, the
+dominant term for real chat completions.
+
+Modes:
+    indented  the previous prompt format (json.dumps(indent=2), full output)
+    full      compact prompt, full output
+    patch     compact prompt with numbered steps, patch output
+
+    cd backend
+    python -m benchmarks.bench_revision --recipes 50 --ms-per-token 2
+
+Token counts use tiktoken when it is installed, else ~4 characters/token.
+"""
+
+import argparse
+import asyncio
+import json
+import random
+import statistics
+import time
+from datetime import datetime, timezone
+from types import SimpleNamespace
+from typing import Callable, Dict, List
+
+from app.services import llm_service
+from app.services.llm_providers import OpenAICompatibleProvider, override_provider
+from app.services.recipe_patch import split_steps
+from benchmarks.datagen import make_recipe
+
+RECIPE_FIELDS = (
+    "title",
+    "description",
+    "ingredients",
+    "instructions",
+    "prep_time",
+    "cook_time",
+    "equipment",
+    "plating_notes",
+)
+NOTES = "Too salty and the sauce broke; add an emulsifying step."
+
+
+def token_counter() -> Callable[[str], int]:
+    try:
+        import tiktoken
+
+        encoding = tiktoken.get_encoding("cl100k_base")
+        return lambda text: len(encoding.encode(text))
+    except ImportError:
+        return lambda text: max(1, len(text) // 4)
+
+
+count_tokens = token_counter()
+
+
+def _recipe_from_prompt(prompt: str) -> Dict:
+    """The recipe JSON embedded in a revision prompt, whichever format."""
+    start = prompt.index("{")
+    end = prompt.index("\n\nFeedback:")
+    return json.loads(prompt[start:end])
+
+
+class FakeRevisionLLM:
+    """Chat completions stand-in making a fixed, realistic edit."""
+
+    def __init__(self, overhead_ms: float, ms_per_token: float):
+        self.overhead_ms = overhead_ms
+        self.ms_per_token = ms_per_token
+        self.usage: List[SimpleNamespace] = []
+        self.chat = SimpleNamespace(completions=self)
+
+    def create(self, messages, **kwargs):
+        system, user = messages[0]["content"], messages[1]["content"]
+        recipe = _recipe_from_prompt(user)
+        salt = dict(recipe["ingredients"][0], amount="1/2")
+
+        if system == llm_service.PATCH_SYSTEM_PROMPT:
+            output = {
+                "ingredients": {"upsert": [salt]},
+                "steps": {
+                    "insert": [
+                        {"after": 2, "text": "Whisk in cold butter off the heat."}
+                    ]
+                },
+            }
+        else:
+            steps = split_steps(recipe["instructions"])
+            steps.insert(2, "Whisk in cold butter off the heat.")
+            output = {
+                **recipe,
+                "ingredients": [salt, *recipe["ingredients"][1:]],
+                "instructions": "\n".join(
+                    f"{n}. {step}" for n, step in enumerate(steps, start=1)
+                ),
+                "suggested_tags": ["restaurant-style"],
+            }
+        content = json.dumps(output)
+
+        usage = SimpleNamespace(
+            prompt_tokens=count_tokens(system) + count_tokens(user),
+            completion_tokens=count_tokens(content),
+        )
+        self.usage.append(usage)
+        time.sleep(
+            (self.overhead_ms + usage.completion_tokens * self.ms_per_token) / 1000
+        )
+        return SimpleNamespace(
+            choices=[SimpleNamespace(message=SimpleNamespace(content=content))],
+            usage=usage,
+        )
+
+
+def indented_prompt(recipe_data: dict, notes: str, mode: str) -> str:
+    """The revision prompt before compact encoding, for comparison."""
+    return f"""Revise this recipe based on the following feedback:
+
+Current Recipe:
+{json.dumps(recipe_data, indent=2)}
+
+Feedback:
+{notes}
+
+Generate an improved version addressing the feedback. Return ONLY valid JSON following the schema."""
+
+
+def run_mode(mode: str, recipes: List[Dict], fake: FakeRevisionLLM) -> Dict[str, float]:
+    fake.usage.clear()
+    latencies = []
+    compact_prompt = llm_service.revision_prompt
+    if mode == "indented":
+        llm_service.revision_prompt = indented_prompt
+    try:
+        for recipe in recipes:
+            start = time.perf_counter()
+            asyncio.run(
+                llm_service.revise_recipe(
+                    recipe, NOTES, "full" if mode == "indented" else mode
+                )
+            )
+            latencies.append((time.perf_counter() - start) * 1000)
+    finally:
+        llm_service.revision_prompt = compact_prompt
+
+    return {
+        "prompt": statistics.mean(u.prompt_tokens for u in fake.usage),
+        "completion": statistics.mean(u.completion_tokens for u in fake.usage),
+        "p50": statistics.median(latencies),
+        "calls": len(fake.usage) / len(recipes),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("--recipes", type=int, default=50)
+    parser.add_argument("--overhead-ms", type=float, default=20.0)
+    parser.add_argument("--ms-per-token", type=float, default=2.0)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    now = datetime.now(timezone.utc)
+    recipes = [
+        {field: recipe[field] for field in RECIPE_FIELDS}
+        for recipe in (make_recipe(rng, 1, now) for _ in range(args.recipes))
+    ]
+
+    fake = FakeRevisionLLM(args.overhead_ms, args.ms_per_token)
+    override_provider(OpenAICompatibleProvider("bench", "bench", client=fake))
+
+    print(
+        f"{args.recipes} revisions, {args.overhead_ms:g}ms + "
+        f"{args.ms_per_token:g}ms/output token\n"
+    )
+    print(
+        f"{'mode':10s} {'prompt tok':>11s} {'output tok':>11s} "
+        f"{'p50 ms':>8s} {'calls':>6s}"
+    )
+    results = {}
+    for mode in ("indented", "full", "patch"):
+        r = results[mode] = run_mode(mode, recipes, fake)
+        print(
+            f"{mode:10s} {r['prompt']:11.0f} {r['completion']:11.0f} "
+            f"{r['p50']:8.1f} {r['calls']:6.2f}"
+        )
+
+    before, after = results["indented"], results["patch"]
+    print(
+        f"\npatch vs indented: "
+        f"{1 - (after['prompt'] + after['completion']) / (before['prompt'] + before['completion']):.0%} "
+        f"fewer tokens, {1 - after['p50'] / before['p50']:.0%} lower p50 latency"
+    )
+
+
+if __name__ == "__main__":
+    main()
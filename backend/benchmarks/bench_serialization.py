@@ -0,0 +1,117 @@
+"""
+Microbenchmark: serialization cost of a 100-recipe page.
+
+Compares the previous response path (build nested RecipeSchema/Ingredient
+models, then FastAPI re-validates and encodes them with the stdlib JSON
+encoder) against plain dict payloads encoded with orjson, with and without
+a sparse fieldset. No database is needed.
+
+    cd backend
+    python -m benchmarks.bench_serialization --page 100
+"""
+
+import argparse
+import json
+import random
+from datetime import datetime, timezone
+from typing import List
+
+import orjson
+from pydantic import TypeAdapter
+
+from app.models import RecipeSource
+from app.schemas import Recipe as RecipeSchema, Ingredient
+from app.services.recipe_service import select_fields, parse_fields
+from benchmarks.common import timed
+
+CARD_FIELDS = "title,prep_time,cook_time,avg_rating,rating_count,tags,hero_photo"
+
+
+def make_recipe(rng: random.Random, recipe_id: int) -> dict:
+    now = datetime.now(timezone.utc)
+    return {
+        "id": recipe_id,
+        "user_id": 1,
+        "title": f"Recipe {recipe_id}",
+        "description": "A restaurant-quality dish with layered seasoning. " * 2,
+        "source": RecipeSource.LLM,
+        "base_prompt": "restaurant style dinner",
+        "instructions": "\n".join(
+            f"{step}. Do the thing carefully." for step in range(1, 12)
+        ),
+        "ingredients": [
+            {
+                "name": f"ingredient {n}",
+                "amount": str(rng.randint(1, 4)),
+                "unit": "tbsp",
+                "notes": None,
+            }
+            for n in range(rng.randint(8, 16))
+        ],
+        "servings": 4,
+        "prep_time": 20,
+        "cook_time": 35,
+        "equipment": ["cast-iron skillet", "meat thermometer"],
+        "plating_notes": "Serve on warm plates, finish with flaky salt.",
+        "is_public": False,
+        "created_at": now,
+        "updated_at": now,
+        "avg_rating": 4.5,
+        "rating_count": 3,
+        "tags": [
+            {"id": t, "name": f"tag-{t}", "type": "cuisine", "created_at": now}
+            for t in range(3)
+        ],
+        "hero_photo": "https://example.com/photo.jpg",
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--page", type=int, default=100)
+    parser.add_argument("--repeat", type=int, default=50)
+    args = parser.parse_args()
+
+    rng = random.Random(42)
+    page = [make_recipe(rng, i) for i in range(args.page)]
+    adapter = TypeAdapter(List[RecipeSchema])
+    fields = parse_fields(CARD_FIELDS)
+
+    def pydantic_path():
+        # enrich_recipe built models, FastAPI dumped, re-validated and encoded them
+        models = [
+            RecipeSchema(
+                **{
+                    **data,
+                    "ingredients": [Ingredient(**i) for i in data["ingredients"]],
+                }
+            )
+            for data in page
+        ]
+        validated = adapter.validate_python([m.model_dump() for m in models])
+        return json.dumps(adapter.dump_python(validated, mode="json")).encode()
+
+    def orjson_path():
+        return orjson.dumps(page)
+
+    def orjson_fields_path():
+        return orjson.dumps(select_fields(page, fields))
+
+    results = [
+        ("pydantic models + json", pydantic_path),
+        ("dicts + orjson", orjson_path),
+        ("dicts + orjson, card fields", orjson_fields_path),
+    ]
+
+    timings = [timed(fn, args.repeat) for _, fn in results]
+    baseline = timings[0]
+    print(f"page={args.page} recipes, median of {args.repeat} runs")
+    for (label, fn), ms in zip(results, timings):
+        size = len(fn())
+        print(
+            f"{label:30s} {ms:8.2f} ms  {size / 1024:8.1f} KiB  {baseline / ms:6.1f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
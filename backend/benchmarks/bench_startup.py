@@ -0,0 +1,141 @@
+"""
+Benchmark: cold start and first-request latency, with and without warmup.
+
+Starts the server as a subprocess against DATABASE_URL (generate data first
+with benchmarks/datagen.py) and measures:
+
+    ready   spawn until /health answers: imports, app setup and the lifespan
+            warmup, i.e. how long a new worker is out of rotation
+    first   latency of the first request to each path on the fresh process
+    warm    latency of a later request to the same path
+
+Each server mode is started --trials times with WARMUP_ENABLED off and on,
+and the medians are reported.
+
+    cd backend
+    python -m benchmarks.datagen --recipes 2000
+    python -m benchmarks.bench_startup --trials 5
+    python -m benchmarks.bench_startup --server gunicorn --workers 1
+"""
+
+import argparse
+import os
+import socket
+import statistics
+import subprocess
+import sys
+import time
+from typing import Dict, List
+
+import httpx
+
+PATHS = [
+    "/api/tags/",
+    "/api/recipes/?limit=20",
+    "/api/leaderboards/top",
+    "/openapi.json",
+]
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def server_command(server: str, port: int, workers: int) -> List[str]:
+    if server == "gunicorn":
+        return [
+            sys.executable,
+            "-m",
+            "gunicorn",
+            "-c",
+            "gunicorn.conf.py",
+            "--bind",
+            f"127.0.0.1:{port}",
+            "--workers",
+            str(workers),
+            "app.main:app",
+        ]
+    return [
+        sys.executable,
+        "-m",
+        "uvicorn",
+        "app.main:app",
+        "--port",
+        str(port),
+        "--log-level",
+        "warning",
+    ]
+
+
+def run_trial(server: str, workers: int, warmup: bool) -> Dict[str, float]:
+    port = free_port()
+    env = dict(
+        os.environ,
+        WARMUP_ENABLED=str(warmup).lower(),
+        LEADERBOARD_REFRESH_SECONDS="0",
+        RATE_LIMIT_ENABLED="false",
+    )
+    start = time.perf_counter()
+    process = subprocess.Popen(
+        server_command(server, port, workers),
+        env=env,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+    result: Dict[str, float] = {}
+    try:
+        with httpx.Client(base_url=f"http://127.0.0.1:{port}", timeout=30) as client:
+            while True:
+                if process.poll() is not None:
+                    raise RuntimeError(f"{server} exited with {process.returncode}")
+                try:
+                    if client.get("/health").status_code == 200:
+                        break
+                except httpx.TransportError:
+                    time.sleep(0.01)
+            result["ready"] = (time.perf_counter() - start) * 1000
+
+            for label in ("first", "warm"):
+                for path in PATHS:
+                    request_start = time.perf_counter()
+                    response = client.get(path)
+                    response.raise_for_status()
+                    elapsed = (time.perf_counter() - request_start) * 1000
+                    result[f"{label} {path}"] = elapsed
+    finally:
+        process.terminate()
+        process.wait(timeout=30)
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("--server", choices=["uvicorn", "gunicorn"], default="uvicorn")
+    parser.add_argument("--workers", type=int, default=1)
+    parser.add_argument("--trials", type=int, default=5)
+    args = parser.parse_args()
+
+    results = {}
+    for warmup in (False, True):
+        trials = [
+            run_trial(args.server, args.workers, warmup) for _ in range(args.trials)
+        ]
+        results[warmup] = {
+            key: statistics.median(trial[key] for trial in trials) for key in trials[0]
+        }
+
+    print(f"{args.server}, {args.trials} trials, median ms\n")
+    print(f"{'':34s} {'no warmup':>10s} {'warmup':>10s}")
+    for key in results[False]:
+        print(f"{key:34s} {results[False][key]:10.1f} {results[True][key]:10.1f}")
+    first = [key for key in results[False] if key.startswith("first")]
+    totals = [sum(results[warmup][key] for key in first) for warmup in (False, True)]
+    print(f"{'first requests, total':34s} {totals[0]:10.1f} {totals[1]:10.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+"""Shared timing and reporting helpers for the benchmark scripts."""
+
+import json
+import statistics
+import time
+from pathlib import Path
+from typing import Callable, Dict, List
+
+BASELINE_DIR = Path(__file__).parent / "baselines"
+
+
+def timed(fn: Callable, repeat: int) -> float:
+    """Median wall time of `fn` in milliseconds."""
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        samples.append((time.perf_counter() - start) * 1000)
+    return statistics.median(samples)
+
+
+def percentiles(samples_ms: List[float]) -> Dict[str, float]:
+    """p50/p95/p99/max of latency samples in milliseconds."""
+    if not samples_ms:
+        return {"p50": 0.0, "p95": 0.0, "p99": 0.0, "max": 0.0}
+    ordered = sorted(samples_ms)
+
+    def pick(q: float) -> float:
+        return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+    return {
+        "p50": pick(0.50),
+        "p95": pick(0.95),
+        "p99": pick(0.99),
+        "max": ordered[-1],
+    }
+
+
+def save_baseline(name: str, results: Dict[str, Dict[str, float]]) -> Path:
+    BASELINE_DIR.mkdir(exist_ok=True)
+    path = BASELINE_DIR / f"{name}.json"
+    path.write_text(json.dumps(results, indent=2, sort_keys=True) + "\n")
+    return path
+
+
+def compare_baseline(
+    name: str,
+    results: Dict[str, Dict[str, float]],
+    metric: str = "p95",
+    tolerance: float = 0.15,
+) -> List[str]:
+    """
+    Compare `metric` per scenario against the stored baseline and return a
+    message for each scenario that regressed by more than `tolerance`.
+    """
+    path = BASELINE_DIR / f"{name}.json"
+    baseline = json.loads(path.read_text())
+    regressions = []
+    for scenario, values in results.items():
+        if scenario not in baseline or metric not in values:
+            continue
+        before, after = baseline[scenario][metric], values[metric]
+        if before and after > before * (1 + tolerance):
+            regressions.append(
+                f"{scenario}: {metric} {before:.2f} -> {after:.2f} "
+                f"(+{(after / before - 1) * 100:.0f}%)"
+            )
+    return regressions
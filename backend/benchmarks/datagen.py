@@ -0,0 +1,363 @@
+"""
+Synthetic data generator for benchmarks and load tests.
+
+Populates DATABASE_URL with users and recipes shaped like the seed data in
+alembic/versions/003_seed_recipes.py (structured ingredients, equipment,
+plating notes, LLM payloads) plus tags, ratings, photos and the pantry
+ingredient index. Output is deterministic for a given --seed.
+
+    cd backend
+    alembic upgrade head
+    python -m benchmarks.datagen --users 10 --recipes 20000
+"""
+
+import argparse
+import random
+import time
+from datetime import datetime, timedelta, timezone
+from typing import Dict, List
+
+from sqlalchemy import insert, select
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session
+
+from app.core.database import engine
+from app.core.security import get_password_hash
+from app.models import (
+    User,
+    Recipe,
+    RecipeSource,
+    Tag,
+    RecipeTag,
+    RecipeIngredient,
+    Rating,
+    Photo,
+)
+from app.services.change_feed import rebuild_change_log
+from app.services.ingredient_service import normalize_pantry
+from app.services.leaderboard_service import refresh_leaderboards
+
+BENCH_PASSWORD = "benchmark"
+
+PROTEINS = {
+    "chicken": ["chicken thighs", "chicken breast", "whole chicken"],
+    "beef": ["ribeye steak", "short ribs", "beef tenderloin", "ground beef"],
+    "pork": ["pork belly", "pork shoulder", "pork chops", "pancetta"],
+    "fish": ["salmon fillets", "black cod", "halibut", "sea bass"],
+    "seafood": ["lobster tails", "sea scallops", "shrimp", "mussels"],
+    "lamb": ["lamb rack", "lamb shoulder"],
+    "vegetarian": ["eggs", "halloumi", "paneer", "mushrooms"],
+}
+AROMATICS = [
+    "garlic cloves",
+    "shallot",
+    "yellow onion",
+    "ginger",
+    "scallions",
+    "lemongrass",
+    "leeks",
+    "celery",
+    "carrots",
+    "fennel",
+]
+HERBS_SPICES = [
+    "fresh thyme",
+    "fresh rosemary",
+    "flat-leaf parsley",
+    "cilantro",
+    "basil",
+    "smoked paprika",
+    "cumin",
+    "coriander seed",
+    "chili flakes",
+    "black pepper",
+    "kosher salt",
+    "flaky sea salt",
+    "star anise",
+    "bay leaves",
+    "tarragon",
+]
+PANTRY = [
+    "olive oil",
+    "butter",
+    "cold butter",
+    "heavy cream",
+    "white wine",
+    "red wine",
+    "chicken stock",
+    "beef stock",
+    "soy sauce",
+    "fish sauce",
+    "rice vinegar",
+    "sherry vinegar",
+    "dijon mustard",
+    "honey",
+    "brown sugar",
+    "all-purpose flour",
+    "panko",
+    "arborio rice",
+    "parmigiano-reggiano",
+    "capers",
+    "lemon",
+    "lime",
+    "egg yolks",
+    "miso paste",
+    "sesame oil",
+]
+TECHNIQUES = [
+    "Pan-Seared",
+    "Braised",
+    "Crispy",
+    "Smoked",
+    "Sous-Vide",
+    "Roasted",
+    "Grilled",
+    "Confit",
+    "Charred",
+    "Butter-Basted",
+    "Miso-Glazed",
+]
+ACCOMPANIMENTS = [
+    "Lemon Beurre Blanc",
+    "Garlic Herb Butter",
+    "Red Wine Jus",
+    "Salsa Verde",
+    "Brown Butter Polenta",
+    "Charred Scallion Oil",
+    "Truffle Pommes Purée",
+    "Chili Crisp",
+    "Romesco",
+    "Pickled Shallots",
+    "Sherry Pan Sauce",
+]
+EQUIPMENT = [
+    "cast-iron skillet",
+    "dutch oven",
+    "sous-vide circulator",
+    "smoker",
+    "meat thermometer",
+    "fish spatula",
+    "small saucepan",
+    "whisk",
+    "tongs",
+    "sheet pan",
+    "blender",
+    "fine-mesh strainer",
+]
+UNITS = ["tbsp", "tsp", "cup", "oz", "lbs", "whole", "sprigs", "cloves", ""]
+PHOTO_URLS = [
+    "https://images.unsplash.com/photo-1504674900247-0877df9cc836",
+    "https://images.unsplash.com/photo-1519864600265-abb23847ef2c",
+    "https://images.unsplash.com/photo-1464306076886-debede6bbf09",
+    "https://images.unsplash.com/photo-1502741338009-cac2772e18bc",
+    "https://images.unsplash.com/photo-1523987355523-c7b5b0723c6b",
+]
+SEED_TAGS = {
+    "cuisine": ["italian", "mexican", "french", "japanese", "thai", "american"],
+    "protein": list(PROTEINS),
+    "style": ["restaurant-style", "elevated-diner", "bar-food", "fine-dining"],
+    "difficulty": ["easy", "intermediate", "advanced", "professional"],
+    "occasion": ["weeknight", "date-night", "brunch", "entertaining"],
+    "status": ["untested", "tested", "keeper", "needs-tweak"],
+}
+
+BATCH = 1000
+
+
+def make_recipe(rng: random.Random, user_id: int, created_at: datetime) -> Dict:
+    protein_tag = rng.choice(list(PROTEINS))
+    protein = rng.choice(PROTEINS[protein_tag])
+    title = (
+        f"{rng.choice(TECHNIQUES)} {protein.title()} with {rng.choice(ACCOMPANIMENTS)}"
+    )
+    names = [protein]
+    names += rng.sample(AROMATICS, rng.randint(1, 3))
+    names += rng.sample(HERBS_SPICES, rng.randint(2, 5))
+    names += rng.sample(PANTRY, rng.randint(2, 7))
+    ingredients = [
+        {
+            "name": name,
+            "amount": str(rng.choice([1, 2, 3, 4, "1/2", "1/4", 6, 8])),
+            "unit": rng.choice(UNITS),
+            "notes": rng.choice([None, None, "finely minced", "room temperature"]),
+        }
+        for name in names
+    ]
+    steps = rng.randint(6, 14)
+    instructions = "\n".join(
+        f"{n}. {rng.choice(['Season', 'Sear', 'Reduce', 'Rest', 'Whisk', 'Baste'])} "
+        f"the {rng.choice(names)} until {rng.choice(['golden', 'glossy', 'tender', 'fragrant'])}, "
+        f"about {rng.randint(1, 12)} minutes"
+        for n in range(1, steps + 1)
+    )
+    equipment = rng.sample(EQUIPMENT, rng.randint(1, 4))
+    source = rng.choice([RecipeSource.LLM, RecipeSource.LLM, RecipeSource.MANUAL])
+    recipe = {
+        "user_id": user_id,
+        "title": title,
+        "description": f"Restaurant-quality {protein} finished with {rng.choice(ACCOMPANIMENTS).lower()}.",
+        "source": source,
+        "instructions": instructions,
+        "ingredients": ingredients,
+        "servings": rng.choice([2, 4, 4, 6, 8]),
+        "prep_time": rng.randint(5, 60),
+        "cook_time": rng.randint(10, 240),
+        "equipment": equipment,
+        "plating_notes": "Plate in warm bowls, sauce underneath, garnish with herbs.",
+        "hero_photo": None,
+        "is_public": rng.random() < 0.2,
+        "created_at": created_at,
+    }
+    if source == RecipeSource.LLM:
+        recipe["base_prompt"] = f"restaurant style {protein}"
+        recipe["llm_response"] = {
+            **{k: recipe[k] for k in ("title", "description", "instructions")},
+            "ingredients": ingredients,
+            "equipment": equipment,
+            "suggested_tags": [protein_tag, "restaurant-style"],
+        }
+    recipe["_protein_tag"] = protein_tag
+    return recipe
+
+
+def ensure_tags(conn) -> Dict[str, int]:
+    existing = dict(conn.execute(select(Tag.name, Tag.id)).all())
+    missing = [
+        {"name": name, "type": tag_type}
+        for tag_type, names in SEED_TAGS.items()
+        for name in names
+        if name not in existing
+    ]
+    if missing:
+        conn.execute(insert(Tag), missing)
+        existing = dict(conn.execute(select(Tag.name, Tag.id)).all())
+    return existing
+
+
+def insert_recipes(conn, batch: List[Dict]) -> List[int]:
+    """
+    Insert a batch and return ids in batch order. LLM and manual recipes go
+    in separate executemany calls so manual rows get SQL NULL rather than
+    JSON null in llm_response.
+    """
+    recipe_ids: List[int] = [0] * len(batch)
+    for has_llm in (True, False):
+        positions = [
+            i for i, recipe in enumerate(batch) if ("llm_response" in recipe) == has_llm
+        ]
+        if not positions:
+            continue
+        ids = conn.scalars(
+            insert(Recipe).returning(Recipe.id, sort_by_parameter_order=True),
+            [batch[i] for i in positions],
+        )
+        for position, recipe_id in zip(positions, ids):
+            recipe_ids[position] = recipe_id
+    return recipe_ids
+
+
+def generate(users: int, recipes: int, seed: int, bind: Engine = engine) -> None:
+    rng = random.Random(seed)
+    now = datetime.now(timezone.utc)
+    hashed = get_password_hash(BENCH_PASSWORD)
+
+    with bind.begin() as conn:
+        tag_ids = ensure_tags(conn)
+        user_ids: List[int] = list(
+            conn.scalars(
+                insert(User).returning(User.id, sort_by_parameter_order=True),
+                [
+                    {
+                        "email": f"bench-{seed}-{n}@example.com",
+                        "name": f"Bench Cook {n}",
+                        "hashed_password": hashed,
+                        "is_active": True,
+                    }
+                    for n in range(users)
+                ],
+            )
+        )
+
+        for offset in range(0, recipes, BATCH):
+            batch = [
+                make_recipe(
+                    rng,
+                    user_ids[(offset + n) % len(user_ids)],
+                    now - timedelta(minutes=rng.randint(0, 60 * 24 * 365)),
+                )
+                for n in range(min(BATCH, recipes - offset))
+            ]
+            protein_tags = [r.pop("_protein_tag") for r in batch]
+            recipe_ids = insert_recipes(conn, batch)
+
+            index_rows, tag_rows, rating_rows, photo_rows = [], [], [], []
+            for recipe_id, recipe, protein_tag in zip(recipe_ids, batch, protein_tags):
+                index_rows += [
+                    {"recipe_id": recipe_id, "name": name}
+                    for name in normalize_pantry(
+                        i["name"] for i in recipe["ingredients"]
+                    )
+                ]
+                names = {protein_tag, "restaurant-style"}
+                names.update(
+                    rng.choice(SEED_TAGS[t])
+                    for t in ("cuisine", "difficulty", "occasion", "status")
+                    if rng.random() < 0.7
+                )
+                tag_rows += [
+                    {"recipe_id": recipe_id, "tag_id": tag_ids[name]} for name in names
+                ]
+                for _ in range(rng.choice([0, 0, 1, 1, 2, 3, 5])):
+                    cooked = now - timedelta(days=rng.randint(0, 365))
+                    rating_rows.append(
+                        {
+                            "recipe_id": recipe_id,
+                            "user_id": recipe["user_id"],
+                            "score": rng.choice([2, 3, 3.5, 4, 4, 4.5, 5, 5]),
+                            "notes": rng.choice([None, "Needs more acid", "Keeper"]),
+                            "cooked_date": cooked,
+                        }
+                    )
+                for n in range(rng.choice([0, 1, 1, 2, 3])):
+                    photo_rows.append(
+                        {
+                            "recipe_id": recipe_id,
+                            "user_id": recipe["user_id"],
+                            "url": rng.choice(PHOTO_URLS),
+                            "caption": None,
+                            "is_hero": n == 0,
+                        }
+                    )
+
+            for model, rows in (
+                (RecipeIngredient, index_rows),
+                (RecipeTag, tag_rows),
+                (Rating, rating_rows),
+                (Photo, photo_rows),
+            ):
+                if rows:
+                    conn.execute(insert(model), rows)
+
+    # Rows were bulk inserted, so rebuild what the ORM hooks would maintain
+    with Session(bind) as db:
+        refresh_leaderboards(db, rebuild=True)
+        rebuild_change_log(db)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--users", type=int, default=10)
+    parser.add_argument("--recipes", type=int, default=20000)
+    parser.add_argument("--seed", type=int, default=42)
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    generate(args.users, args.recipes, args.seed)
+    print(
+        f"generated {args.users} users / {args.recipes} recipes "
+        f"in {time.perf_counter() - start:.1f}s"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,202 @@
+"""
+HTTP load harness for the API.
+
+Drives a fixed mix of read and LLM endpoints with N concurrent clients and
+reports throughput and p50/p95/p99 latency per scenario. By default the app
+runs in-process (ASGI transport) with OpenAI and S3 replaced by the local
+fakes in benchmarks/stubs.py; pass --url to hit a running server instead.
+
+    cd backend
+    python -m benchmarks.datagen --recipes 20000
+    python -m benchmarks.load_test --concurrency 16 --duration 30 --save-baseline
+    # ... change code ...
+    python -m benchmarks.load_test --concurrency 16 --duration 30 --compare
+
+--compare exits non-zero when any scenario's p95 regressed by more than
+--tolerance against the stored baseline.
+"""
+
+import argparse
+import asyncio
+import random
+import sys
+import time
+from collections import defaultdict
+from typing import Callable, Dict, List, Optional, Tuple
+
+import httpx
+
+from benchmarks.common import compare_baseline, percentiles, save_baseline
+
+PANTRY = [
+    "garlic cloves",
+    "shallot",
+    "butter",
+    "olive oil",
+    "kosher salt",
+    "black pepper",
+    "lemon",
+    "fresh thyme",
+    "chicken stock",
+    "white wine",
+]
+QUERIES = ["chicken", "short ribs", "salmon", "pork belly", "scallops", "miso"]
+
+# name -> (weight, request builder)
+Scenario = Tuple[
+    int, Callable[[random.Random, List[int]], Tuple[str, str, Optional[dict]]]
+]
+
+SCENARIOS: Dict[str, Scenario] = {
+    "list": (30, lambda rng, ids: ("GET", "/api/recipes/?limit=50", None)),
+    "list_full": (
+        5,
+        lambda rng, ids: ("GET", "/api/recipes/?limit=50&expand=full", None),
+    ),
+    "get": (25, lambda rng, ids: ("GET", f"/api/recipes/{rng.choice(ids)}", None)),
+    "search": (
+        20,
+        lambda rng, ids: (
+            "POST",
+            "/api/search/",
+            {"query": rng.choice(QUERIES), "limit": 20},
+        ),
+    ),
+    "pantry": (
+        10,
+        lambda rng, ids: (
+            "POST",
+            "/api/search/pantry",
+            {"ingredients": rng.sample(PANTRY, 6), "max_missing": 3},
+        ),
+    ),
+    "tags": (9, lambda rng, ids: ("GET", "/api/tags/", None)),
+    "generate": (
+        1,
+        lambda rng, ids: (
+            "POST",
+            "/api/recipes/generate",
+            {"prompt": f"restaurant style {rng.choice(QUERIES)}"},
+        ),
+    ),
+}
+
+
+def make_client(url: Optional[str]) -> httpx.AsyncClient:
+    if url:
+        return httpx.AsyncClient(base_url=url, timeout=60)
+
+    from benchmarks import stubs
+    from app.main import app
+
+    stubs.install()
+    return httpx.AsyncClient(
+        transport=httpx.ASGITransport(app=app),
+        base_url="http://loadtest",
+        timeout=60,
+    )
+
+
+async def run(
+    url: Optional[str],
+    concurrency: int,
+    duration: float,
+    scenarios: List[str],
+    seed: int,
+) -> Dict[str, Dict[str, float]]:
+    samples: Dict[str, List[float]] = defaultdict(list)
+    errors: Dict[str, int] = defaultdict(int)
+    weights = [SCENARIOS[name][0] for name in scenarios]
+
+    async with make_client(url) as client:
+        response = await client.get("/api/recipes/?limit=100&fields=id")
+        response.raise_for_status()
+        recipe_ids = [r["id"] for r in response.json()]
+        if not recipe_ids:
+            raise SystemExit("No recipes found; run benchmarks.datagen first")
+
+        deadline = time.perf_counter() + duration
+
+        async def worker(n: int) -> None:
+            rng = random.Random(seed + n)
+            while time.perf_counter() < deadline:
+                name = rng.choices(scenarios, weights)[0]
+                method, path, body = SCENARIOS[name][1](rng, recipe_ids)
+                start = time.perf_counter()
+                response = await client.request(method, path, json=body)
+                elapsed = (time.perf_counter() - start) * 1000
+                if response.status_code >= 400:
+                    errors[name] += 1
+                else:
+                    samples[name].append(elapsed)
+
+        started = time.perf_counter()
+        await asyncio.gather(*(worker(n) for n in range(concurrency)))
+        wall = time.perf_counter() - started
+
+    results = {}
+    for name in scenarios:
+        stats = percentiles(samples[name])
+        stats["rps"] = len(samples[name]) / wall
+        stats["requests"] = len(samples[name])
+        stats["errors"] = errors[name]
+        results[name] = stats
+    return results
+
+
+def print_results(results: Dict[str, Dict[str, float]]) -> None:
+    print(
+        f"{'scenario':10s} {'req':>7s} {'err':>5s} {'rps':>8s} "
+        f"{'p50':>8s} {'p95':>8s} {'p99':>8s} {'max':>8s}"
+    )
+    for name, r in results.items():
+        print(
+            f"{name:10s} {r['requests']:7d} {r['errors']:5d} {r['rps']:8.1f} "
+            f"{r['p50']:8.1f} {r['p95']:8.1f} {r['p99']:8.1f} {r['max']:8.1f}"
+        )
+    total = sum(r["rps"] for r in results.values())
+    print(f"total throughput: {total:.1f} req/s (latencies in ms)")
+
+
+def main():
+    parser = argparse.ArgumentParser(
+        description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter
+    )
+    parser.add_argument("--url", help="Base URL of a running server")
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--duration", type=float, default=30.0)
+    parser.add_argument(
+        "--scenarios",
+        default=",".join(SCENARIOS),
+        help="Comma-separated subset of: " + ", ".join(SCENARIOS),
+    )
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--baseline", default="load_test")
+    parser.add_argument("--save-baseline", action="store_true")
+    parser.add_argument("--compare", action="store_true")
+    parser.add_argument("--tolerance", type=float, default=0.15)
+    args = parser.parse_args()
+
+    scenarios = [s for s in args.scenarios.split(",") if s]
+    unknown = set(scenarios) - set(SCENARIOS)
+    if unknown:
+        parser.error(f"unknown scenarios: {', '.join(sorted(unknown))}")
+
+    results = asyncio.run(
+        run(args.url, args.concurrency, args.duration, scenarios, args.seed)
+    )
+    print_results(results)
+
+    if args.save_baseline:
+        print(f"baseline written to {save_baseline(args.baseline, results)}")
+    if args.compare:
+        regressions = compare_baseline(args.baseline, results, tolerance=args.tolerance)
+        for line in regressions:
+            print(f"REGRESSION {line}")
+        if regressions:
+            sys.exit(1)
+        print(f"no p95 regressions beyond {args.tolerance:.0%}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,40 @@
+"""
+Offline stand-ins for OpenAI and S3 so load tests never leave the machine.
+
+`install()` routes every LLM operation to the fake provider and swaps the
+S3 client factory in storage_service; both simulate upstream latency with a
+blocking sleep, exactly like the real sync SDK calls. It also turns off
+per-user rate limits, since the harness drives everything as one user.
+"""
+
+import time
+
+from app.core.config import settings
+from app.services import llm_providers, storage_service
+from app.services.llm_providers import FakeProvider
+
+
+class FakeS3:
+    def __init__(self, latency: float):
+        self.latency = latency
+
+    def put_object(self, **kwargs):
+        time.sleep(self.latency)
+
+    def delete_object(self, **kwargs):
+        time.sleep(self.latency)
+
+    def head_object(self, **kwargs):
+        time.sleep(self.latency)
+        return {}
+
+    def generate_presigned_post(self, Bucket, Key, Fields=None, **kwargs):
+        # Signed locally by the real client too, so no latency
+        return {"url": f"https://{Bucket}.s3.fake", "fields": {**Fields, "key": Key}}
+
+
+def install(llm_latency: float = 0.5, s3_latency: float = 0.05) -> None:
+    """Route LLM and S3 calls to local fakes with the given latencies."""
+    settings.RATE_LIMIT_ENABLED = False
+    llm_providers.override_provider(FakeProvider(llm_latency))
+    storage_service.get_s3_client = lambda: FakeS3(s3_latency)
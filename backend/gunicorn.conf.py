@@ -0,0 +1,57 @@
+"""
+Production server profile: gunicorn managing uvicorn workers.
+
+    gunicorn -c gunicorn.conf.py app.main:app
+
+Sized from the CPU count unless WEB_CONCURRENCY is set. The app is imported
+once in the master (preload_app) and forked, so workers share the imported
+code pages and start faster; each worker then runs the lifespan warmup before
+it accepts connections. Migrations are not run here; apply them as a separate
+step before rolling out (`alembic upgrade head`).
+
+On SIGTERM workers stop accepting, finish in-flight requests for up to
+graceful_timeout seconds, then run lifespan shutdown.
+"""
+
+import multiprocessing
+import os
+
+bind = os.environ.get("BIND", "0.0.0.0:8000")
+worker_class = "uvicorn.workers.UvicornWorker"
+# Async workers: one per core covers the event loops; LLM and S3 calls wait
+# in each worker's threadpool rather than needing more processes
+workers = int(os.environ.get("WEB_CONCURRENCY", multiprocessing.cpu_count()))
+preload_app = True
+
+# Generation requests can take a minute or more
+timeout = int(os.environ.get("GUNICORN_TIMEOUT", 120))
+graceful_timeout = int(os.environ.get("GUNICORN_GRACEFUL_TIMEOUT", 30))
+keepalive = 5
+
+# Recycle workers now and then to bound slow memory growth; the jitter keeps
+# them from all restarting at once
+max_requests = int(os.environ.get("GUNICORN_MAX_REQUESTS", 5000))
+max_requests_jitter = max_requests // 10
+
+accesslog = "-"
+errorlog = "-"
+loglevel = os.environ.get("LOG_LEVEL", "info")
+
+
+def when_ready(server):
+    # Runs in the master before the first fork. The app is already imported
+    # (preload_app); import the SDKs it loads lazily too, so workers share
+    # those pages instead of each importing them during warmup
+    from app.services.warmup import import_sdks
+
+    import_sdks()
+
+
+def post_fork(server, worker):
+    # Connections opened in the master while importing must not be shared
+    # across processes; drop them from the forked pools without closing
+    from app.core.database import engine, replicas
+
+    engine.dispose(close=False)
+    for replica in replicas.engines:
+        replica.dispose(close=False)